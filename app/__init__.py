@@ -1,8 +1,27 @@
-"""股票工具栏应用包"""
+"""股票工具栏应用包
 
-from .core import Win11StockBar
-from .config import ConfigManager
-from .stock import StockDataManager
-from .ui import StockBarUI
+包内的类按需导入：无界面模式只用到数据获取部分，不会导入tkinter。
+"""
 
-__all__ = ['Win11StockBar', 'ConfigManager', 'StockDataManager', 'StockBarUI']
\ No newline at end of file
+import importlib
+
+# 导出名称 -> 所在模块
+_EXPORTS = {
+    'Win11StockBar': '.core',
+    'ConfigManager': '.config',
+    'StockDataManager': '.stock',
+    'StockBarUI': '.ui',
+    'HeadlessStockFeed': '.headless',
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    """首次访问时导入对应模块"""
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+价格提醒模块
+
+支持三类规则：价格穿越、涨跌幅阈值、接近涨停/跌停。昨日收盘价在一个交易日内不变，
+涨跌幅和涨跌停规则都可以换算成价格，因此每只股票把适用的全部规则换算成一个有序的价格阈值列表，
+每次行情更新只用二分查找取出上次价格与本次价格之间的阈值，开销与规则总数无关。
+
+规则写在配置文件的alerts中，例如：
+    {"symbol": "600519", "type": "price", "value": 1500, "direction": "up"}
+    {"symbol": "*", "type": "percent", "value": -5}
+    {"symbol": "*", "type": "limit", "value": 1}
+symbol为"*"时对关注列表中的全部股票生效。
+"""
+
+import time
+from bisect import bisect_left, bisect_right
+
+from .metrics import metrics
+
+
+RULE_TYPES = ('price', 'percent', 'limit')
+DIRECTIONS = ('up', 'down', 'both')
+
+# 对全部股票生效的规则的股票代码
+WILDCARD = '*'
+
+# 同一条规则对同一只股票再次提醒的最短间隔（秒），避免价格在阈值附近来回波动时反复提醒
+ALERT_COOLDOWN = 60
+
+
+def limit_ratio(symbol, name=''):
+    """按股票代码和名称估算涨跌停幅度
+    
+    ST股票5%，创业板和科创板20%，北交所30%，其余10%。
+    """
+    if 'ST' in (name or '').upper():
+        return 0.05
+    code = symbol[-6:]
+    if code.startswith(('300', '301', '688', '689')):
+        return 0.2
+    if code.startswith(('8', '4', '92')):
+        return 0.3
+    return 0.1
+
+
+def limit_prices(pre_close, ratio):
+    """计算涨停价和跌停价（按交易所规则四舍五入到分）"""
+    return round(pre_close * (1 + ratio) + 1e-9, 2), round(pre_close * (1 - ratio) + 1e-9, 2)
+
+
+def normalize_rule(rule):
+    """校验并规范化一条规则，无效时返回None
+    
+    返回:
+        (股票代码, 类型, 数值, 方向, 备注)
+    """
+    if not isinstance(rule, dict):
+        return None
+    symbol = rule.get('symbol')
+    rule_type = rule.get('type', 'price')
+    value = rule.get('value')
+    if not isinstance(symbol, str) or not symbol or rule_type not in RULE_TYPES:
+        return None
+    if not isinstance(value, (int, float)) or isinstance(value, bool):
+        return None
+    if rule_type == 'price' and value <= 0:
+        return None
+    if rule_type == 'limit' and value < 0:
+        return None
+    
+    direction = rule.get('direction')
+    if direction is None:
+        # 涨跌幅规则按正负号决定方向，其余默认两个方向都提醒
+        direction = ('up' if value >= 0 else 'down') if rule_type == 'percent' else 'both'
+    if direction not in DIRECTIONS:
+        return None
+    return symbol, rule_type, float(value), direction, str(rule.get('note', ''))
+
+
+class AlertEngine:
+    """价格提醒引擎
+    
+    每只股票的阈值索引在第一次行情更新时建立，昨日收盘价、涨跌停幅度或规则变化时重建。
+    evaluate在数据获取线程中调用（有多个工作线程时由StockDataManager加锁逐个调用）；
+    set_rules可从任意线程调用，整体替换规则后索引按需重建。
+    """
+    
+    def __init__(self, rules=None):
+        """初始化提醒引擎
+        
+        参数:
+            rules: 可选，规则列表（配置文件中alerts的格式）
+        """
+        self._rules = ((), {}, [])  # (全部规则, 股票代码 -> 规则序号列表, 通配规则序号列表)
+        self._indexes = {}  # 股票代码 -> (建立时的规则集, 昨日收盘价, 涨跌停幅度, 阈值列表, 条目列表)
+        self._last_prices = {}  # 股票代码 -> 上次价格
+        self._last_fired = {}  # (股票代码, 规则序号, 方向) -> 上次提醒时间
+        self.set_rules(rules or [])
+    
+    def set_rules(self, rules):
+        """替换全部规则，无效的规则被忽略
+        
+        返回:
+            有效规则数
+        """
+        normalized = []
+        by_symbol = {}
+        wildcard = []
+        for rule in rules:
+            parsed = normalize_rule(rule)
+            if parsed is None:
+                print(f"价格提醒规则无效，已忽略: {rule!r}")
+                continue
+            index = len(normalized)
+            normalized.append(parsed)
+            if parsed[0] == WILDCARD:
+                wildcard.append(index)
+            else:
+                by_symbol.setdefault(parsed[0], []).append(index)
+        
+        # 整体替换，数据获取线程读到的总是一致的规则集
+        self._rules = (tuple(normalized), by_symbol, wildcard)
+        self._last_fired = {}
+        return len(normalized)
+    
+    def _build_index(self, symbol, rules, pre_close, ratio):
+        """把适用于股票的规则换算为按价格排序的阈值列表
+        
+        返回:
+            (阈值列表, 条目列表)，条目为(方向, 规则序号, 上穿时的说明, 下穿时的说明)
+        """
+        all_rules, by_symbol, wildcard = rules
+        limit_up = limit_down = None
+        if pre_close:
+            limit_up, limit_down = limit_prices(pre_close, ratio)
+        
+        thresholds = []
+        for rule_id in by_symbol.get(symbol, []) + wildcard:
+            _, rule_type, value, direction, _ = all_rules[rule_id]
+            if rule_type == 'price':
+                thresholds.append((value, direction, rule_id, f"上穿 {value:.2f}", f"下穿 {value:.2f}"))
+            elif not pre_close:
+                # 尚未获取到昨日收盘价，涨跌幅和涨跌停规则暂不生效
+                continue
+            elif rule_type == 'percent':
+                level = pre_close * (1 + value / 100)
+                thresholds.append((level, direction, rule_id, f"涨跌幅上穿 {value:+.2f}%", f"涨跌幅下穿 {value:+.2f}%"))
+            else:
+                # value为距涨跌停的百分点，0表示触及涨跌停
+                offset = pre_close * value / 100
+                if direction in ('up', 'both'):
+                    text = f"接近涨停 {limit_up:.2f}" if value else f"触及涨停 {limit_up:.2f}"
+                    thresholds.append((limit_up - offset, 'up', rule_id, text, text))
+                if direction in ('down', 'both'):
+                    text = f"接近跌停 {limit_down:.2f}" if value else f"触及跌停 {limit_down:.2f}"
+                    thresholds.append((limit_down + offset, 'down', rule_id, text, text))
+        
+        thresholds.sort(key=lambda item: item[0])
+        return [item[0] for item in thresholds], [item[1:] for item in thresholds]
+    
+    def _get_index(self, stock, rules):
+        """获取股票的阈值索引，规则或昨日收盘价变化后重建"""
+        symbol = stock['symbol']
+        pre_close = stock.get('yesterday_close') or None
+        ratio = limit_ratio(symbol, stock.get('name'))
+        index = self._indexes.get(symbol)
+        if index is None or index[0] is not rules or index[1] != pre_close or index[2] != ratio:
+            levels, entries = self._build_index(symbol, rules, pre_close, ratio)
+            index = (rules, pre_close, ratio, levels, entries)
+            self._indexes[symbol] = index
+            metrics.increment('alerts.index_rebuilds')
+        return index
+    
+    def evaluate(self, stock):
+        """按股票的最新价格检查提醒（在数据获取线程中执行）
+        
+        只检查上次价格与本次价格之间的阈值；股票第一次出现时只记录价格。
+        
+        参数:
+            stock: 股票对象，需要price，涨跌幅和涨跌停规则还需要yesterday_close
+        
+        返回:
+            触发的提醒列表，每项为可直接序列化为JSON的字典
+        """
+        rules = self._rules
+        if not rules[0]:
+            return []
+        try:
+            price = float(stock.get('price', 0))
+        except (TypeError, ValueError):
+            return []
+        if price <= 0:
+            return []
+        
+        symbol = stock['symbol']
+        last_price = self._last_prices.get(symbol)
+        self._last_prices[symbol] = price
+        if last_price is None or last_price == price:
+            return []
+        
+        _, _, _, levels, entries = self._get_index(stock, rules)
+        if price > last_price:
+            # 上穿：last_price < 阈值 <= price
+            start, end = bisect_right(levels, last_price), bisect_right(levels, price)
+            moving = 'up'
+        else:
+            # 下穿：price <= 阈值 < last_price
+            start, end = bisect_left(levels, price), bisect_left(levels, last_price)
+            moving = 'down'
+        if start == end:
+            return []
+        
+        now = time.time()
+        all_rules = rules[0]
+        alerts = []
+        for position in range(start, end):
+            direction, rule_id, up_text, down_text = entries[position]
+            if direction != 'both' and direction != moving:
+                continue
+            key = (symbol, rule_id, moving)
+            if now - self._last_fired.get(key, 0) < ALERT_COOLDOWN:
+                continue
+            self._last_fired[key] = now
+            alerts.append(self._make_alert(stock, all_rules[rule_id], levels[position], price,
+                                           up_text if moving == 'up' else down_text, now))
+        
+        if alerts:
+            metrics.increment('alerts.triggered', len(alerts))
+        return alerts
+    
+    def _make_alert(self, stock, rule, level, price, text, now):
+        """生成一条提醒"""
+        _, rule_type, value, direction, note = rule
+        name = stock.get('name') or stock['symbol']
+        message = f"{name} {text}，现价 {price:.2f} {stock.get('change', '')}".rstrip()
+        if note:
+            message = f"{message}（{note}）"
+        return {
+            'timestamp': round(now, 3),
+            'symbol': stock['symbol'],
+            'name': name,
+            'type': rule_type,
+            'value': value,
+            'level': round(level, 3),
+            'price': price,
+            'change': stock.get('change'),
+            'message': message,
+        }
+    
+    def forget(self, symbols):
+        """清除不再关注的股票的索引和价格记录"""
+        for symbol in symbols:
+            self._indexes.pop(symbol, None)
+            self._last_prices.pop(symbol, None)
@@ -0,0 +1,403 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+分时图计算模块，包含与绘图无关的坐标计算函数
+"""
+
+import re
+from array import array
+from collections import deque
+from functools import lru_cache
+
+
+def decimate_points(points):
+    """按像素列对折线坐标做最小/最大值抽稀
+    
+    同一像素列（x取整相同）内的点只保留第一个、最后一个以及y最小、最大的点，
+    保持原有顺序。点数少于像素列数时结果与输入一致，画出的折线外形不变。
+    
+    参数:
+        points: 扁平坐标列表 [x0, y0, x1, y1, ...]，x需单调递增
+    
+    返回:
+        抽稀后的扁平坐标列表
+    """
+    if len(points) <= 8:
+        return points
+    
+    # 每个像素列只有一个点（如241个分钟槽位画在更宽的图上）时结果与输入相同
+    xs = points[::2]
+    if len(set(map(int, xs))) == len(xs):
+        return points
+    
+    result = []
+    column = None
+    first = last = low = high = 0
+    
+    for i in range(0, len(points) - 1, 2):
+        c = int(points[i])
+        if c != column:
+            if column is not None:
+                _append_column(result, points, first, low, high, last)
+            column = c
+            first = last = low = high = i
+        else:
+            last = i
+            y = points[i + 1]
+            if y < points[low + 1]:
+                low = i
+            elif y > points[high + 1]:
+                high = i
+    
+    _append_column(result, points, first, low, high, last)
+    return result
+
+
+def _append_column(result, points, first, low, high, last):
+    """将一个像素列保留下来的点按原顺序追加到结果中"""
+    previous = -1
+    for i in sorted((first, low, high, last)):
+        if i != previous:
+            result.append(points[i])
+            result.append(points[i + 1])
+            previous = i
+
+
+NAN = float('nan')
+
+# A股每个交易日的分钟槽位数：09:30-11:30共121个，13:01-15:00共120个（13:00与11:30合并）
+TRADING_SLOTS = 241
+
+_MORNING_OPEN = 9 * 60 + 30
+_MORNING_CLOSE = 11 * 60 + 30
+_AFTERNOON_OPEN = 13 * 60
+_AFTERNOON_CLOSE = 15 * 60
+
+_CLOCK_PATTERN = re.compile(r'(\d{1,2}):(\d{2})(?::\d{2})?\s*$')
+
+
+def parse_minute_of_day(timestamp):
+    """将分时数据的时间戳解析为北京时间当天的分钟数
+    
+    支持 "09:30"、"2025-11-28 09:30:00"、930、"0930"、202511280930、
+    以及秒或毫秒级的Unix时间戳。
+    
+    返回:
+        0-1439之间的分钟数，无法识别时返回None
+    """
+    if isinstance(timestamp, bool) or timestamp is None:
+        return None
+    
+    if isinstance(timestamp, str):
+        match = _CLOCK_PATTERN.search(timestamp)
+        if match:
+            return int(match.group(1)) * 60 + int(match.group(2))
+        digits = timestamp.strip()
+        if not digits.isdigit():
+            return None
+    elif isinstance(timestamp, (int, float)):
+        digits = str(int(timestamp))
+    else:
+        return None
+    
+    length = len(digits)
+    if length in (3, 4):
+        # HHMM
+        value = int(digits)
+        hour, minute = divmod(value, 100)
+    elif length in (5, 6):
+        # HHMMSS
+        value = int(digits)
+        hour, minute = divmod(value // 100, 100)
+    elif length in (12, 14):
+        # YYYYMMDDHHMM[SS]
+        hour, minute = int(digits[8:10]), int(digits[10:12])
+    elif length in (10, 13):
+        # Unix时间戳（秒/毫秒），转换为北京时间
+        seconds = int(digits) if length == 10 else int(digits) // 1000
+        return (seconds + 8 * 3600) % 86400 // 60
+    else:
+        return None
+    
+    if hour > 23 or minute > 59:
+        return None
+    return hour * 60 + minute
+
+
+def get_minute_slot(timestamp):
+    """将时间戳映射到A股分钟槽位
+    
+    返回:
+        0-240之间的槽位序号（11:30与13:00同为120），非交易时间或无法识别时返回None
+    """
+    minute = parse_minute_of_day(timestamp)
+    if minute is None:
+        return None
+    if _MORNING_OPEN <= minute <= _MORNING_CLOSE:
+        return minute - _MORNING_OPEN
+    if _AFTERNOON_OPEN <= minute <= _AFTERNOON_CLOSE:
+        return minute - _AFTERNOON_OPEN + (_MORNING_CLOSE - _MORNING_OPEN)
+    return None
+
+
+@lru_cache(maxsize=8)
+def get_slot_x_table(chart_left, chart_width):
+    """获取分钟槽位到x坐标的查找表，同一宽度只计算一次
+    
+    返回:
+        长度为TRADING_SLOTS的元组，第i项为槽位i的x坐标
+    """
+    last_slot = TRADING_SLOTS - 1
+    return tuple(chart_left + (slot / last_slot) * chart_width for slot in range(TRADING_SLOTS))
+
+
+def build_price_series(chart_data):
+    """将分时数据压缩为紧凑的价格序列
+    
+    有分钟槽位时按槽位存放（缺失的分钟为NaN），否则按原顺序存放。
+    每个价格占4字节，241个点约1KB，适合整个自选股列表常驻内存。
+    
+    返回:
+        array('f')价格序列
+    """
+    if chart_data and chart_data[0].get('slot') is not None:
+        series = array('f', [NAN]) * TRADING_SLOTS
+        for point in chart_data:
+            slot = point.get('slot')
+            if slot is not None and point.get('price'):
+                series[slot] = point['price']
+        return series
+    return array('f', [point['price'] for point in chart_data if point.get('price')])
+
+
+def build_volume_series(chart_data):
+    """将分时数据中的每分钟成交量压缩为按分钟槽位排列的紧凑序列
+    
+    只支持有分钟槽位的数据，缺失的分钟为0。
+    
+    返回:
+        array('f')成交量序列，数据没有分钟槽位或成交量时返回None
+    """
+    if not chart_data or chart_data[0].get('slot') is None or 'volume' not in chart_data[-1]:
+        return None
+    series = array('f', [0.0]) * TRADING_SLOTS
+    for point in chart_data:
+        slot = point.get('slot')
+        if slot is not None:
+            series[slot] = point.get('volume', 0)
+    return series
+
+
+def sparkline_points(series, left, top, width, height, base_price=None):
+    """计算迷你分时线的坐标
+    
+    每个像素列最多取一个点，纵轴按序列（及基准价）的最高最低价缩放。
+    
+    参数:
+        series: build_price_series生成的价格序列
+        left, top, width, height: 绘制区域
+        base_price: 可选，基准价（昨收），会被包含在纵轴范围内
+    
+    返回:
+        扁平坐标列表 [x0, y0, x1, y1, ...]
+    """
+    count = len(series)
+    valid = [v for v in series if v == v]
+    if count < 2 or len(valid) < 2 or width <= 0:
+        return []
+    
+    low = min(valid)
+    high = max(valid)
+    if base_price:
+        low = min(low, base_price)
+        high = max(high, base_price)
+    span = (high - low) or 1.0
+    
+    step = max(1, count // int(width))
+    scale_x = width / (count - 1)
+    points = []
+    for i in range(0, count, step):
+        value = series[i]
+        if value == value:
+            points.append(left + i * scale_x)
+            points.append(top + (high - value) / span * height)
+    # 保证最新的点一定在线上
+    last = count - 1
+    while series[last] != series[last]:
+        last -= 1
+    if last % step:
+        points.append(left + last * scale_x)
+        points.append(top + (high - series[last]) / span * height)
+    return points
+
+
+# 叠加指标：vwap为均价线（有成交量时按成交量加权），maN为N分钟均线，emaN为N分钟指数均线
+_OVERLAY_PATTERN = re.compile(r'^(vwap|ema|ma)(\d*)$')
+
+
+def parse_overlays(specs):
+    """解析叠加指标配置，忽略无效项和重复项
+    
+    参数:
+        specs: 名称列表或逗号分隔的字符串，如 ['vwap', 'ma5', 'ema20']
+    
+    返回:
+        规范化后的名称元组
+    """
+    if isinstance(specs, str):
+        specs = specs.replace('，', ',').split(',')
+    result = []
+    for spec in specs or ():
+        if not isinstance(spec, str):
+            continue
+        match = _OVERLAY_PATTERN.match(spec.strip().lower())
+        if not match:
+            continue
+        kind, period = match.groups()
+        if kind == 'vwap':
+            if period:
+                continue
+            name = kind
+        else:
+            if not period or not 1 < int(period) <= TRADING_SLOTS:
+                continue
+            name = f"{kind}{int(period)}"
+        if name not in result:
+            result.append(name)
+    return tuple(result)
+
+
+class MovingAverage:
+    """N点简单移动平均，每个点O(1)更新，窗口未满时为NaN"""
+    
+    def __init__(self, period):
+        """初始化，period为窗口点数"""
+        self.period = period
+        self.window = deque()
+        self.total = 0.0
+    
+    def push(self, value, weight=None):
+        """加入一个点，返回加入后的均值"""
+        self.window.append(value)
+        self.total += value
+        if len(self.window) > self.period:
+            self.total -= self.window.popleft()
+        return self.total / self.period if len(self.window) == self.period else NAN
+    
+    def peek(self, value, weight=None):
+        """返回加入该点后的均值，不改变状态"""
+        count = len(self.window) + 1
+        total = self.total + value
+        if count > self.period:
+            total -= self.window[0]
+            count = self.period
+        return total / self.period if count == self.period else NAN
+
+
+class ExponentialAverage:
+    """N点指数移动平均，以第一个点为初值"""
+    
+    def __init__(self, period):
+        """初始化，平滑系数为2/(period+1)"""
+        self.alpha = 2.0 / (period + 1)
+        self.value = None
+    
+    def push(self, value, weight=None):
+        """加入一个点，返回加入后的均值"""
+        self.value = self.peek(value)
+        return self.value
+    
+    def peek(self, value, weight=None):
+        """返回加入该点后的均值，不改变状态"""
+        if self.value is None:
+            return value
+        return self.value + self.alpha * (value - self.value)
+
+
+class CumulativeAverage:
+    """当日累计均价（VWAP），没有成交量时每个点权重相同"""
+    
+    def __init__(self):
+        """初始化"""
+        self.amount = 0.0
+        self.weight = 0.0
+    
+    def push(self, value, weight=None):
+        """加入一个点，返回加入后的均价"""
+        weight = 1.0 if weight is None else weight
+        self.amount += value * weight
+        self.weight += weight
+        return self.amount / self.weight if self.weight else value
+    
+    def peek(self, value, weight=None):
+        """返回加入该点后的均价，不改变状态"""
+        weight = 1.0 if weight is None else weight
+        total = self.weight + weight
+        return (self.amount + value * weight) / total if total else value
+
+
+def create_indicator(name):
+    """按parse_overlays返回的名称创建指标"""
+    if name == 'vwap':
+        return CumulativeAverage()
+    if name.startswith('ema'):
+        return ExponentialAverage(int(name[3:]))
+    return MovingAverage(int(name[2:]))
+
+
+class OverlayTracker:
+    """按分钟增量计算一只股票的叠加指标
+    
+    已结束的分钟折叠进各指标的状态，结果按点存放在values中；最后一个点是仍在变化的
+    当前分钟，每次只预览计算，不改变状态。新的分钟到达时只处理新增的点，
+    当日第一个点变化（换日或换股票）或数据变短时从头计算。
+    """
+    
+    def __init__(self, names):
+        """初始化
+        
+        参数:
+            names: parse_overlays返回的指标名称
+        """
+        self.names = tuple(names)
+        self._reset(None)
+    
+    def _reset(self, origin):
+        """清空状态"""
+        self.origin = origin
+        self.indicators = {name: create_indicator(name) for name in self.names}
+        self.values = {name: array('d') for name in self.names}
+        self.committed = 0  # 已折叠进状态的点数
+    
+    def update(self, chart_data):
+        """按最新的分时数据更新指标
+        
+        参数:
+            chart_data: 分时数据，点可带volume字段作为均价线的权重
+        
+        返回:
+            {名称: 最后一个点的指标值}，已结束分钟的值在values[名称]中（预热期为NaN）
+        """
+        if not chart_data:
+            self._reset(None)
+            return {}
+        
+        first = chart_data[0]
+        origin = (first.get('time'), first.get('slot'), first['price'])
+        last_index = len(chart_data) - 1
+        if origin != self.origin or last_index < self.committed:
+            self._reset(origin)
+        
+        indicators = self.indicators.items()
+        values = self.values
+        for i in range(self.committed, last_index):
+            point = chart_data[i]
+            price = point['price']
+            volume = point.get('volume')
+            for name, indicator in indicators:
+                values[name].append(indicator.push(price, volume))
+        self.committed = last_index
+        
+        last = chart_data[last_index]
+        return {name: indicator.peek(last['price'], last.get('volume')) for name, indicator in indicators}
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+分时图静态层离屏渲染模块
+"""
+
+import tkinter as tk
+
+
+class StaticLayerRenderer:
+    """分时图静态层渲染器
+
+    将0轴和时间网格虚线一次性光栅化到PhotoImage中，画布上只需一个图片图元。
+    图片按键缓存，只保留当前一份：尺寸或主题变化导致键变化时旧图片被淘汰。
+    Tk的PhotoImage无法直接绘制文字，百分比和时间标签仍使用画布文字图元。
+    """
+
+    def __init__(self, line_color='#666666', dash=(2, 2)):
+        """初始化渲染器
+
+        参数:
+            line_color: 虚线颜色
+            dash: 虚线样式（实线长度, 空白长度）
+        """
+        self.line_color = line_color
+        self.dash = dash
+        self.image = None
+        self._key = None
+        self.stats = {'hits': 0, 'misses': 0, 'evictions': 0}
+
+    def get_image(self, key, master, width, height, bg_color, hlines=(), vlines=()):
+        """获取静态层图片，键未变化时直接返回缓存
+
+        参数:
+            key: 缓存键，如(宽, 高, 主题, 网格节点)
+            master: 图片所属的Tk组件
+            width: 图片宽度
+            height: 图片高度
+            bg_color: 背景颜色
+            hlines: 水平虚线列表 [(x1, x2, y), ...]
+            vlines: 竖直虚线列表 [(x, y1, y2), ...]
+
+        返回:
+            PhotoImage对象
+        """
+        if self.image is not None and key == self._key:
+            self.stats['hits'] += 1
+            return self.image
+
+        self.stats['misses'] += 1
+        self.evict()
+
+        image = tk.PhotoImage(master=master, width=width, height=height)
+        image.put(bg_color, to=(0, 0, width, height))
+
+        for x1, x2, y in hlines:
+            row = self._dash_pixels(int(x2) - int(x1), bg_color)
+            if row and 0 <= y < height:
+                image.put("{" + " ".join(row) + "}", to=(max(0, int(x1)), int(y)))
+
+        for x, y1, y2 in vlines:
+            column = self._dash_pixels(int(y2) - int(y1), bg_color)
+            if column and 0 <= x < width:
+                image.put(" ".join("{" + c + "}" for c in column), to=(int(x), max(0, int(y1))))
+
+        self.image = image
+        self._key = key
+        return image
+
+    def _dash_pixels(self, length, bg_color):
+        """生成一段虚线的像素颜色序列"""
+        on, off = self.dash
+        period = on + off
+        return [self.line_color if i % period < on else bg_color for i in range(max(0, length))]
+
+    def evict(self):
+        """淘汰缓存的图片"""
+        if self.image is not None:
+            self.stats['evictions'] += 1
+            self.image = None
+        self._key = None
@@ -7,6 +7,32 @@
 
 import json
 import os
+import threading
+from .persist import ConfigPersister
+
+
+# 数值配置项的取值范围（含端点，None为不限），与设置窗口的限制一致；
+# 热加载时超出范围的值和类型错误的值一样被忽略
+CONFIG_RANGES = {
+    'update_interval': (1, None),
+    'ticker_speed': (1, None),
+    'font_size_name': (1, None),
+    'font_size_price': (1, None),
+    'font_size_change': (1, None),
+    'window_width': (1, None),
+    'window_height': (1, None),
+    'window_width_with_chart': (1, None),
+    'window_width_without_chart': (1, None),
+    'bg_opacity': (0.1, 1.0),
+    'pankou_opacity': (0.1, 1.0),
+    'chart_info_ratio': (0.1, 0.9),
+    'chart_height': (1, None),
+    'config_watch_interval': (0, None),
+    'metrics_dump_interval': (0, None),
+    'fanout_port': (0, 65535),
+    'alert_toast_duration': (0, None),
+    'fetch_workers': (1, None),
+}
 
 
 class ConfigManager:
@@ -20,6 +46,9 @@ class ConfigManager:
         """初始化配置管理器"""
         self.config_file = config_file
         self.config = self.get_default_config()
+        self._last_seen = None  # 最近一次读取或写入的配置文件内容，用于识别外部修改
+        self._last_seen_lock = threading.Lock()
+        self.persister = ConfigPersister(config_file, on_written=self._on_config_written)  # 后台合并、原子写入配置文件
         self.load_config()
     
     def get_default_config(self):
@@ -51,13 +80,45 @@ class ConfigManager:
             # 显示配置
             'show_chart': True,
             'show_price': True,
+            'display_mode': 'single',  # single: 单只股票轮播, ticker: 滚动行情, grid: 迷你分时网格
+            'ticker_speed': 1,  # 滚动行情每帧移动的像素数
+            'label_renderer': 'label',  # 股票信息标签控件：label（轻量Label）或 text（Text控件）
             
             # 分时图配置
             'chart_fixed_percentage': True,
+            'chart_smooth': True,
+            'chart_static_image': False,
             'chart_height': 120,
+            'chart_volume': False,  # 是否在分时图下方显示成交量柱
+            'chart_overlays': [],  # 叠加指标：vwap（均价线）、maN（N分钟均线）、emaN（N分钟指数均线）
             
             # 盘口配置
             'pankou_opacity': 0.95,
+            
+            # 配置文件热加载检查间隔（毫秒），0为关闭
+            'config_watch_interval': 1000,
+            
+            # 性能指标定期写入JSON文件的间隔（秒），0为关闭
+            'metrics_dump_interval': 0,
+            'metrics_dump_file': 'stockbar_metrics.json',
+            
+            # 本机行情分发：fanout_port大于0时在127.0.0.1上发布行情；
+            # quote_source为分发服务地址时订阅行情，不再直接请求上游
+            'fanout_port': 0,
+            'quote_source': '',
+            
+            # 共享内存行情表名称，非空时把行情写入该共享内存供本机其他进程读取
+            'quote_table_name': '',
+            
+            # 价格提醒规则（见README），以及提醒弹窗的显示时长（毫秒）
+            'alerts': [],
+            'alert_toast_duration': 6000,
+            
+            # 同时获取行情的工作线程数，启动时可见股票的第一次请求并行发出
+            'fetch_workers': 4,
+            
+            # 退出时保存最近一次行情的缓存文件，启动时先显示缓存的行情，为空时不使用缓存
+            'quote_cache_file': 'stockbar_quotes.json',
         }
     
     def load_config(self):
@@ -66,6 +127,7 @@ class ConfigManager:
             if os.path.exists(self.config_file):
                 with open(self.config_file, 'r', encoding='utf-8') as f:
                     loaded_config = json.load(f)
+                    self._last_seen = loaded_config
                     
                     # 合并配置，新配置优先，缺失的用默认值
                     for key, default_value in self.get_default_config().items():
@@ -76,19 +138,86 @@ class ConfigManager:
             else:
                 # 使用默认配置并保存
                 self.save_config()
-                
+        
         except Exception as e:
             print(f"加载配置失败: {e}")
             # 出错时使用默认配置
             self.config = self.get_default_config()
     
     def save_config(self):
-        """保存配置文件"""
-        try:
-            with open(self.config_file, 'w', encoding='utf-8') as f:
-                json.dump(self.config, f, ensure_ascii=False, indent=2)
-        except Exception as e:
-            print(f"保存配置失败: {e}")
+        """保存配置文件
+        
+        只提交当前配置的快照，由后台线程合并短时间内的多次保存后原子写入，
+        不阻塞调用线程。
+        """
+        self.persister.save(self.config)
+    
+    def flush_config(self):
+        """立即写入尚未落盘的配置（退出前调用）"""
+        self.persister.flush()
+    
+    def _on_config_written(self, snapshot):
+        """配置写入文件后记录文件的新内容（在写入线程中执行）"""
+        with self._last_seen_lock:
+            self._last_seen = snapshot
+    
+    def reload_changed_keys(self):
+        """重新读取配置文件，应用被外部修改的配置项
+        
+        只比较和校验与最近一次读取或写入的文件内容不同的配置项，
+        本进程自己写入的文件不会覆盖内存中尚未保存的修改。
+        
+        返回:
+            发生变化并已应用的配置项列表；文件无法读取时返回None
+        """
+        # 读取与记录在同一把锁内，期间完成的写入会在之后覆盖记录，记录总是文件的最新内容
+        with self._last_seen_lock:
+            try:
+                with open(self.config_file, 'r', encoding='utf-8') as f:
+                    loaded_config = json.load(f)
+            except Exception as e:
+                print(f"重新加载配置失败: {e}")
+                return None
+            
+            if not isinstance(loaded_config, dict):
+                print("重新加载配置失败: 配置文件格式错误")
+                return None
+            
+            baseline = self._last_seen or {}
+            self._last_seen = loaded_config
+        
+        defaults = self.get_default_config()
+        changed = []
+        for key, value in loaded_config.items():
+            if key not in defaults or baseline.get(key) == value or self.config.get(key) == value:
+                continue
+            if not self._is_valid_value(key, value, defaults[key]):
+                print(f"配置项 {key} 的值无效，已忽略: {value!r}")
+                continue
+            self.config[key] = value
+            changed.append(key)
+        return changed
+    
+    def _is_valid_value(self, key, value, default):
+        """按默认值的类型校验配置项，数值配置项还要在CONFIG_RANGES的范围内"""
+        if key == 'stocks':
+            return isinstance(value, list) and bool(value) and all(
+                isinstance(symbol, str) and symbol for symbol in value)
+        if key == 'chart_overlays':
+            return isinstance(value, list) and all(isinstance(name, str) for name in value)
+        if key == 'alerts':
+            return isinstance(value, list) and all(isinstance(rule, dict) for rule in value)
+        if default is None:
+            # 窗口位置未设置时为None
+            return value is None or (isinstance(value, int) and not isinstance(value, bool))
+        if isinstance(default, bool):
+            return isinstance(value, bool)
+        if isinstance(default, (int, float)):
+            if not isinstance(value, (int, float)) or isinstance(value, bool):
+                return False
+            minimum, maximum = CONFIG_RANGES.get(key, (None, None))
+            return (minimum is None or value >= minimum) and (maximum is None or value <= maximum)
+        return isinstance(value, type(default))
     
     def get_config(self, key, default=None):
         """获取配置项
@@ -213,6 +342,7 @@ class ConfigManager:
         """获取分时图设置"""
         return {
             'fixed_percentage': self.config.get('chart_fixed_percentage', True),
+            'smooth': self.config.get('chart_smooth', True),
             'show_chart': self.config.get('show_chart', True)
         }
     
@@ -221,5 +351,7 @@ class ConfigManager:
         for key, value in settings.items():
             if key == 'fixed_percentage':
                 self.config['chart_fixed_percentage'] = value
+            elif key == 'smooth':
+                self.config['chart_smooth'] = value
             elif key == 'show_chart':
                 self.config['show_chart'] = value
\ No newline at end of file
@@ -5,61 +5,214 @@
 核心应用类 - 主控制器
 """
 
-import tkinter as tk
-import threading
 import time
+import tkinter as tk
 from .ui import StockBarUI
 from .config import ConfigManager
 from .stock import StockDataManager
+from .quote_cache import QuoteCache
+from .watcher import ConfigWatcher
+from .scheduler import TickScheduler
+from .metrics import metrics
+from .profiler import profiler
+
+
 
+# 启动阶段及其说明，boot_times按完成顺序记录各阶段距启动开始的毫秒数
+BOOT_PHASES = {
+    'config': "配置",
+    'network': "发出请求",
+    'window': "创建窗口",
+    'first_paint': "首次绘制",
+    'ready': "就绪",
+    'first_data': "首次行情",
+}
 
 
 class Win11StockBar:
-    """股票工具栏主类"""
+    """股票工具栏主类
     
-    def __init__(self):
+    启动分阶段进行，尽早显示窗口：
+        config: 读取配置，把上次退出时缓存的行情写入股票列表
+        network: 在创建窗口之前一次发出全部可见股票的第一次请求，请求与创建窗口并行进行
+        window: 创建窗口并显示缓存的行情
+        first_paint: 立即映射并绘制窗口，不等待主循环
+        ready: 启动定时刷新、本机行情分发、配置文件监视等其余服务
+        first_data: 第一次请求返回的行情显示到界面
+    """
+    
+    def __init__(self, profile_seconds=None, profile_dir=None, boot_started=None):
+        """初始化应用
+        
+        参数:
+            profile_seconds: 可选，启动后立即进行性能分析的秒数
+            profile_dir: 可选，性能分析报告的输出目录
+            boot_started: 可选，启动开始的时间（perf_counter），默认为创建本对象的时间
+        """
         self.running = True
+        self.profile_seconds = profile_seconds
+        self.profile_dir = profile_dir
         self.root = None
+        self.boot_started = boot_started if boot_started is not None else time.perf_counter()
+        self.boot_times = {}  # 启动阶段 -> 距启动开始的毫秒数
         
         # 初始化各个管理器
         self.config_manager: ConfigManager = ConfigManager()
         self.stock_manager: StockDataManager = StockDataManager()
+        self.quote_cache: QuoteCache = QuoteCache(self.config_manager.get_config('quote_cache_file', ''))
         self.ui: StockBarUI = None
+        self.config_watcher: ConfigWatcher = None
+        self.update_scheduler: TickScheduler = None
         
         # 加载配置
         self.load_config()
+        self.mark_boot_phase('config')
     
     def load_config(self):
         """加载配置"""
         # 配置管理器会自动加载配置
         self.stock_manager.stocks = self.config_manager.get_stocks()
+        self.stock_manager.set_alert_rules(self.config_manager.get_config('alerts', []))
+        self.stock_manager.set_fetch_workers(self.config_manager.get_config('fetch_workers', 4))
+        
+        # 先用上次退出时缓存的行情填充股票列表，第一次请求返回前窗口也有内容
+        for snapshot in self.quote_cache.load():
+            self.stock_manager.apply_snapshot(snapshot)
+    
+    def mark_boot_phase(self, phase):
+        """记录启动阶段完成的时间，同时写入性能指标startup.<阶段>"""
+        if phase in self.boot_times:
+            return
+        elapsed = time.perf_counter() - self.boot_started
+        self.boot_times[phase] = round(elapsed * 1000, 1)
+        metrics.record(f'startup.{phase}', elapsed)
+        if phase == 'first_data':
+            print("启动耗时: " + ", ".join(
+                f"{BOOT_PHASES[name]} {ms:.0f}ms" for name, ms in self.boot_times.items()))
+    
+    def fetch_visible_stocks(self):
+        """一次发出全部可见股票的第一次请求，不等待第一次定时刷新
+        
+        滚动行情和网格模式显示全部股票，向其他实例分发行情时也获取全部股票；
+        单股模式只获取第一只要显示的股票，之后由定时刷新继续轮播。
+        
+        返回:
+            需要显示的股票列表
+        """
+        config = self.config_manager.config
+        stock_manager = self.stock_manager
+        if not stock_manager.stocks:
+            return []
+        if config.get('display_mode', 'single') in ('ticker', 'grid'):
+            stock_manager.fetch_all_stocks_async()
+            return list(stock_manager.stocks)
+        
+        stock = stock_manager.get_current_stock()
+        if config.get('fanout_port', 0) > 0:
+            stock_manager.fetch_all_stocks_async()
+        else:
+            stock_manager.fetch_stock_data_async(stock)
+        return [stock]
     
     def create_ui(self):
-        """创建UI界面"""
+        """分阶段创建UI界面，窗口显示之后再启动其余服务"""
+        # 第一次请求最先发出，在数据获取线程中与下面创建窗口并行进行
+        visible_stocks = self.fetch_visible_stocks()
+        self.mark_boot_phase('network')
+        
         self.root = tk.Tk()
         self.root.title("股票工具栏")
         self.root.overrideredirect(True)  # 无边框窗口
         
-        # 创建UI组件
+        # 创建UI组件，并显示缓存的行情（请求已返回时为最新行情）
         self.ui = StockBarUI(
             self.root, 
             self.config_manager, 
             self.stock_manager
         )
+        self.ui.show_cached_stocks(visible_stocks)
+        self.ui.first_data_callback = lambda: self.mark_boot_phase('first_data')
+        self.mark_boot_phase('window')
+        
+        # 立即映射并绘制窗口，不等到进入主循环
+        self.root.update()
+        self.mark_boot_phase('first_paint')
+        
+        # 启动定时刷新，第一次请求已经发出，从下一个周期开始
+        self.start_update_scheduler(immediate=False)
+        
+        # 本机行情分发：发布给其他实例，或订阅其他实例的行情
+        self.apply_fanout_config()
+        
+        # 监视配置文件，外部修改后无需重启即可生效
+        self.config_watcher = ConfigWatcher(
+            self.root,
+            self.config_manager.config_file,
+            self.on_config_file_changed,
+            self.config_manager.get_config('config_watch_interval', 1000)
+        )
+        self.config_watcher.start()
+        
+        # 按命令行参数或环境变量STOCKBAR_PROFILE启动性能分析
+        if self.profile_seconds:
+            profiler.start(self.profile_seconds, self.profile_dir)
+        else:
+            profiler.start_from_env()
+        
+        # 定期写出性能指标快照，便于统计线上的刷新延迟
+        metrics.start_periodic_dump(
+            self.config_manager.get_config('metrics_dump_file', 'stockbar_metrics.json'),
+            self.config_manager.get_config('metrics_dump_interval', 0)
+        )
+        self.mark_boot_phase('ready')
+    
+    def on_config_file_changed(self):
+        """配置文件被外部修改后，把变化的配置项推送到数据管理器和界面"""
+        keys = self.config_manager.reload_changed_keys()
+        if keys is None:
+            return False
+        if not keys:
+            return True
         
-        # 启动更新线程
-        self.start_update_thread()
+        print(f"配置文件已更新: {', '.join(keys)}")
+        if 'stocks' in keys:
+            self.stock_manager.update_stocks(self.config_manager.get_stocks())
+        if 'config_watch_interval' in keys:
+            self.config_watcher.interval = self.config_manager.get_config('config_watch_interval')
+        if 'update_interval' in keys and self.ui:
+            self.ui.set_update_interval(self.config_manager.get_update_interval())
+        if 'fanout_port' in keys or 'quote_source' in keys or 'quote_table_name' in keys:
+            self.apply_fanout_config()
+        if 'alerts' in keys:
+            self.stock_manager.set_alert_rules(self.config_manager.get_config('alerts'))
+        if 'fetch_workers' in keys:
+            self.stock_manager.set_fetch_workers(self.config_manager.get_config('fetch_workers'))
+        if 'quote_cache_file' in keys:
+            self.quote_cache.path = self.config_manager.get_config('quote_cache_file')
+        if self.ui:
+            self.ui.apply_config_changes(keys)
+        return True
+    
+    def apply_fanout_config(self):
+        """按配置启动或停止本机行情分发服务、订阅和共享内存行情表"""
+        self.stock_manager.start_fanout_server(self.config_manager.get_config('fanout_port', 0))
+        self.stock_manager.set_quote_source(self.config_manager.get_config('quote_source', ''))
+        self.stock_manager.start_quote_table(self.config_manager.get_config('quote_table_name', ''))
     
-    def start_update_thread(self):
-        """启动更新线程"""
-        def update_loop():
-            while self.running:
-                if self.root:
-                    self.root.after(0, self.update_stock_info)
-                time.sleep(self.config_manager.get_update_interval())
-        
-        update_thread = threading.Thread(target=update_loop, daemon=True)
-        update_thread.start()
+    def start_update_scheduler(self, immediate=True):
+        """启动定时刷新，由主线程上的after驱动，不再占用单独的线程
+        
+        参数:
+            immediate: 是否立即刷新一次
+        """
+        self.update_scheduler = TickScheduler(
+            self.root,
+            self.update_stock_info,
+            self.config_manager.get_update_interval()
+        )
+        self.ui.update_scheduler = self.update_scheduler
+        self.stock_manager.set_refresh_interval(self.config_manager.get_update_interval())
+        self.update_scheduler.start(immediate)
     
     def update_stock_info(self):
         """更新股票信息"""
@@ -73,12 +226,36 @@ class Win11StockBar:
             self.root.mainloop()
         except KeyboardInterrupt:
             self.close_app()
+        finally:
+            # 无论从菜单关闭还是中断退出，主循环结束后都在这里停止服务并保存行情和配置
+            self.shutdown()
     
     def close_app(self):
-        """关闭应用"""
-        self.running = False
-        if self.root:
+        """关闭应用，由界面收起弹窗、执行等待中的防抖任务并退出主循环"""
+        if self.ui:
+            self.ui.close_app()
+        elif self.root:
             self.root.quit()
-            
-        # 保存配置
-        self.config_manager.save_config()
\ No newline at end of file
+    
+    def shutdown(self):
+        """停止各项服务，保存最近一次行情和配置（主循环结束后执行，只执行一次）"""
+        if not self.running:
+            return
+        self.running = False
+        if self.update_scheduler:
+            self.update_scheduler.stop()
+        if self.config_watcher:
+            self.config_watcher.stop()
+        metrics.stop_periodic_dump()
+        self.stock_manager.stop_fanout_server()
+        self.stock_manager.set_quote_source(None)
+        self.stock_manager.stop_quote_table()
+        
+        # 保存最近一次行情，下次启动时先显示
+        self.quote_cache.save([self.stock_manager.get_snapshot(stock, include_series=True)
+                               for stock in self.stock_manager.stocks])
+        
+        # 保存配置并立即写入，结束进行中的性能分析
+        self.config_manager.save_config()
+        self.config_manager.flush_config()
+        profiler.stop(wait=True)
\ No newline at end of file
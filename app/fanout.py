@@ -0,0 +1,322 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+本机行情分发模块
+
+一个进程向上游获取行情，通过HTTP和Server-Sent Events分发给本机的其他工具栏实例，
+订阅者数量不影响上游的请求量。
+"""
+
+import http.client
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from queue import Empty, Full, Queue
+from urllib.parse import parse_qs, urlencode, urlparse
+
+from .metrics import metrics
+
+
+# 每个订阅者最多缓存的未发送事件数，慢速订阅者超出时丢弃最旧的事件
+SUBSCRIBER_QUEUE_SIZE = 256
+
+# 没有新行情时发送心跳注释的间隔（秒），用于发现已断开的连接，
+# 订阅端也借此及时响应停止和重新订阅
+HEARTBEAT_INTERVAL = 5
+
+# 订阅端断线后重连的等待时间（秒），连续失败时翻倍，不超过最大值
+RECONNECT_DELAY = 1
+MAX_RECONNECT_DELAY = 30
+
+
+def parse_symbols(value):
+    """解析逗号分隔的股票代码列表，为空时返回None（表示全部）"""
+    if not value:
+        return None
+    symbols = {symbol.strip() for symbol in value.split(',') if symbol.strip()}
+    return symbols or None
+
+
+class QuoteSubscription:
+    """一个订阅者的事件队列"""
+    
+    def __init__(self, symbols):
+        """初始化订阅
+        
+        参数:
+            symbols: 订阅的股票代码集合，为None时订阅全部
+        """
+        self.symbols = symbols
+        self.queue = Queue(SUBSCRIBER_QUEUE_SIZE)
+        self.dropped = 0
+    
+    def wants(self, symbol):
+        """是否订阅了该股票"""
+        return self.symbols is None or symbol in self.symbols
+    
+    def put(self, event):
+        """放入一条已编码的事件，队列已满时丢弃最旧的一条"""
+        while True:
+            try:
+                self.queue.put_nowait(event)
+                return
+            except Full:
+                try:
+                    self.queue.get_nowait()
+                    self.dropped += 1
+                    metrics.increment('fanout.dropped')
+                except Empty:
+                    pass
+
+
+class QuoteFanoutServer:
+    """本机行情分发服务
+    
+    GET /quotes 返回最新的行情快照列表，GET /events 以Server-Sent Events推送行情，
+    连接时先发送已有的最新快照。两者都可以用symbols参数（逗号分隔）只获取部分股票。
+    每条快照只编码一次，再放入各订阅者的队列，由各连接的线程发送。
+    订阅了数据获取部分没有关注的股票时，通过on_watch/on_unwatch通知加入或移出获取列表。
+    """
+    
+    def __init__(self, host='127.0.0.1', port=8765, on_watch=None, on_unwatch=None):
+        """初始化分发服务
+        
+        参数:
+            host: 监听地址，默认只接受本机连接
+            port: 监听端口
+            on_watch: 可选，订阅者开始关注某只股票时的回调，参数为股票代码
+            on_unwatch: 可选，订阅者不再关注某只股票时的回调，参数为股票代码
+        """
+        self.host = host
+        self.port = port
+        self.on_watch = on_watch
+        self.on_unwatch = on_unwatch
+        self._lock = threading.Lock()
+        self._latest = {}  # 股票代码 -> (快照, 已编码的事件)
+        self._subscriptions = set()
+        self._httpd = None
+    
+    def start(self):
+        """在后台线程中开始监听"""
+        if self._httpd is not None:
+            return
+        handler = type('QuoteRequestHandler', (QuoteRequestHandler,), {'fanout': self})
+        self._httpd = ThreadingHTTPServer((self.host, self.port), handler)
+        self._httpd.daemon_threads = True
+        self.port = self._httpd.server_address[1]
+        threading.Thread(target=self._httpd.serve_forever, name="quote-fanout", daemon=True).start()
+    
+    def stop(self):
+        """停止监听并断开所有订阅者"""
+        if self._httpd is None:
+            return
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        self._httpd = None
+        with self._lock:
+            subscriptions = list(self._subscriptions)
+        for subscription in subscriptions:
+            subscription.put(None)
+    
+    def publish(self, snapshot):
+        """发布一只股票的行情快照（可从任意线程调用）"""
+        symbol = snapshot['symbol']
+        data = json.dumps(snapshot, ensure_ascii=False, separators=(',', ':'))
+        event = f"event: quote\nid: {symbol}\ndata: {data}\n\n".encode('utf-8')
+        with self._lock:
+            self._latest[symbol] = (snapshot, event)
+            subscriptions = [s for s in self._subscriptions if s.wants(symbol)]
+        for subscription in subscriptions:
+            subscription.put(event)
+        metrics.increment('fanout.published')
+    
+    def get_quotes(self, symbols=None):
+        """获取最新的行情快照列表"""
+        with self._lock:
+            return [snapshot for symbol, (snapshot, _) in self._latest.items()
+                    if symbols is None or symbol in symbols]
+    
+    def subscribe(self, symbols):
+        """新增订阅者，返回订阅对象和需要先发送的最新事件"""
+        subscription = QuoteSubscription(symbols)
+        with self._lock:
+            self._subscriptions.add(subscription)
+            initial = [event for symbol, (_, event) in self._latest.items() if subscription.wants(symbol)]
+        if symbols and self.on_watch:
+            for symbol in symbols:
+                self.on_watch(symbol)
+        return subscription, initial
+    
+    def unsubscribe(self, subscription):
+        """移除订阅者"""
+        with self._lock:
+            self._subscriptions.discard(subscription)
+        if subscription.symbols and self.on_unwatch:
+            for symbol in subscription.symbols:
+                self.on_unwatch(symbol)
+    
+    def get_stats(self):
+        """获取分发统计"""
+        with self._lock:
+            return {
+                'port': self.port,
+                'subscribers': len(self._subscriptions),
+                'symbols': len(self._latest),
+            }
+
+
+class QuoteRequestHandler(BaseHTTPRequestHandler):
+    """分发服务的请求处理，fanout属性在QuoteFanoutServer.start中设置"""
+    
+    fanout = None
+    
+    def do_GET(self):
+        """处理GET请求"""
+        url = urlparse(self.path)
+        symbols = parse_symbols(parse_qs(url.query).get('symbols', [''])[0])
+        if url.path == '/quotes':
+            self._send_quotes(symbols)
+        elif url.path == '/events':
+            self._stream_events(symbols)
+        else:
+            self.send_error(404)
+    
+    def _send_quotes(self, symbols):
+        """返回最新的行情快照列表"""
+        body = json.dumps(self.fanout.get_quotes(symbols), ensure_ascii=False).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def _stream_events(self, symbols):
+        """以Server-Sent Events持续推送行情，直到连接断开或服务停止"""
+        subscription, initial = self.fanout.subscribe(symbols)
+        try:
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/event-stream; charset=utf-8')
+            self.send_header('Cache-Control', 'no-cache')
+            self.end_headers()
+            for event in initial:
+                self.wfile.write(event)
+            self.wfile.flush()
+            
+            while True:
+                try:
+                    event = subscription.queue.get(timeout=HEARTBEAT_INTERVAL)
+                except Empty:
+                    event = b": ping\n\n"
+                if event is None:
+                    break
+                self.wfile.write(event)
+                self.wfile.flush()
+        except OSError:
+            # 订阅者已断开
+            pass
+        finally:
+            self.fanout.unsubscribe(subscription)
+    
+    def log_message(self, format, *args):
+        """不输出每个请求的访问日志"""
+
+
+class QuoteSubscriber:
+    """订阅本机分发服务的行情
+    
+    在后台线程中保持一个Server-Sent Events连接，收到的每条快照交给on_snapshot处理。
+    断线后按递增的间隔重连；connected表示当前是否已连接，
+    未连接时数据获取部分仍直接请求上游。
+    """
+    
+    def __init__(self, url, get_symbols, on_snapshot):
+        """初始化订阅端
+        
+        参数:
+            url: 分发服务地址，如 http://127.0.0.1:8765
+            get_symbols: 返回当前需要订阅的股票代码列表的函数
+            on_snapshot: 收到快照时的回调（在订阅线程中执行），参数为快照字典
+        """
+        self.url = url.rstrip('/')
+        self.get_symbols = get_symbols
+        self.on_snapshot = on_snapshot
+        self.connected = False
+        self._stop = threading.Event()
+        self._resubscribing = False
+        self._thread = None
+    
+    def start(self):
+        """开始订阅"""
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="quote-subscriber", daemon=True)
+            self._thread.start()
+    
+    def stop(self):
+        """停止订阅，订阅线程在收到下一行数据或心跳时退出"""
+        self._stop.set()
+        self._thread = None
+        self.connected = False
+    
+    def resubscribe(self):
+        """股票列表变化后按新的列表重新订阅"""
+        self._resubscribing = True
+    
+    def _run(self):
+        """订阅线程：连接、读取事件、断线重连"""
+        delay = RECONNECT_DELAY
+        while not self._stop.is_set():
+            started = time.monotonic()
+            try:
+                self._listen()
+            except Exception as e:
+                if not self._stop.is_set() and not self._resubscribing:
+                    print(f"订阅行情分发服务失败: {e}")
+            self.connected = False
+            if self._stop.is_set():
+                break
+            if self._resubscribing:
+                # 按新的股票列表立即重连
+                self._resubscribing = False
+                delay = RECONNECT_DELAY
+                continue
+            
+            # 连接保持过一段时间后断开时从最短的等待开始，否则逐步延长等待
+            if time.monotonic() - started > MAX_RECONNECT_DELAY:
+                delay = RECONNECT_DELAY
+            metrics.increment('subscribe.reconnects')
+            self._stop.wait(delay)
+            delay = min(delay * 2, MAX_RECONNECT_DELAY)
+    
+    def _listen(self):
+        """建立一次连接并处理事件直到断开"""
+        self._resubscribing = False
+        url = urlparse(self.url)
+        query = urlencode({'symbols': ','.join(self.get_symbols())})
+        # 用http.client逐行读取，事件到达即可处理；连接只在本线程中关闭，其他线程只设置标志
+        connection = http.client.HTTPConnection(url.hostname, url.port or 80, timeout=HEARTBEAT_INTERVAL * 3)
+        try:
+            connection.request('GET', f"{url.path.rstrip('/')}/events?{query}")
+            response = connection.getresponse()
+            if response.status != 200:
+                raise ConnectionError(f"HTTP {response.status}")
+            self.connected = True
+            
+            data_lines = []
+            while not self._stop.is_set() and not self._resubscribing:
+                line = response.readline()
+                if not line:
+                    break
+                line = line.decode('utf-8').rstrip('\r\n')
+                if line.startswith('data:'):
+                    data_lines.append(line[5:].lstrip())
+                elif not line and data_lines:
+                    # 空行表示一条事件结束
+                    snapshot = json.loads('\n'.join(data_lines))
+                    data_lines = []
+                    metrics.increment('subscribe.snapshots')
+                    self.on_snapshot(snapshot)
+        finally:
+            connection.close()
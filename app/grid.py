@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+自选股迷你分时网格视图模块
+"""
+
+import tkinter as tk
+from .chart import sparkline_points
+from .utils import get_change_color
+
+
+class SparklineGridView:
+    """自选股迷你分时网格
+    
+    每只股票占一个单元格，包含名称、涨跌幅和一条迷你分时线，全部绘制在同一个
+    Canvas上。单元格按股票代码记录脏标记，只有行情变化的单元格会被重绘；
+    重绘时也只对变化的部分调用coords/itemconfigure。
+    """
+    
+    def __init__(self, parent, stock_manager, bg_color, text_color,
+                 cell_width=120, cell_height=36, font_size=8):
+        """初始化网格视图
+        
+        参数:
+            parent: 父组件
+            stock_manager: 股票数据管理器，提供自选股列表
+            bg_color: 背景颜色
+            text_color: 名称和分时线的颜色
+            cell_width: 单元格宽度
+            cell_height: 单元格高度
+            font_size: 字体大小
+        """
+        self.stock_manager = stock_manager
+        self.text_color = text_color
+        self.cell_width = cell_width
+        self.cell_height = cell_height
+        self._set_font(font_size)
+        
+        self.canvas = tk.Canvas(parent, bg=bg_color, highlightthickness=0, relief=tk.FLAT)
+        self.canvas.pack(fill=tk.BOTH, expand=True)
+        
+        self.cells = {}  # 股票代码 -> 单元格
+        self.dirty = set()  # 需要重绘的股票代码
+        self.columns = 1
+        
+        self.canvas.bind('<Configure>', self._on_resize)
+    
+    def _set_font(self, font_size):
+        """设置字体和文字行高"""
+        self.font = ("Microsoft YaHei", font_size)
+        self.text_height = font_size + 6
+    
+    def set_colors(self, bg_color, text_color):
+        """就地修改背景色、名称和分时线颜色"""
+        self.text_color = text_color
+        self.canvas.configure(bg=bg_color)
+        for cell in self.cells.values():
+            self.canvas.itemconfigure(cell['name_item'], fill=text_color)
+            self.canvas.itemconfigure(cell['line_item'], fill=text_color)
+    
+    def set_font_size(self, font_size):
+        """就地修改字体大小，分时线位置依赖文字行高，需要重新计算"""
+        if self.font[1] == font_size:
+            return
+        self._set_font(font_size)
+        for symbol, cell in self.cells.items():
+            self.canvas.itemconfigure(cell['name_item'], font=self.font)
+            self.canvas.itemconfigure(cell['change_item'], font=self.font)
+            cell['version'] = None
+            self.dirty.add(symbol)
+        self.flush()
+    
+    def _on_resize(self, event):
+        """画布宽度变化时重新排列单元格"""
+        columns = max(1, event.width // self.cell_width)
+        if columns != self.columns or not self.cells:
+            self.columns = columns
+            self.layout()
+    
+    def layout(self):
+        """按当前自选股列表排列单元格，已有单元格只移动位置"""
+        stocks = self.stock_manager.stocks
+        symbols = [stock['symbol'] for stock in stocks]
+        
+        # 删除已不在自选股列表中的单元格
+        for symbol in list(self.cells):
+            if symbol not in symbols:
+                self.canvas.delete(self.cells.pop(symbol)['tag'])
+        
+        for position, symbol in enumerate(symbols):
+            row, column = divmod(position, self.columns)
+            x = column * self.cell_width
+            y = row * self.cell_height
+            
+            cell = self.cells.get(symbol)
+            if cell is None:
+                cell = self._create_cell(symbol, x, y)
+                self.cells[symbol] = cell
+            elif (cell['x'], cell['y']) != (x, y):
+                self.canvas.move(cell['tag'], x - cell['x'], y - cell['y'])
+                cell['x'], cell['y'] = x, y
+                # 分时线坐标依赖单元格位置，需要重新计算
+                cell['version'] = None
+            self.dirty.add(symbol)
+        
+        self.flush()
+    
+    def _create_cell(self, symbol, x, y):
+        """创建一个单元格的图元"""
+        tag = f"cell_{symbol}"
+        return {
+            'x': x,
+            'y': y,
+            'tag': tag,
+            'texts': (None, None),
+            'version': None,
+            'line_visible': False,
+            'name_item': self.canvas.create_text(
+                x + 4, y + 2, text="", fill=self.text_color, font=self.font,
+                anchor='nw', tags=(tag, 'grid')),
+            'change_item': self.canvas.create_text(
+                x + self.cell_width - 4, y + 2, text="", fill=self.text_color, font=self.font,
+                anchor='ne', tags=(tag, 'grid')),
+            'line_item': self.canvas.create_line(
+                0, 0, 0, 0, fill=self.text_color, width=1, state='hidden',
+                tags=(tag, 'grid')),
+        }
+    
+    def mark_dirty(self, stock):
+        """标记某只股票的单元格需要重绘"""
+        if stock['symbol'] in self.cells:
+            self.dirty.add(stock['symbol'])
+        else:
+            # 自选股列表发生了变化
+            self.layout()
+    
+    def flush(self):
+        """重绘所有被标记的单元格"""
+        if not self.dirty:
+            return
+        stocks = {stock['symbol']: stock for stock in self.stock_manager.stocks}
+        for symbol in self.dirty:
+            cell = self.cells.get(symbol)
+            stock = stocks.get(symbol)
+            if cell and stock:
+                self._render_cell(cell, stock)
+        self.dirty.clear()
+    
+    def _render_cell(self, cell, stock):
+        """重绘一个单元格，只修改变化的部分"""
+        name_text = stock.get('name', '')
+        change_text = stock.get('change', '--')
+        old_name, old_change = cell['texts']
+        if name_text != old_name:
+            self.canvas.itemconfigure(cell['name_item'], text=name_text)
+        if change_text != old_change:
+            self.canvas.itemconfigure(cell['change_item'], text=change_text,
+                                      fill=get_change_color(change_text))
+        cell['texts'] = (name_text, change_text)
+        
+        # 分时序列未更新时不重算分时线
+        version = stock.get('series_version')
+        if version == cell['version']:
+            return
+        cell['version'] = version
+        
+        points = []
+        series = stock.get('series')
+        if series:
+            points = sparkline_points(
+                series,
+                cell['x'] + 4, cell['y'] + self.text_height,
+                self.cell_width - 8, self.cell_height - self.text_height - 3,
+                stock.get('yesterday_close')
+            )
+        visible = len(points) >= 4
+        if visible:
+            self.canvas.coords(cell['line_item'], points)
+        if visible != cell['line_visible']:
+            self.canvas.itemconfigure(cell['line_item'], state='normal' if visible else 'hidden')
+            cell['line_visible'] = visible
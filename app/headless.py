@@ -0,0 +1,291 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+无界面模式 - 只运行数据获取部分，以JSON Lines输出行情快照
+
+本模块及其依赖不导入tkinter，可以在服务器和容器中运行。
+行情写到标准输出时，运行期间的提示信息改写到标准错误，不会混入输出。
+"""
+
+import contextlib
+import heapq
+import itertools
+import json
+import os
+import sys
+import threading
+import time
+
+from .config import ConfigManager
+from .stock import StockDataManager
+from .watcher import ConfigWatcher
+from .scheduler import TickScheduler
+from .metrics import metrics
+from .profiler import profiler
+
+
+# --once模式下等待全部股票返回的最长时间（秒）
+ONCE_TIMEOUT = 30
+
+
+class HeadlessLoop:
+    """代替Tk主循环的事件循环
+    
+    提供TickScheduler和ConfigWatcher用到的after、after_cancel、mainloop和quit，
+    所有任务在调用mainloop的线程上依次执行。after可以从任意线程调用，
+    数据获取线程通过after(0, ...)把结果交给主循环处理，与界面模式相同。
+    """
+    
+    def __init__(self):
+        """初始化事件循环"""
+        self._condition = threading.Condition()
+        self._heap = []  # (计划时间, 序号, 任务编号)
+        self._jobs = {}  # 任务编号 -> (函数, 参数)，取消的任务从这里删除
+        self._counter = itertools.count(1)
+        self._running = False
+    
+    def after(self, ms, func, *args):
+        """ms毫秒后在主循环中执行func，返回任务编号"""
+        with self._condition:
+            sequence = next(self._counter)
+            job = f"after#{sequence}"
+            self._jobs[job] = (func, args)
+            heapq.heappush(self._heap, (time.perf_counter() + ms / 1000.0, sequence, job))
+            self._condition.notify()
+        return job
+    
+    def after_cancel(self, job):
+        """取消尚未执行的任务"""
+        with self._condition:
+            self._jobs.pop(job, None)
+    
+    def mainloop(self):
+        """执行任务直到调用quit"""
+        with self._condition:
+            self._running = True
+        while True:
+            with self._condition:
+                task = self._next_task()
+            if task is None:
+                return
+            func, args = task
+            try:
+                func(*args)
+            except Exception as e:
+                print(f"执行定时任务失败: {e}")
+    
+    def _next_task(self):
+        """等待下一个到期的任务，已调用quit时返回None（需持有锁）"""
+        while self._running:
+            if not self._heap:
+                self._condition.wait()
+                continue
+            due, _, job = self._heap[0]
+            if job not in self._jobs:
+                heapq.heappop(self._heap)
+                continue
+            delay = due - time.perf_counter()
+            if delay > 0:
+                self._condition.wait(delay)
+                continue
+            heapq.heappop(self._heap)
+            return self._jobs.pop(job)
+        return None
+    
+    def quit(self):
+        """结束mainloop"""
+        with self._condition:
+            self._running = False
+            self._condition.notify()
+
+
+class JsonLinesWriter:
+    """按行写出JSON记录，每行写完立即刷新，便于tail -f和管道消费"""
+    
+    def __init__(self, path=None):
+        """初始化写出器
+        
+        参数:
+            path: 输出文件路径（追加写入），为None或'-'时写到标准输出
+        """
+        if path in (None, '-'):
+            self.stream = sys.stdout
+            self._owns_stream = False
+        else:
+            self.stream = open(path, 'a', encoding='utf-8')
+            self._owns_stream = True
+    
+    def write(self, record):
+        """写出一条记录，下游已关闭时抛出BrokenPipeError"""
+        try:
+            self.stream.write(json.dumps(record, ensure_ascii=False, separators=(',', ':')) + '\n')
+            self.stream.flush()
+        except BrokenPipeError:
+            if not self._owns_stream:
+                # 避免解释器退出时再次刷新标准输出而报错
+                devnull = os.open(os.devnull, os.O_WRONLY)
+                os.dup2(devnull, self.stream.fileno())
+                os.close(devnull)
+            raise
+    
+    def close(self):
+        """关闭输出文件"""
+        if self._owns_stream:
+            self.stream.close()
+
+
+class HeadlessStockFeed:
+    """无界面行情输出
+    
+    按配置文件中的股票列表和刷新间隔获取行情，每只股票每次获取完成后
+    输出一行快照。刷新节拍、配置文件监视和请求取消与界面模式共用同一套实现。
+    """
+    
+    def __init__(self, output=None, once=False, include_series=False):
+        """初始化无界面行情输出
+        
+        参数:
+            output: 输出文件路径，为None或'-'时写到标准输出
+            once: 是否只获取一轮后退出
+            include_series: 快照中是否包含分时价格序列
+        """
+        self.once = once
+        self.include_series = include_series
+        self.root = HeadlessLoop()
+        self.writer = JsonLinesWriter(output)
+        self._waiting = set()  # --once模式下尚未返回的股票代码
+        
+        with contextlib.redirect_stdout(sys.stderr):
+            self.config_manager: ConfigManager = ConfigManager()
+            self.stock_manager: StockDataManager = StockDataManager()
+            self.stock_manager.stocks = self.config_manager.get_stocks()
+            self.stock_manager.set_alert_rules(self.config_manager.get_config('alerts', []))
+            self.stock_manager.set_fetch_workers(self.config_manager.get_config('fetch_workers', 4))
+        self.stock_manager.set_update_callback(self.on_stock_data_updated)
+        self.stock_manager.set_alert_callback(self.on_alerts_triggered)
+        self.config_watcher: ConfigWatcher = None
+        self.update_scheduler: TickScheduler = None
+    
+    def start(self):
+        """启动刷新、配置文件监视和性能指标写出"""
+        interval = self.config_manager.get_update_interval()
+        self.stock_manager.set_refresh_interval(interval)
+        
+        if self.once:
+            self.root.after(0, self.update_stock_info)
+            self.root.after(ONCE_TIMEOUT * 1000, self.root.quit)
+        else:
+            self.update_scheduler = TickScheduler(self.root, self.update_stock_info, interval)
+            self.update_scheduler.start()
+            
+            self.config_watcher = ConfigWatcher(
+                self.root,
+                self.config_manager.config_file,
+                self.on_config_file_changed,
+                self.config_manager.get_config('config_watch_interval', 1000)
+            )
+            self.config_watcher.start()
+        
+        self.apply_fanout_config()
+        profiler.start_from_env()
+        metrics.start_periodic_dump(
+            self.config_manager.get_config('metrics_dump_file', 'stockbar_metrics.json'),
+            self.config_manager.get_config('metrics_dump_interval', 0)
+        )
+    
+    def update_stock_info(self):
+        """获取全部股票的行情"""
+        if self.once:
+            self._waiting = {stock['symbol'] for stock in self.stock_manager.stocks}
+        self.stock_manager.fetch_all_stocks_async()
+    
+    def on_stock_data_updated(self, stock):
+        """股票数据更新回调（在数据获取线程中执行）"""
+        self.root.after(0, self.write_snapshot, stock)
+    
+    def on_alerts_triggered(self, alerts):
+        """价格提醒回调（在数据获取线程中执行）"""
+        self.root.after(0, self.report_alerts, alerts)
+    
+    def report_alerts(self, alerts):
+        """把触发的提醒输出到标准错误，不混入行情输出（在主循环中执行）"""
+        for alert in alerts:
+            print(f"价格提醒: {alert['message']}")
+    
+    def write_snapshot(self, stock):
+        """输出一只股票的行情快照（在主循环中执行）"""
+        try:
+            self.writer.write(self.stock_manager.get_snapshot(stock, self.include_series))
+        except BrokenPipeError:
+            # 下游已关闭（如管道到head），结束运行
+            self.root.quit()
+            return
+        
+        requested_at = stock.get('_requested_at')
+        if requested_at is not None:
+            metrics.record('latency.tick_to_output', time.perf_counter() - requested_at)
+        
+        if self.once:
+            self._waiting.discard(stock['symbol'])
+            if not self._waiting:
+                self.root.quit()
+    
+    def on_config_file_changed(self):
+        """配置文件被外部修改后，更新股票列表、刷新间隔和检查间隔"""
+        keys = self.config_manager.reload_changed_keys()
+        if keys is None:
+            return False
+        if not keys:
+            return True
+        
+        print(f"配置文件已更新: {', '.join(keys)}")
+        if 'stocks' in keys:
+            self.stock_manager.update_stocks(self.config_manager.get_stocks())
+        if 'config_watch_interval' in keys:
+            self.config_watcher.interval = self.config_manager.get_config('config_watch_interval')
+        if 'update_interval' in keys:
+            interval = self.config_manager.get_update_interval()
+            self.update_scheduler.set_interval(interval)
+            self.stock_manager.set_refresh_interval(interval)
+        if 'fanout_port' in keys or 'quote_source' in keys or 'quote_table_name' in keys:
+            self.apply_fanout_config()
+        if 'alerts' in keys:
+            self.stock_manager.set_alert_rules(self.config_manager.get_config('alerts'))
+        if 'fetch_workers' in keys:
+            self.stock_manager.set_fetch_workers(self.config_manager.get_config('fetch_workers'))
+        return True
+    
+    def apply_fanout_config(self):
+        """按配置启动或停止本机行情分发服务、订阅和共享内存行情表，--once模式下不启动"""
+        if self.once:
+            return
+        self.stock_manager.start_fanout_server(self.config_manager.get_config('fanout_port', 0))
+        self.stock_manager.set_quote_source(self.config_manager.get_config('quote_source', ''))
+        self.stock_manager.start_quote_table(self.config_manager.get_config('quote_table_name', ''))
+    
+    def run(self):
+        """运行直到被中断（--once模式下获取一轮后返回）"""
+        with contextlib.redirect_stdout(sys.stderr):
+            self.start()
+            try:
+                self.root.mainloop()
+            except KeyboardInterrupt:
+                pass
+            finally:
+                self.stop()
+    
+    def stop(self):
+        """停止刷新并关闭输出"""
+        if self.update_scheduler:
+            self.update_scheduler.stop()
+        if self.config_watcher:
+            self.config_watcher.stop()
+        metrics.stop_periodic_dump()
+        profiler.stop(wait=True)
+        self.stock_manager.stop_fanout_server()
+        self.stock_manager.set_quote_source(None)
+        self.stock_manager.stop_quote_table()
+        self.root.quit()
+        self.config_manager.flush_config()
+        self.writer.close()
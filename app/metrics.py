@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+性能指标模块，提供计数器和延迟直方图
+"""
+
+import functools
+import json
+import os
+import tempfile
+import threading
+import time
+
+
+# 直方图保留的有效二进制位数（含最高位），8位即每个数量级128个子桶，
+# 桶下界与实际值的相对误差小于1/128（约0.8%）
+SUB_BUCKET_BITS = 8
+
+
+class Histogram:
+    """HDR风格的延迟直方图
+    
+    以微秒为单位记录，按对数-线性分桶：数值的最高位决定数量级，
+    连同最高位在内保留SUB_BUCKET_BITS位有效位决定子桶，
+    每个数量级2**(SUB_BUCKET_BITS-1)个子桶，任意量级下的相对误差都小于1%，
+    内存只与出现过的桶数有关。记录和查询都需要持有注册表的锁。
+    """
+    
+    def __init__(self):
+        """初始化直方图"""
+        self.buckets = {}  # 桶下界（微秒）-> 次数
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = None
+    
+    def record(self, value_us):
+        """记录一个数值（微秒）"""
+        value_us = max(0, int(value_us))
+        shift = max(0, value_us.bit_length() - SUB_BUCKET_BITS)
+        bucket = (value_us >> shift) << shift
+        self.buckets[bucket] = self.buckets.get(bucket, 0) + 1
+        self.count += 1
+        self.total += value_us
+        if self.min is None or value_us < self.min:
+            self.min = value_us
+        if self.max is None or value_us > self.max:
+            self.max = value_us
+    
+    def percentile(self, percent):
+        """获取百分位数（微秒），返回所在桶的下界"""
+        if not self.count:
+            return 0
+        target = max(1, self.count * percent / 100.0)
+        seen = 0
+        for bucket in sorted(self.buckets):
+            seen += self.buckets[bucket]
+            if seen >= target:
+                return bucket
+        return self.max
+    
+    def summary(self):
+        """获取统计摘要，时间单位为毫秒"""
+        if not self.count:
+            return {'count': 0}
+        return {
+            'count': self.count,
+            'min_ms': self.min / 1000.0,
+            'mean_ms': self.total / self.count / 1000.0,
+            'p50_ms': self.percentile(50) / 1000.0,
+            'p90_ms': self.percentile(90) / 1000.0,
+            'p99_ms': self.percentile(99) / 1000.0,
+            'p999_ms': self.percentile(99.9) / 1000.0,
+            'max_ms': self.max / 1000.0,
+        }
+
+
+class MetricsRegistry:
+    """进程内指标注册表
+    
+    计数器和直方图按名称在首次使用时创建，可从任意线程记录。
+    snapshot返回可直接序列化为JSON的快照，start_periodic_dump
+    在后台线程中定期把快照写入文件。
+    """
+    
+    def __init__(self):
+        """初始化注册表"""
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._histograms = {}
+        self._started = time.time()
+        self._dump_stop = None
+    
+    def increment(self, name, amount=1):
+        """计数器加一（或指定数量）"""
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + amount
+    
+    def record(self, name, seconds):
+        """向直方图记录一次耗时
+        
+        参数:
+            name: 直方图名称
+            seconds: 耗时（秒）
+        """
+        with self._lock:
+            histogram = self._histograms.get(name)
+            if histogram is None:
+                histogram = self._histograms[name] = Histogram()
+            histogram.record(seconds * 1000000)
+    
+    def timed(self, name):
+        """装饰器：记录函数每次调用的耗时"""
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    self.record(name, time.perf_counter() - start)
+            return wrapper
+        return decorator
+    
+    def snapshot(self):
+        """获取当前所有指标的快照
+        
+        返回:
+            字典，包含时间戳、运行时长、计数器和各直方图的百分位数（毫秒）
+        """
+        with self._lock:
+            return {
+                'timestamp': time.time(),
+                'uptime': time.time() - self._started,
+                'counters': dict(self._counters),
+                'histograms': {name: histogram.summary()
+                               for name, histogram in self._histograms.items()},
+            }
+    
+    def reset(self):
+        """清空所有指标"""
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+            self._started = time.time()
+    
+    def dump_json(self, path):
+        """将快照原子写入JSON文件"""
+        snapshot = self.snapshot()
+        directory = os.path.dirname(os.path.abspath(path))
+        fd, temp_path = tempfile.mkstemp(dir=directory, prefix=".metrics.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(snapshot, f, ensure_ascii=False, indent=2)
+            os.replace(temp_path, path)
+        except BaseException:
+            try:
+                os.unlink(temp_path)
+            except OSError:
+                pass
+            raise
+    
+    def start_periodic_dump(self, path, interval):
+        """在后台线程中每隔interval秒把快照写入path
+        
+        参数:
+            path: JSON文件路径
+            interval: 写入间隔（秒），小于等于0时不启动
+        """
+        self.stop_periodic_dump()
+        if interval <= 0:
+            return
+        stop = self._dump_stop = threading.Event()
+        
+        def loop():
+            while not stop.wait(interval):
+                try:
+                    self.dump_json(path)
+                except Exception as e:
+                    print(f"写入性能指标失败: {e}")
+        
+        threading.Thread(target=loop, name="metrics-dump", daemon=True).start()
+    
+    def stop_periodic_dump(self):
+        """停止定期写入"""
+        if self._dump_stop is not None:
+            self._dump_stop.set()
+            self._dump_stop = None
+
+
+# 全局指标注册表
+metrics = MetricsRegistry()
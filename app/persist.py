@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+配置文件后台写入模块
+"""
+
+import atexit
+import copy
+import json
+import os
+import tempfile
+import threading
+import time
+
+
+class ConfigPersister:
+    """配置文件后台写入器
+    
+    save只记录最新的配置快照并立即返回，后台线程在最后一次提交后等待delay秒
+    再写入，期间的多次提交合并为一次。写入先写临时文件并fsync，再用os.replace
+    替换原文件，写到一半崩溃也不会留下残缺的配置文件。
+    退出前调用flush（同时注册了atexit）写入尚未落盘的快照。
+    """
+    
+    def __init__(self, path, delay=0.5, on_written=None):
+        """初始化写入器
+        
+        参数:
+            path: 配置文件路径
+            delay: 合并写入的等待时间（秒）
+            on_written: 可选，每次成功写入后以写入的快照调用（在写入线程中执行）
+        """
+        self.path = path
+        self.delay = delay
+        self.on_written = on_written
+        self._pending = None  # 尚未写入的配置快照
+        self.last_written = None  # 最近一次成功写入的配置快照
+        self._last_submit = 0.0
+        self._closed = False
+        self._condition = threading.Condition()
+        self._write_lock = threading.Lock()  # 保证快照按提交顺序写入
+        self.stats = {'submitted': 0, 'written': 0, 'failed': 0}
+        
+        self._thread = threading.Thread(target=self._run, name="config-persister", daemon=True)
+        self._thread.start()
+        atexit.register(self.flush)
+    
+    def save(self, config):
+        """提交一份配置快照，由后台线程合并写入
+        
+        参数:
+            config: 配置字典，调用方线程上复制一份，之后的修改不影响本次写入
+        """
+        # 深复制：alerts等列表中的字典也可能在写入前被界面线程修改
+        snapshot = copy.deepcopy(config)
+        with self._condition:
+            self._pending = snapshot
+            self._last_submit = time.monotonic()
+            self.stats['submitted'] += 1
+            self._condition.notify()
+    
+    def flush(self):
+        """立即在当前线程写入尚未落盘的快照"""
+        self._write_pending()
+    
+    def close(self):
+        """写入剩余快照并停止后台线程"""
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+        self.flush()
+    
+    def _run(self):
+        """后台线程：等待提交停止delay秒后写入"""
+        while True:
+            with self._condition:
+                while self._pending is None and not self._closed:
+                    self._condition.wait()
+                if self._closed:
+                    return
+                
+                # 防抖：从最后一次提交开始计时
+                wait = self._last_submit + self.delay - time.monotonic()
+                if wait > 0:
+                    self._condition.wait(wait)
+                    continue
+            
+            self._write_pending()
+    
+    def _write_pending(self):
+        """取出并写入最新的快照"""
+        with self._write_lock:
+            with self._condition:
+                snapshot = self._pending
+                self._pending = None
+            if snapshot is None:
+                return
+            
+            try:
+                self._write_atomic(snapshot)
+                self.last_written = snapshot
+                self.stats['written'] += 1
+                if self.on_written:
+                    self.on_written(snapshot)
+            except Exception as e:
+                self.stats['failed'] += 1
+                print(f"保存配置失败: {e}")
+    
+    def _write_atomic(self, config):
+        """写临时文件并fsync后替换原文件"""
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, temp_path = tempfile.mkstemp(
+            dir=directory, prefix=f".{os.path.basename(self.path)}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(config, f, ensure_ascii=False, indent=2)
+                f.flush()
+                os.fsync(f.fileno())
+            # mkstemp创建的文件只有所有者可读写，沿用原文件的权限
+            if os.path.exists(self.path):
+                os.chmod(temp_path, os.stat(self.path).st_mode)
+            os.replace(temp_path, self.path)
+        except BaseException:
+            try:
+                os.unlink(temp_path)
+            except OSError:
+                pass
+            raise
+        
+        # 同步目录项，确保重命名本身落盘（Windows不支持打开目录）
+        if os.name != 'nt':
+            dir_fd = os.open(directory, os.O_RDONLY)
+            try:
+                os.fsync(dir_fd)
+            finally:
+                os.close(dir_fd)
@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+运行时性能分析模块，按需采集cProfile和tracemalloc数据
+
+cProfile、pstats和tracemalloc只在开始分析时才导入，不分析时不增加启动时间。
+"""
+
+import functools
+import io
+import os
+import threading
+import time
+
+
+# 环境变量：设置为秒数时启动后立即分析，可用STOCKBAR_PROFILE_DIR指定输出目录
+PROFILE_ENV = 'STOCKBAR_PROFILE'
+PROFILE_DIR_ENV = 'STOCKBAR_PROFILE_DIR'
+DEFAULT_PROFILE_DIR = 'profiles'
+
+# tracemalloc记录的调用栈深度和报告中列出的条目数
+TRACEMALLOC_FRAMES = 10
+REPORT_TOP = 30
+
+# 结束分析时等待正在执行的被分析调用返回的最长时间（秒）
+STOP_WAIT = 2.0
+
+
+class Profiler:
+    """按需性能分析器
+    
+    被profiled装饰的函数（数据获取线程、解析函数、Tk回调）在分析期间
+    由cProfile记录；cProfile只能分析启用它的线程，所以每个线程使用各自的
+    Profile对象，结束时合并。同时用tracemalloc记录内存分配。
+    Python 3.12起同一时刻只能有一个线程启用cProfile，其他线程此时的调用
+    不被记录、照常执行。分析持续指定秒数后自动结束，在后台线程中把pstats文件
+    和文本报告写入输出目录。未在分析时装饰器只多一次属性判断。
+    """
+    
+    def __init__(self):
+        """初始化分析器"""
+        self.active = False
+        self.output_dir = DEFAULT_PROFILE_DIR
+        self.last_report = None  # 最近一次生成的文本报告路径
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)  # 正在执行的被分析调用全部返回时通知
+        self._inflight = 0
+        self._local = threading.local()
+        self._profiles = []
+        self._timer = None
+        self._started = 0.0
+        self._finisher = None  # 写出报告的后台线程
+    
+    def profiled(self, func):
+        """装饰器：分析期间用cProfile记录函数调用"""
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not self.active:
+                return func(*args, **kwargs)
+            
+            # 嵌套调用已在本线程的分析范围内
+            depth = getattr(self._local, 'depth', 0)
+            if depth:
+                self._local.depth = depth + 1
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    self._local.depth = depth
+            
+            profile = self._get_thread_profile()
+            try:
+                profile.enable()
+            except ValueError:
+                # Python 3.12起其他线程正在分析时无法启用，本次调用不记录
+                return func(*args, **kwargs)
+            
+            with self._lock:
+                self._inflight += 1
+            self._local.depth = 1
+            try:
+                return func(*args, **kwargs)
+            finally:
+                profile.disable()
+                self._local.depth = 0
+                with self._lock:
+                    self._inflight -= 1
+                    self._idle.notify_all()
+        return wrapper
+    
+    def _get_thread_profile(self):
+        """获取当前线程在本次分析中使用的Profile对象"""
+        import cProfile
+        
+        profile = getattr(self._local, 'profile', None)
+        session = getattr(self._local, 'session', None)
+        if profile is None or session != self._started:
+            profile = cProfile.Profile()
+            self._local.profile = profile
+            self._local.session = self._started
+            with self._lock:
+                self._profiles.append(profile)
+        return profile
+    
+    def start(self, duration, output_dir=None):
+        """开始分析，duration秒后自动结束并写出报告
+        
+        参数:
+            duration: 分析时长（秒）
+            output_dir: 可选，输出目录
+        
+        返回:
+            是否成功开始（已在分析中或上次的报告尚未写完时返回False）
+        """
+        import tracemalloc
+        
+        with self._lock:
+            if self.active or (self._finisher is not None and self._finisher.is_alive()):
+                return False
+            self.output_dir = output_dir or os.environ.get(PROFILE_DIR_ENV) or DEFAULT_PROFILE_DIR
+            self._profiles = []
+            self._started = time.time()
+            tracemalloc.start(TRACEMALLOC_FRAMES)
+            self.active = True
+        
+        self._timer = threading.Timer(duration, self.stop)
+        self._timer.daemon = True
+        self._timer.start()
+        print(f"开始性能分析，{duration}秒后写入 {self.output_dir}")
+        return True
+    
+    def start_from_env(self):
+        """环境变量STOCKBAR_PROFILE设置为秒数时开始分析"""
+        value = os.environ.get(PROFILE_ENV)
+        if not value:
+            return False
+        try:
+            duration = float(value)
+        except ValueError:
+            print(f"{PROFILE_ENV}应为分析秒数: {value}")
+            return False
+        return duration > 0 and self.start(duration)
+    
+    def stop(self, wait=False):
+        """结束分析，在后台线程中写出报告
+        
+        结束时需要等待其他线程中正在执行的被分析调用返回（最长STOP_WAIT秒），
+        写报告也较慢，所以都在后台线程中进行，不阻塞调用方（如Tk线程）。
+        
+        参数:
+            wait: 是否等待报告写完，程序退出前应为True
+        
+        返回:
+            wait为True时返回文本报告路径；未在分析、未等待或写入失败时返回None
+        """
+        with self._lock:
+            if self.active:
+                self.active = False
+                self._finisher = threading.Thread(target=self._finish, name='profiler-report', daemon=True)
+                self._finisher.start()
+            elif self._finisher is None or not self._finisher.is_alive():
+                return None
+            finisher = self._finisher
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        
+        if not wait:
+            return None
+        finisher.join()
+        return self.last_report
+    
+    def _finish(self):
+        """等待正在执行的被分析调用返回，然后写出报告（在后台线程中执行）"""
+        import tracemalloc
+        
+        with self._lock:
+            # cProfile只在函数返回时记录，等待其他线程中正在执行的调用结束
+            self._idle.wait_for(lambda: self._inflight == 0, STOP_WAIT)
+            profiles = self._profiles
+            self._profiles = []
+        
+        snapshot = tracemalloc.take_snapshot()
+        tracemalloc.stop()
+        
+        try:
+            self.last_report = self._write_report(profiles, snapshot)
+            print(f"性能分析报告已写入: {self.last_report}")
+        except Exception as e:
+            self.last_report = None
+            print(f"写入性能分析报告失败: {e}")
+    
+    def _write_report(self, profiles, snapshot):
+        """合并各线程的分析数据，写出pstats文件和文本报告"""
+        import pstats
+        
+        os.makedirs(self.output_dir, exist_ok=True)
+        prefix = os.path.join(
+            self.output_dir, time.strftime('stockbar_%Y%m%d_%H%M%S', time.localtime(self._started)))
+        
+        report = io.StringIO()
+        report.write(f"分析时长: {time.time() - self._started:.1f}秒，线程数: {len(profiles)}\n\n")
+        
+        # 合并各线程的cProfile数据（仍在执行的调用在create_stats时停止记录）
+        stats = None
+        for profile in profiles:
+            try:
+                profile.create_stats()
+            except Exception:
+                continue
+            if not profile.stats:
+                continue
+            if stats is None:
+                stats = pstats.Stats(profile, stream=report)
+            else:
+                stats.add(profile)
+        
+        if stats is not None:
+            stats.dump_stats(f"{prefix}.pstats")
+            report.write("=== CPU（按累计时间） ===\n")
+            stats.sort_stats('cumulative').print_stats(REPORT_TOP)
+            report.write("=== CPU（按自身时间） ===\n")
+            stats.sort_stats('tottime').print_stats(REPORT_TOP)
+        else:
+            report.write("分析期间没有被记录的调用\n\n")
+        
+        report.write("=== 内存分配（按代码行） ===\n")
+        for stat in snapshot.statistics('lineno')[:REPORT_TOP]:
+            report.write(f"{stat}\n")
+        report.write("\n=== 内存分配（按调用栈） ===\n")
+        for stat in snapshot.statistics('traceback')[:5]:
+            report.write(f"{stat}\n")
+            for line in stat.traceback.format():
+                report.write(f"{line}\n")
+        
+        report_path = f"{prefix}.txt"
+        with open(report_path, 'w', encoding='utf-8') as f:
+            f.write(report.getvalue())
+        return report_path
+
+
+# 全局性能分析器
+profiler = Profiler()
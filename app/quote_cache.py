@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+行情缓存模块，退出时保存最近一次的行情，下次启动时先显示缓存的行情
+"""
+
+import json
+import os
+import tempfile
+import time
+
+
+# 缓存超过该时长（秒）不再使用，避免长时间未运行后显示过旧的行情
+QUOTE_CACHE_MAX_AGE = 7 * 24 * 3600
+
+
+class QuoteCache:
+    """最近一次行情的本地缓存
+    
+    内容为StockDataManager.get_snapshot生成的快照列表（含分时价格序列），
+    启动时在第一次请求返回之前用于绘制窗口。缓存只是加速显示，读写失败时忽略。
+    """
+    
+    def __init__(self, path, max_age=QUOTE_CACHE_MAX_AGE):
+        """初始化行情缓存
+        
+        参数:
+            path: 缓存文件路径，为空时不读写缓存
+            max_age: 缓存的最长有效时间（秒）
+        """
+        self.path = path
+        self.max_age = max_age
+    
+    def load(self):
+        """读取缓存的行情快照
+        
+        返回:
+            快照列表，没有缓存或缓存已过期时为空列表
+        """
+        if not self.path or not os.path.exists(self.path):
+            return []
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                cache = json.load(f)
+            if time.time() - cache.get('saved_at', 0) > self.max_age:
+                return []
+            return [snapshot for snapshot in cache.get('quotes', [])
+                    if isinstance(snapshot, dict) and snapshot.get('symbol')]
+        except Exception as e:
+            print(f"读取行情缓存失败: {e}")
+            return []
+    
+    def save(self, snapshots):
+        """保存行情快照，先写临时文件再替换，写入中断不会留下残缺的缓存
+        
+        参数:
+            snapshots: 快照列表，尚未获取到价格的股票被忽略
+        """
+        if not self.path:
+            return
+        quotes = [snapshot for snapshot in snapshots if snapshot.get('price') is not None]
+        if not quotes:
+            return
+        directory = os.path.dirname(os.path.abspath(self.path))
+        try:
+            fd, temp_path = tempfile.mkstemp(
+                dir=directory, prefix=f".{os.path.basename(self.path)}.", suffix=".tmp")
+            try:
+                with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                    json.dump({'saved_at': round(time.time(), 3), 'quotes': quotes},
+                              f, ensure_ascii=False, separators=(',', ':'))
+                os.replace(temp_path, self.path)
+            except BaseException:
+                try:
+                    os.unlink(temp_path)
+                except OSError:
+                    pass
+                raise
+        except Exception as e:
+            print(f"保存行情缓存失败: {e}")
@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+调度模块，负责Tk主线程上的重绘合并和周期任务
+"""
+
+import time
+
+from .profiler import profiler
+
+
+class RedrawScheduler:
+    """重绘调度器
+    
+    各处只需调用invalidate标记某一部分需要刷新，调度器会合并同一帧内的重复请求，
+    按注册顺序每帧最多执行一次。注册时指定delay的标记按防抖处理：
+    在最后一次请求后等待delay毫秒才执行，适合写配置等较重的操作。
+    """
+    
+    def __init__(self, root, frame_interval=16):
+        """初始化重绘调度器
+        
+        参数:
+            root: Tk根窗口，用于after调度
+            frame_interval: 帧间隔（毫秒），两次合并执行之间的最短间隔
+        """
+        self.root = root
+        self.frame_interval = frame_interval
+        self._handlers = {}  # 标记 -> 回调函数
+        self._delays = {}  # 标记 -> 防抖延迟（毫秒），None表示按帧合并
+        self._order = []  # 帧内执行顺序
+        self._dirty = set()  # 等待下一帧执行的标记
+        self._frame_job = None  # 下一帧的after任务
+        self._debounce_jobs = {}  # 标记 -> 防抖after任务
+        self._last_flush = 0.0
+        self.stats = {}
+    
+    def register(self, flag, callback, delay=None):
+        """注册一个可刷新的部分
+        
+        参数:
+            flag: 标记名称
+            callback: 执行刷新的回调函数
+            delay: 可选，防抖延迟（毫秒）；不指定时按帧合并
+        """
+        self._handlers[flag] = callback
+        self._delays[flag] = delay
+        if delay is None and flag not in self._order:
+            self._order.append(flag)
+        self.stats.setdefault(flag, {'requested': 0, 'executed': 0, 'suppressed': 0})
+    
+    def invalidate(self, flag):
+        """标记某一部分需要刷新"""
+        if flag not in self._handlers:
+            return
+        
+        stats = self.stats[flag]
+        stats['requested'] += 1
+        
+        delay = self._delays[flag]
+        if delay is not None:
+            # 防抖：取消尚未执行的任务，从最后一次请求重新计时
+            job = self._debounce_jobs.pop(flag, None)
+            if job is not None:
+                self.root.after_cancel(job)
+                stats['suppressed'] += 1
+            self._debounce_jobs[flag] = self.root.after(delay, self._run_debounced, flag)
+            return
+        
+        if flag in self._dirty:
+            stats['suppressed'] += 1
+            return
+        
+        self._dirty.add(flag)
+        if self._frame_job is None:
+            elapsed = (time.perf_counter() - self._last_flush) * 1000
+            wait = max(0, int(self.frame_interval - elapsed))
+            self._frame_job = self.root.after(wait, self._flush_frame)
+    
+    @profiler.profiled
+    def _flush_frame(self):
+        """执行一帧内合并后的刷新"""
+        self._frame_job = None
+        self._last_flush = time.perf_counter()
+        
+        # 按注册顺序执行，前面的回调在本帧内标记的后续部分也会一起执行
+        for flag in self._order:
+            if flag in self._dirty:
+                self._dirty.discard(flag)
+                self._execute(flag)
+    
+    @profiler.profiled
+    def _run_debounced(self, flag):
+        """执行防抖任务"""
+        self._debounce_jobs.pop(flag, None)
+        self._execute(flag)
+    
+    def _execute(self, flag):
+        """执行回调并计数"""
+        self.stats[flag]['executed'] += 1
+        try:
+            self._handlers[flag]()
+        except Exception as e:
+            print(f"执行刷新任务 {flag} 失败: {e}")
+    
+    def flush(self):
+        """立即执行所有等待中的任务（退出前调用，避免丢失防抖中的写入）"""
+        for flag, job in list(self._debounce_jobs.items()):
+            self.root.after_cancel(job)
+            self._run_debounced(flag)
+        
+        if self._frame_job is not None:
+            self.root.after_cancel(self._frame_job)
+            self._flush_frame()
+    
+    def get_stats(self):
+        """获取调度统计
+        
+        返回:
+            字典，包含总的请求、执行、合并丢弃次数以及按标记的明细
+        """
+        totals = {'requested': 0, 'executed': 0, 'suppressed': 0}
+        for stats in self.stats.values():
+            for key in totals:
+                totals[key] += stats[key]
+        totals['flags'] = {flag: dict(stats) for flag, stats in self.stats.items()}
+        return totals
+
+
+class TickScheduler:
+    """周期任务调度器
+    
+    用Tk的after在主线程上驱动周期任务。每次触发的计划时间按固定节拍推进
+    （上一次计划时间加间隔），回调耗时和after的延迟不会累积成漂移；
+    落后超过一个周期时跳过错过的节拍，不会连续补发。
+    修改间隔后立即按新间隔重新安排下一次触发，支持暂停和恢复。
+    """
+    
+    def __init__(self, root, callback, interval):
+        """初始化周期任务调度器
+        
+        参数:
+            root: Tk根窗口，用于after调度
+            callback: 每次触发时执行的回调函数
+            interval: 触发间隔（秒）
+        """
+        self.root = root
+        self.callback = callback
+        self.interval = interval
+        self.paused = False
+        self._job = None
+        self._running = False
+        self._next_tick = None  # 下一次触发的计划时间（perf_counter）
+        self._last_tick = None  # 上一次触发的计划时间
+        self.stats = {'ticks': 0, 'skipped': 0, 'lateness_last': 0.0,
+                      'lateness_max': 0.0, 'lateness_total': 0.0}
+    
+    def start(self, immediate=True):
+        """开始调度
+        
+        参数:
+            immediate: 是否立即触发第一次
+        """
+        if self._running:
+            return
+        self._running = True
+        now = time.perf_counter()
+        self._next_tick = now if immediate else now + self.interval
+        if not self.paused:
+            self._arm()
+    
+    def stop(self):
+        """停止调度"""
+        self._running = False
+        self._cancel()
+    
+    def pause(self):
+        """暂停触发"""
+        if self.paused:
+            return
+        self.paused = True
+        self._cancel()
+    
+    def resume(self):
+        """恢复触发，暂停期间错过的节拍不补发，立即触发一次后按间隔继续"""
+        if not self.paused:
+            return
+        self.paused = False
+        if self._running:
+            self._next_tick = time.perf_counter()
+            self._arm()
+    
+    def set_interval(self, interval):
+        """修改触发间隔，立即按新间隔重新安排下一次触发
+        
+        参数:
+            interval: 新的触发间隔（秒）
+        """
+        if interval <= 0 or interval == self.interval:
+            return
+        self.interval = interval
+        if not self._running:
+            return
+        
+        # 从上一次触发开始按新间隔计算，已经超过时立即触发
+        now = time.perf_counter()
+        base = self._last_tick if self._last_tick is not None else now
+        self._next_tick = max(now, base + interval)
+        if not self.paused:
+            self._arm()
+    
+    def _cancel(self):
+        """取消已安排的触发"""
+        if self._job is not None:
+            self.root.after_cancel(self._job)
+            self._job = None
+    
+    def _arm(self):
+        """按下一次计划时间安排after任务"""
+        self._cancel()
+        delay = max(0, int(round((self._next_tick - time.perf_counter()) * 1000)))
+        self._job = self.root.after(delay, self._fire)
+    
+    @profiler.profiled
+    def _fire(self):
+        """触发一次并安排下一次"""
+        self._job = None
+        now = time.perf_counter()
+        lateness = max(0.0, now - self._next_tick)
+        
+        stats = self.stats
+        stats['ticks'] += 1
+        stats['lateness_last'] = lateness
+        stats['lateness_max'] = max(stats['lateness_max'], lateness)
+        stats['lateness_total'] += lateness
+        
+        # 按节拍推进计划时间，落后超过一个周期时跳过错过的节拍
+        self._last_tick = self._next_tick
+        self._next_tick += self.interval
+        if self._next_tick <= now:
+            missed = int((now - self._next_tick) // self.interval) + 1
+            stats['skipped'] += missed
+            self._next_tick += missed * self.interval
+            self._last_tick = self._next_tick - self.interval
+        
+        # 先安排下一次，回调中修改间隔或暂停时会重新安排或取消
+        self._arm()
+        try:
+            self.callback()
+        except Exception as e:
+            print(f"执行周期任务失败: {e}")
+    
+    def get_stats(self):
+        """获取调度统计
+        
+        返回:
+            字典，包含触发次数、跳过的节拍数、距下一次触发的秒数以及触发延迟（秒）
+        """
+        stats = dict(self.stats)
+        lateness_total = stats.pop('lateness_total')
+        stats['lateness_avg'] = lateness_total / stats['ticks'] if stats['ticks'] else 0.0
+        stats['interval'] = self.interval
+        stats['paused'] = self.paused
+        if self._running and not self.paused and self._next_tick is not None:
+            stats['next_tick_in'] = max(0.0, self._next_tick - time.perf_counter())
+        else:
+            stats['next_tick_in'] = None
+        return stats
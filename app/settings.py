@@ -7,6 +7,7 @@
 
 import tkinter as tk
 from tkinter import ttk, messagebox, colorchooser
+from .chart import parse_overlays
 
 
 class SettingsWindow:
@@ -406,6 +407,17 @@ class SettingsWindow:
                       bg=self.settings_bg_color, fg='#333', selectcolor=self.settings_bg_color,
                       font=("Microsoft YaHei", 9)).pack(anchor='w', padx=20, pady=5)
         
+        # 显示模式
+        mode_frame = tk.Frame(content_frame, bg=self.settings_bg_color)
+        mode_frame.pack(fill=tk.X, padx=20, pady=5)
+        tk.Label(mode_frame, text="显示模式:", width=12, anchor='w',
+                bg=self.settings_bg_color, fg='#333').pack(side=tk.LEFT)
+        self.display_mode_var = tk.StringVar(value=self.config_manager.config.get('display_mode', 'single'))
+        for mode, text in (('single', "单只轮播"), ('ticker', "滚动行情"), ('grid', "迷你分时网格")):
+            tk.Radiobutton(mode_frame, text=text, value=mode, variable=self.display_mode_var,
+                          bg=self.settings_bg_color, fg='#333', selectcolor=self.settings_bg_color,
+                          font=("Microsoft YaHei", 9)).pack(side=tk.LEFT, padx=2)
+        
         # 分时图设置
         tk.Label(content_frame, text="📈 分时图设置", font=("Microsoft YaHei", 11, "bold"),
                 bg=self.settings_bg_color, fg='#333').pack(anchor='w', padx=20, pady=(15, 5))
@@ -422,6 +434,34 @@ class SettingsWindow:
                       bg=self.settings_bg_color, fg='#333', selectcolor=self.settings_bg_color,
                       font=("Microsoft YaHei", 9)).pack(anchor='w', padx=20, pady=5)
         
+        # 分时线平滑（画质设置）
+        self.smooth_var = tk.BooleanVar(value=self.config_manager.config.get('chart_smooth', True))
+        tk.Checkbutton(content_frame, text="平滑分时线（高画质）", variable=self.smooth_var,
+                      bg=self.settings_bg_color, fg='#333', selectcolor=self.settings_bg_color,
+                      font=("Microsoft YaHei", 9)).pack(anchor='w', padx=20, pady=5)
+        
+        # 静态层离屏渲染
+        self.static_image_var = tk.BooleanVar(value=self.config_manager.config.get('chart_static_image', False))
+        tk.Checkbutton(content_frame, text="网格离屏渲染（减少画布图元）", variable=self.static_image_var,
+                      bg=self.settings_bg_color, fg='#333', selectcolor=self.settings_bg_color,
+                      font=("Microsoft YaHei", 9)).pack(anchor='w', padx=20, pady=5)
+        
+        # 成交量副图
+        self.volume_var = tk.BooleanVar(value=self.config_manager.config.get('chart_volume', False))
+        tk.Checkbutton(content_frame, text="显示成交量", variable=self.volume_var,
+                      bg=self.settings_bg_color, fg='#333', selectcolor=self.settings_bg_color,
+                      font=("Microsoft YaHei", 9)).pack(anchor='w', padx=20, pady=5)
+        
+        # 叠加指标，如 vwap, ma5, ema20
+        overlays_frame = tk.Frame(content_frame, bg=self.settings_bg_color)
+        overlays_frame.pack(fill=tk.X, padx=20, pady=5)
+        tk.Label(overlays_frame, text="叠加指标:", width=12, anchor='w',
+                bg=self.settings_bg_color, fg='#333').pack(side=tk.LEFT)
+        self.overlays_var = tk.StringVar(value=", ".join(self.config_manager.config.get('chart_overlays', [])))
+        tk.Entry(overlays_frame, textvariable=self.overlays_var, width=15).pack(side=tk.LEFT, padx=5)
+        tk.Label(overlays_frame, text="vwap, ma5, ema20", bg=self.settings_bg_color, fg='#888',
+                font=("Microsoft YaHei", 8)).pack(side=tk.LEFT)
+        
         # 绑定实时更新事件
         self.bind_realtime_updates()
     
@@ -535,6 +575,16 @@ class SettingsWindow:
                 # 更新分时图配置
                 if hasattr(self, 'fixed_percentage_var'):
                     self.config_manager.config['chart_fixed_percentage'] = self.fixed_percentage_var.get()
+                if hasattr(self, 'smooth_var'):
+                    self.config_manager.config['chart_smooth'] = self.smooth_var.get()
+                if hasattr(self, 'static_image_var'):
+                    self.config_manager.config['chart_static_image'] = self.static_image_var.get()
+                if hasattr(self, 'volume_var'):
+                    self.config_manager.config['chart_volume'] = self.volume_var.get()
+                if hasattr(self, 'overlays_var'):
+                    self.config_manager.config['chart_overlays'] = list(parse_overlays(self.overlays_var.get()))
+                if hasattr(self, 'display_mode_var'):
+                    self.config_manager.config['display_mode'] = self.display_mode_var.get()
                 
                 # 保存配置到文件
                 self.config_manager.save_config()
@@ -564,6 +614,9 @@ class SettingsWindow:
                     if new_interval > 0:
                         self.config_manager.config['update_interval'] = new_interval
                         self.config_manager.set_update_interval(new_interval)
+                        # 立即按新间隔安排下一次刷新
+                        if self.main_ui and hasattr(self.main_ui, 'set_update_interval'):
+                            self.main_ui.set_update_interval(new_interval)
                         # 保存配置到文件
                         self.config_manager.save_config()
             except:
@@ -580,14 +633,9 @@ class SettingsWindow:
                 if hasattr(self, 'color_label'):
                     self.color_label.configure(text=self.color_var.get())
                 
-                # 立即重新创建主界面以应用新的背景颜色
-                if self.main_ui and hasattr(self.main_ui, 'recreate_ui'):
-                    def delayed_recreate():
-                        try:
-                            self.main_ui.recreate_ui()
-                        except Exception as e:
-                            print(f"延迟重新创建UI失败: {e}")
-                    self.window.after(100, delayed_recreate)
+                # 就地修改主界面的背景色和文字颜色
+                if self.main_ui and hasattr(self.main_ui, 'request_reconfigure_ui'):
+                    self.main_ui.request_reconfigure_ui()
             self.color_var.trace('w', on_color_change)
         if hasattr(self, 'opacity_var'):
             self.opacity_var.trace('w', lambda *args: apply_realtime_changes())
@@ -627,28 +675,24 @@ class SettingsWindow:
                 apply_realtime_changes()
                 
                 # 分时图显示切换需要重新创建UI
-                if self.main_ui and hasattr(self.main_ui, 'recreate_ui'):
-                    def delayed_recreate():
-                        try:
-                            self.main_ui.recreate_ui()
-                        except Exception as e:
-                            print(f"延迟重新创建UI失败: {e}")
-                    self.window.after(100, delayed_recreate)
+                if self.main_ui and hasattr(self.main_ui, 'request_recreate_ui'):
+                    self.main_ui.request_recreate_ui()
             self.show_chart_var.trace('w', on_show_chart_change)
         if hasattr(self, 'show_price_var'):
             def on_show_price_change(*args):
                 # 先更新配置
                 apply_realtime_changes()
-                # 延迟重新创建UI，避免影响设置窗口
-                if self.main_ui and hasattr(self.main_ui, 'recreate_ui'):
-                    # 使用after方法延迟执行，避免在设置窗口操作过程中关闭
-                    def delayed_recreate():
-                        try:
-                            self.main_ui.recreate_ui()
-                        except Exception as e:
-                            print(f"延迟重新创建UI失败: {e}")
-                    self.window.after(100, delayed_recreate)
+                # 就地创建或移除现价标签
+                if self.main_ui and hasattr(self.main_ui, 'request_reconfigure_ui'):
+                    self.main_ui.request_reconfigure_ui()
             self.show_price_var.trace('w', on_show_price_change)
+        if hasattr(self, 'display_mode_var'):
+            def on_display_mode_change(*args):
+                apply_realtime_changes()
+                # 显示模式切换需要重新创建UI
+                if self.main_ui and hasattr(self.main_ui, 'request_recreate_ui'):
+                    self.main_ui.request_recreate_ui()
+            self.display_mode_var.trace('w', on_display_mode_change)
         
         # 绑定比例条变化事件，实时更新标签
         if hasattr(self, 'ratio_var'):
@@ -657,27 +701,17 @@ class SettingsWindow:
                 self.ratio_label.configure(text=f"{self.ratio_var.get():.2f}")
                 # 应用变化
                 apply_realtime_changes()
-                # 重新创建UI
-                if self.main_ui and hasattr(self.main_ui, 'recreate_ui'):
-                    def delayed_recreate():
-                        try:
-                            self.main_ui.recreate_ui()
-                        except Exception as e:
-                            print(f"延迟重新创建UI失败: {e}")
-                    self.window.after(100, delayed_recreate)
+                # 就地调整分时图和信息栏的宽度
+                if self.main_ui and hasattr(self.main_ui, 'request_reconfigure_ui'):
+                    self.main_ui.request_reconfigure_ui()
             self.ratio_var.trace('w', on_ratio_change)
         
         # 绑定字体大小变化事件
         def on_font_size_change(*args):
             apply_realtime_changes()
-            # 字体大小变化需要重新创建UI
-            if self.main_ui and hasattr(self.main_ui, 'recreate_ui'):
-                def delayed_recreate():
-                    try:
-                        self.main_ui.recreate_ui()
-                    except Exception as e:
-                        print(f"延迟重新创建UI失败: {e}")
-                self.window.after(100, delayed_recreate)
+            # 就地修改字体大小
+            if self.main_ui and hasattr(self.main_ui, 'request_reconfigure_ui'):
+                self.main_ui.request_reconfigure_ui()
         
         if hasattr(self, 'font_size_name_var'):
             self.font_size_name_var.trace('w', on_font_size_change)
@@ -691,6 +725,20 @@ class SettingsWindow:
             def on_fixed_percentage_change(*args):
                 apply_realtime_changes()
                 # 强制重新绘制图表
-                if self.main_ui and hasattr(self.main_ui, 'current_stock') and self.main_ui.current_stock:
-                    self.main_ui.draw_chart(self.main_ui.current_stock)
-            self.fixed_percentage_var.trace('w', on_fixed_percentage_change)
\ No newline at end of file
+                if self.main_ui and hasattr(self.main_ui, 'request_chart_redraw'):
+                    self.main_ui.request_chart_redraw()
+            self.fixed_percentage_var.trace('w', on_fixed_percentage_change)
+        def on_chart_quality_change(*args):
+            apply_realtime_changes()
+            # 画质和渲染方式变化需要重建分时图图元
+            if self.main_ui and hasattr(self.main_ui, 'request_chart_redraw'):
+                self.main_ui.request_chart_redraw()
+        
+        if hasattr(self, 'smooth_var'):
+            self.smooth_var.trace('w', on_chart_quality_change)
+        if hasattr(self, 'static_image_var'):
+            self.static_image_var.trace('w', on_chart_quality_change)
+        if hasattr(self, 'volume_var'):
+            self.volume_var.trace('w', on_chart_quality_change)
+        if hasattr(self, 'overlays_var'):
+            self.overlays_var.trace('w', on_chart_quality_change)
\ No newline at end of file
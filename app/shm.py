@@ -0,0 +1,332 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+共享内存行情表
+
+数据获取部分把每只股票的最新行情写入multiprocessing.shared_memory中的固定布局表，
+本机的其他Python进程直接映射读取，不需要序列化和系统调用。
+
+布局（小端）：
+    表头 HEADER_SIZE 字节：magic、版本、容量、每行价格序列长度、已用行数、写入进程号
+    每行 ROW_SIZE 字节：序号(u64)、代码(16字节)、名称(32字节)、价格、涨跌幅、
+    昨日收盘价、更新时间（f64），以及按分钟槽位排列的价格序列（f32，缺失为NaN）
+
+每行用序号实现seqlock：写入前序号加一（奇数表示正在写入），写完再加一；
+读取时序号为奇数或前后不一致就重试，读到的一行一定来自同一次写入。
+"""
+
+import os
+import struct
+import sys
+import time
+from multiprocessing import shared_memory
+
+from .chart import TRADING_SLOTS
+
+
+TABLE_MAGIC = b'SBQT'
+TABLE_VERSION = 2
+
+HEADER_FORMAT = '<4sIIIII'  # magic、版本、容量、价格序列长度、已用行数、写入进程号
+HEADER_SIZE = 32
+ROWS_USED_OFFSET = 16
+
+ROW_FORMAT = '<Q16s32sdddd'  # 序号、代码、名称、价格、涨跌幅、昨日收盘价、更新时间
+QUOTE_FORMAT = '<32sdddd'  # 每次更新写入的部分：名称到更新时间
+ROW_FIELDS_SIZE = struct.calcsize(ROW_FORMAT)
+SERIES_OFFSET = ROW_FIELDS_SIZE
+ROW_SIZE = (SERIES_OFFSET + TRADING_SLOTS * 4 + 7) // 8 * 8
+
+SYMBOL_SIZE = 16
+NAME_SIZE = 32
+
+NAN = float('nan')
+
+# 读取一行时序号不一致的最大重试次数
+READ_RETRIES = 1000
+
+
+def _encode(text, size):
+    """编码为定长字节，超长时按完整字符截断"""
+    data = (text or '').encode('utf-8')[:size]
+    return data.decode('utf-8', 'ignore').encode('utf-8')
+
+
+def _decode(data):
+    """解码定长字节"""
+    return data.rstrip(b'\0').decode('utf-8', 'ignore')
+
+
+def _number(value):
+    """None转为NaN"""
+    return NAN if value is None else float(value)
+
+
+def _optional(value):
+    """NaN转为None"""
+    return None if value != value else value
+
+
+class QuoteTableWriter:
+    """共享内存行情表的写入端（数据获取进程）
+    
+    每只股票第一次写入时分配一行，之后原地更新；行不会被回收，
+    读取端可以长期缓存股票代码到行号的映射。只能由一个线程写入。
+    """
+    
+    def __init__(self, name, capacity=64):
+        """创建行情表
+        
+        参数:
+            name: 共享内存名称
+            capacity: 最多容纳的股票数
+        
+        同名共享内存已存在时，只有表头无效或写入进程已退出才视为残留并重新创建；
+        仍被运行中的写入进程使用时抛出FileExistsError，不影响对方的行情表。
+        """
+        self.name = name
+        self.capacity = capacity
+        size = HEADER_SIZE + capacity * ROW_SIZE
+        try:
+            self.shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        except FileExistsError:
+            owner = _table_owner(name)
+            if owner is not None:
+                raise FileExistsError(
+                    f"共享内存 {name} 正被进程 {owner} 的行情表使用，请换用其他quote_table_name")
+            # 表头无效或写入进程已退出：上次异常退出留下的同名共享内存
+            stale = shared_memory.SharedMemory(name=name)
+            stale.close()
+            stale.unlink()
+            self.shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        self.buf = self.shm.buf
+        self.rows = {}  # 股票代码 -> 行号
+        struct.pack_into(HEADER_FORMAT, self.buf, 0, TABLE_MAGIC, TABLE_VERSION, capacity, TRADING_SLOTS, 0,
+                         os.getpid())
+    
+    def _row_offset(self, symbol):
+        """获取股票所在行的偏移，新股票分配新行，表已满时返回None"""
+        row = self.rows.get(symbol)
+        if row is None:
+            if len(self.rows) >= self.capacity:
+                return None
+            row = len(self.rows)
+            offset = HEADER_SIZE + row * ROW_SIZE
+            struct.pack_into('<Q', self.buf, offset, 0)
+            struct.pack_into('16s', self.buf, offset + 8, _encode(symbol, SYMBOL_SIZE))
+            self.rows[symbol] = row
+            struct.pack_into('<I', self.buf, ROWS_USED_OFFSET, len(self.rows))
+        return HEADER_SIZE + row * ROW_SIZE
+    
+    def write(self, snapshot, series=None):
+        """写入一只股票的行情
+        
+        参数:
+            snapshot: StockDataManager.get_snapshot返回的快照
+            series: 可选，array('f')价格序列（build_price_series的结果），直接按字节复制
+        
+        返回:
+            是否写入（表已满时返回False）
+        """
+        offset = self._row_offset(snapshot['symbol'])
+        if offset is None:
+            return False
+        
+        buf = self.buf
+        sequence = struct.unpack_from('<Q', buf, offset)[0] + 1
+        struct.pack_into('<Q', buf, offset, sequence)  # 奇数：正在写入
+        
+        struct.pack_into(QUOTE_FORMAT, buf, offset + 8 + SYMBOL_SIZE,
+                         _encode(snapshot.get('name'), NAME_SIZE),
+                         _number(snapshot.get('price')),
+                         _number(snapshot.get('change_percent')),
+                         _number(snapshot.get('yesterday_close')),
+                         snapshot.get('timestamp') or time.time())
+        
+        series_start = offset + SERIES_OFFSET
+        series_end = series_start + TRADING_SLOTS * 4
+        if series is not None and len(series) == TRADING_SLOTS:
+            buf[series_start:series_end] = series.tobytes()
+        elif series is not None:
+            # 没有分钟槽位的序列按原顺序存放，其余填NaN
+            values = list(series[:TRADING_SLOTS]) + [NAN] * (TRADING_SLOTS - min(len(series), TRADING_SLOTS))
+            struct.pack_into(f'<{TRADING_SLOTS}f', buf, series_start, *values)
+        
+        struct.pack_into('<Q', buf, offset, sequence + 1)  # 偶数：写入完成
+        return True
+    
+    def close(self):
+        """关闭并删除行情表"""
+        self.buf = None
+        try:
+            self.shm.close()
+            self.shm.unlink()
+        except (BufferError, FileNotFoundError):
+            pass
+
+
+class QuoteTableReader:
+    """共享内存行情表的读取端（其他进程）
+    
+    用法:
+        reader = QuoteTableReader('stockbar_quotes')
+        quote = reader.read('600519')
+        reader.close()
+    """
+    
+    def __init__(self, name):
+        """连接已存在的行情表
+        
+        参数:
+            name: 共享内存名称，与写入端的quote_table_name配置相同
+        """
+        self.shm = _attach(name)
+        self.buf = self.shm.buf
+        magic, version, capacity, slots, _, _ = struct.unpack_from(HEADER_FORMAT, self.buf, 0)
+        if magic != TABLE_MAGIC or version != TABLE_VERSION:
+            self.close()
+            raise ValueError(f"共享内存 {name} 不是行情表或版本不兼容")
+        self.capacity = capacity
+        self.slots = slots
+        self._rows = {}  # 股票代码 -> 行偏移
+    
+    def symbols(self):
+        """获取表中的全部股票代码"""
+        rows_used = struct.unpack_from('<I', self.buf, ROWS_USED_OFFSET)[0]
+        result = []
+        for row in range(min(rows_used, self.capacity)):
+            offset = HEADER_SIZE + row * ROW_SIZE
+            symbol = _decode(bytes(self.buf[offset + 8:offset + 8 + SYMBOL_SIZE]))
+            self._rows[symbol] = offset
+            result.append(symbol)
+        return result
+    
+    def _find(self, symbol):
+        """查找股票所在行的偏移"""
+        offset = self._rows.get(symbol)
+        if offset is None:
+            self.symbols()
+            offset = self._rows.get(symbol)
+        return offset
+    
+    def read(self, symbol, with_series=False):
+        """读取一只股票的最新行情
+        
+        参数:
+            symbol: 股票代码
+            with_series: 是否同时读取价格序列（缺失的分钟为None）
+        
+        返回:
+            行情字典；股票不在表中、尚未写入或持续读到写入中的数据时返回None
+        """
+        offset = self._find(symbol)
+        if offset is None:
+            return None
+        
+        buf = self.buf
+        series_start = offset + SERIES_OFFSET
+        for _ in range(READ_RETRIES):
+            before = struct.unpack_from('<Q', buf, offset)[0]
+            if before & 1:
+                continue
+            fields = struct.unpack_from(ROW_FORMAT, buf, offset)
+            series = struct.unpack_from(f'<{self.slots}f', buf, series_start) if with_series else None
+            if struct.unpack_from('<Q', buf, offset)[0] != before:
+                continue
+            if before == 0:
+                return None
+            
+            _, _, name, price, change_percent, yesterday_close, timestamp = fields
+            quote = {
+                'symbol': symbol,
+                'name': _decode(name),
+                'price': _optional(price),
+                'change_percent': _optional(change_percent),
+                'yesterday_close': _optional(yesterday_close),
+                'timestamp': timestamp,
+                'version': before // 2,
+            }
+            if series is not None:
+                quote['series'] = [_optional(value) for value in series]
+            return quote
+        return None
+    
+    def series_view(self, symbol):
+        """获取价格序列的零复制视图（memoryview，格式为'f'）
+        
+        视图直接指向共享内存，不受seqlock保护，读取期间可能被更新；
+        需要一致的数据时使用read(symbol, with_series=True)。
+        """
+        offset = self._find(symbol)
+        if offset is None:
+            return None
+        start = offset + SERIES_OFFSET
+        return self.buf[start:start + self.slots * 4].cast('f')
+    
+    def close(self):
+        """断开行情表（不删除）"""
+        self.buf = None
+        self._rows = {}
+        try:
+            self.shm.close()
+        except BufferError:
+            # 仍有series_view返回的视图未释放
+            pass
+
+
+def _table_owner(name):
+    """获取同名行情表仍在运行的写入进程号，表头无效或写入进程已退出时返回None"""
+    try:
+        shm = _attach(name)
+    except FileNotFoundError:
+        return None
+    try:
+        if shm.size < HEADER_SIZE:
+            return None
+        magic, version, _, _, _, owner = struct.unpack_from(HEADER_FORMAT, shm.buf, 0)
+    finally:
+        shm.close()
+    if magic != TABLE_MAGIC or version != TABLE_VERSION:
+        return None
+    return owner if _process_alive(owner) else None
+
+
+def _process_alive(pid):
+    """检查进程是否仍在运行"""
+    if pid <= 0:
+        return False
+    if sys.platform == 'win32':
+        # Windows上os.kill会结束进程，改为打开进程句柄并检查是否已退出
+        import ctypes
+        kernel32 = ctypes.windll.kernel32
+        handle = kernel32.OpenProcess(0x00100000, False, pid)  # SYNCHRONIZE
+        if not handle:
+            return False
+        try:
+            return kernel32.WaitForSingleObject(handle, 0) == 0x00000102  # WAIT_TIMEOUT
+        finally:
+            kernel32.CloseHandle(handle)
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        # 进程存在但属于其他用户
+        return True
+    return True
+
+
+def _attach(name):
+    """连接已存在的共享内存，读取端退出时不删除它"""
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    shm = shared_memory.SharedMemory(name=name)
+    if sys.platform != 'win32':
+        # 3.13之前连接时也会登记到resource_tracker，进程退出时会删除写入端的共享内存
+        try:
+            from multiprocessing import resource_tracker
+            resource_tracker.unregister(shm._name, 'shared_memory')
+        except Exception:
+            pass
+    return shm
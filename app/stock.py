@@ -6,11 +6,17 @@
 """
 
 import logging
-import requests
 import json
 import threading
 import time
 from queue import Queue
+from .chart import TRADING_SLOTS, build_price_series, build_volume_series, get_minute_slot
+from .alerts import AlertEngine
+from .metrics import metrics
+from .profiler import profiler
+
+# requests（约占启动导入耗时的一半）以及行情分发、共享内存模块都在第一次使用时才导入，
+# 第一次请求发生在数据获取线程中，导入开销不会阻塞界面线程
 
 # 配置日志
 logging.basicConfig(
@@ -23,6 +29,29 @@ logging.basicConfig(
 
 logger = logging.getLogger(__name__)
 
+# 请求超时预算：优先级 -> (占刷新间隔的比例, 最小秒数, 最大秒数)，比例为None时固定取最大值
+REQUEST_BUDGETS = {
+    'quote': (0.8, 1.0, 10.0),        # 行情刷新，需要在下一次刷新前结束
+    'background': (0.5, 1.0, 5.0),    # 补充信息，如股票名称
+    'interactive': (None, 5.0, 5.0),  # 用户操作触发，如按名称搜索代码
+}
+
+# 连接超时占请求预算的比例，其余用于读取
+CONNECT_TIMEOUT_RATIO = 0.4
+
+# 剩余时间少于该值（秒）时不再发起新的请求
+MIN_REQUEST_TIME = 0.3
+
+# 流式读取响应时每次读取的字节数，读取间隙检查是否已被取消或超时
+RESPONSE_CHUNK_SIZE = 8192
+
+# 分时接口中成交量序列的名称（不区分大小写）
+VOLUME_SERIES_NAMES = ('成交量', '量', 'volume', 'vol', 'cjl')
+
+
+class FetchCancelled(Exception):
+    """请求已被同一股票更新的请求取代"""
+
 
 class StockDataManager:
     """股票数据管理器
@@ -37,7 +66,19 @@ class StockDataManager:
         self.current_stock_index = 0  # 当前显示的股票索引
         self.is_fetching = False  # 是否正在获取数据
         self.fetch_queue = Queue()  # 数据获取队列
+        self.pending_symbols = set()  # 已在队列中等待获取的股票代码
+        self.refresh_interval = 3  # 刷新间隔（秒），决定请求的超时预算
+        self._generations = {}  # 股票代码 -> 最新一次请求的序号，用于取消被取代的请求
         self.update_callback = None  # UI更新回调函数
+        self.alert_engine = AlertEngine()  # 价格提醒引擎
+        self.alert_callback = None  # 提醒触发时的回调函数，参数为提醒列表
+        self.fanout_server = None  # 本机行情分发服务，向其他实例发布获取到的行情
+        self.subscriber = None  # 订阅本机分发服务时的订阅端，已连接时不再请求上游
+        self.quote_table = None  # 共享内存行情表，供本机其他进程直接读取
+        self._watched = {}  # 订阅者关注但不在股票列表中的股票代码 -> [股票对象, 订阅数]
+        self._watched_lock = threading.Lock()
+        self._worker_count = 0  # 数据获取工作线程数
+        self._worker_lock = threading.Lock()  # 多个工作线程时，提醒检查和行情表写入逐个进行
         self.start_fetch_worker()  # 启动数据获取工作线程
     
     def get_current_stock(self):
@@ -49,27 +90,279 @@ class StockDataManager:
         self.current_stock_index += 1
         return stock
     
+    def update_stocks(self, stocks):
+        """替换股票列表，仍在列表中的股票保留已获取的行情数据
+        
+        参数:
+            stocks: 新的股票对象列表
+        """
+        existing = {stock['symbol']: stock for stock in self.stocks}
+        self.stocks = [existing.get(stock['symbol'], stock) for stock in stocks]
+        self.alert_engine.forget(set(existing) - {stock['symbol'] for stock in stocks})
+        if self.subscriber:
+            self.subscriber.resubscribe()
+    
+    def get_fetch_stocks(self):
+        """获取每次刷新需要获取的股票：股票列表加上分发服务订阅者额外关注的股票"""
+        stocks = list(self.stocks)
+        with self._watched_lock:
+            if self._watched:
+                symbols = {stock['symbol'] for stock in stocks}
+                stocks.extend(stock for symbol, (stock, _) in self._watched.items() if symbol not in symbols)
+        return stocks
+    
+    def watch_symbol(self, symbol):
+        """分发服务的订阅者开始关注一只股票"""
+        with self._watched_lock:
+            entry = self._watched.get(symbol)
+            if entry is None:
+                self._watched[symbol] = [{'name': f"股票{symbol}", 'symbol': symbol,
+                                          'price': '0.00', 'change': '+0.00%'}, 1]
+            else:
+                entry[1] += 1
+    
+    def unwatch_symbol(self, symbol):
+        """分发服务的订阅者不再关注一只股票"""
+        with self._watched_lock:
+            entry = self._watched.get(symbol)
+            if entry is not None:
+                entry[1] -= 1
+                if entry[1] <= 0:
+                    del self._watched[symbol]
+    
+    def start_fanout_server(self, port, host='127.0.0.1'):
+        """启动本机行情分发服务，之后获取到的每条行情都会发布给订阅者
+        
+        参数:
+            port: 监听端口，小于等于0时停止分发服务
+            host: 监听地址
+        """
+        from .fanout import QuoteFanoutServer
+        
+        if self.fanout_server and self.fanout_server.port == port:
+            return
+        self.stop_fanout_server()
+        if port <= 0:
+            return
+        server = QuoteFanoutServer(host, port, self.watch_symbol, self.unwatch_symbol)
+        try:
+            server.start()
+        except OSError as e:
+            logger.error(f"启动行情分发服务失败: {e}")
+            return
+        self.fanout_server = server
+        logger.info(f"行情分发服务已启动: http://{host}:{server.port}")
+    
+    def stop_fanout_server(self):
+        """停止本机行情分发服务"""
+        if self.fanout_server:
+            self.fanout_server.stop()
+            self.fanout_server = None
+    
+    def start_quote_table(self, name, capacity=64):
+        """创建共享内存行情表，之后获取到的每条行情都会写入
+        
+        参数:
+            name: 共享内存名称，为空时关闭行情表
+            capacity: 最多容纳的股票数，不少于股票列表长度的两倍
+        """
+        from .shm import QuoteTableWriter
+        
+        if self.quote_table and self.quote_table.name == name:
+            return
+        self.stop_quote_table()
+        if not name:
+            return
+        try:
+            self.quote_table = QuoteTableWriter(name, max(capacity, len(self.stocks) * 2))
+        except (OSError, ValueError) as e:
+            logger.error(f"创建共享内存行情表失败: {e}")
+            return
+        logger.info(f"共享内存行情表已创建: {name}")
+    
+    def stop_quote_table(self):
+        """关闭并删除共享内存行情表"""
+        if self.quote_table:
+            self.quote_table.close()
+            self.quote_table = None
+    
+    def publish_snapshot(self, stock):
+        """把获取到的行情发布到本机分发服务和共享内存行情表（在数据获取线程中执行）"""
+        snapshot = self.get_snapshot(stock, include_series=self.fanout_server is not None)
+        if self.fanout_server:
+            self.fanout_server.publish(snapshot)
+        if self.quote_table:
+            with self._worker_lock:
+                self.quote_table.write(snapshot, stock.get('series'))
+    
+    def set_quote_source(self, url):
+        """设置行情来源
+        
+        参数:
+            url: 本机分发服务地址，为空时直接请求上游
+        """
+        if self.subscriber and self.subscriber.url == (url or '').rstrip('/'):
+            return
+        if self.subscriber:
+            self.subscriber.stop()
+            self.subscriber = None
+        if url:
+            from .fanout import QuoteSubscriber
+            self.subscriber = QuoteSubscriber(
+                url, lambda: [stock['symbol'] for stock in self.stocks], self.apply_snapshot)
+            self.subscriber.start()
+    
+    def apply_snapshot(self, snapshot):
+        """把从分发服务收到的快照写入股票列表中对应的股票（在订阅线程中执行）"""
+        for stock in self.stocks:
+            if stock['symbol'] != snapshot.get('symbol'):
+                continue
+            if snapshot.get('name'):
+                stock['name'] = snapshot['name']
+            if snapshot.get('price') is not None:
+                stock['price'] = f"{snapshot['price']:.2f}"
+                stock['change'] = snapshot.get('change') or stock['change']
+            if snapshot.get('yesterday_close'):
+                stock['yesterday_close'] = snapshot['yesterday_close']
+            if 'pankou' in snapshot:
+                stock['pankou'] = snapshot['pankou']
+            series = snapshot.get('series')
+            if series and len(series) == TRADING_SLOTS:
+                self._set_chart_data(stock, [{'time': None, 'price': price, 'slot': slot}
+                                             for slot, price in enumerate(series) if price])
+    
+    def get_snapshot(self, stock, include_series=False):
+        """获取股票行情快照，可直接序列化为JSON
+        
+        参数:
+            stock: 股票对象
+            include_series: 是否包含按分钟槽位排列的价格序列（缺失的分钟为None）
+        
+        返回:
+            字典，包含代码、名称、价格、涨跌幅、昨日收盘价和盘口；尚未获取到价格时price为None
+        """
+        try:
+            price = float(stock.get('price', 0)) or None
+        except (TypeError, ValueError):
+            price = None
+        try:
+            change_percent = float(str(stock.get('change', '')).rstrip('%'))
+        except ValueError:
+            change_percent = None
+        
+        snapshot = {
+            'timestamp': round(time.time(), 3),
+            'symbol': stock['symbol'],
+            'name': stock.get('name'),
+            'price': price,
+            'change': stock.get('change'),
+            'change_percent': change_percent if price is not None else None,
+            'yesterday_close': stock.get('yesterday_close'),
+        }
+        if 'pankou' in stock:
+            snapshot['pankou'] = stock['pankou']
+        if include_series:
+            series = stock.get('series') or ()
+            snapshot['series'] = [round(value, 2) if value == value else None for value in series]
+        return snapshot
+    
+    def set_refresh_interval(self, interval):
+        """设置刷新间隔，之后的请求按新间隔计算超时预算"""
+        if interval > 0:
+            self.refresh_interval = interval
+    
+    def get_request_timeout(self, priority='quote', deadline=None):
+        """按刷新间隔和优先级计算请求超时
+        
+        参数:
+            priority: 请求优先级，见REQUEST_BUDGETS
+            deadline: 可选，截止时间（time.monotonic），预算不超过剩余时间
+        
+        返回:
+            (连接超时, 读取超时)元组，剩余时间不足时返回None
+        """
+        ratio, minimum, maximum = REQUEST_BUDGETS[priority]
+        if ratio is None:
+            budget = maximum
+        else:
+            budget = min(maximum, max(minimum, self.refresh_interval * ratio))
+        if deadline is not None:
+            budget = min(budget, deadline - time.monotonic())
+        if budget < MIN_REQUEST_TIME:
+            return None
+        connect_timeout = budget * CONNECT_TIMEOUT_RATIO
+        return (connect_timeout, budget - connect_timeout)
+    
+    def is_superseded(self, symbol, generation):
+        """判断请求是否已被同一股票更新的请求取代"""
+        return generation is not None and self._generations.get(symbol, generation) != generation
+    
     def set_update_callback(self, callback):
         """设置UI更新回调函数"""
         self.update_callback = callback
     
+    def set_alert_callback(self, callback):
+        """设置提醒回调函数（在数据获取线程中调用，参数为提醒列表）"""
+        self.alert_callback = callback
+    
+    def set_alert_rules(self, rules):
+        """设置价格提醒规则（配置文件中alerts的格式）"""
+        count = self.alert_engine.set_rules(rules or [])
+        if count:
+            logger.info(f"已加载 {count} 条价格提醒规则")
+    
+    def check_alerts(self, stock):
+        """按最新价格检查提醒，有提醒触发时通知回调（在数据获取线程中执行）"""
+        with self._worker_lock:
+            alerts = self.alert_engine.evaluate(stock)
+        if alerts and self.alert_callback:
+            self.alert_callback(alerts)
+    
     def start_fetch_worker(self):
-        """启动数据获取工作线程"""
+        """启动一个数据获取工作线程"""
         def worker():
             while True:
                 try:
                     # 从队列中获取股票和回调
-                    stock, callback = self.fetch_queue.get(timeout=1)
+                    stock, callback, generation = self.fetch_queue.get(timeout=1)
+                    
+                    # 减少工作线程时放入的结束标记
+                    if stock is None:
+                        self.fetch_queue.task_done()
+                        return
+                    
+                    # 开始获取后允许再次排队，新请求会取代本次请求
+                    self.pending_symbols.discard(stock['symbol'])
                     
-                    # 在后台线程中获取数据
-                    self.fetch_stock_data_sync(stock)
+                    # 排队期间已被更新的请求取代，直接跳过
+                    if self.is_superseded(stock['symbol'], generation):
+                        metrics.increment('fetch.superseded')
+                        self.fetch_queue.task_done()
+                        continue
+                    
+                    if self.subscriber and self.subscriber.connected:
+                        # 行情由本机分发服务推送，不再请求上游
+                        completed = True
+                    else:
+                        # 在后台线程中获取数据
+                        completed = self.fetch_stock_data_sync(stock, generation)
+                        
+                        # 发布给本机的其他实例和进程
+                        if completed is not False and (self.fanout_server or self.quote_table):
+                            self.publish_snapshot(stock)
                     
-                    # 通过回调通知主线程更新UI
-                    if callback:
+                    # 检查价格提醒，只针对股票列表，不含分发服务订阅者额外关注的股票
+                    if completed is not False and stock['symbol'] not in self._watched:
+                        self.check_alerts(stock)
+                    
+                    # 通过回调通知主线程更新UI，被取消的请求不通知；
+                    # 没有指定回调时使用完成时的更新回调，界面创建前发出的请求也能显示
+                    callback = callback or self.update_callback
+                    if callback and completed is not False:
                         callback(stock)
                     
                     self.fetch_queue.task_done()
-                    
+                
                 except:
                     # 队列为空或超时，继续等待
                     continue
@@ -77,18 +370,97 @@ class StockDataManager:
         # 启动工作线程
         thread = threading.Thread(target=worker, daemon=True)
         thread.start()
+        self._worker_count += 1
+    
+    def set_fetch_workers(self, count):
+        """设置数据获取工作线程数
+        
+        多个工作线程同时获取不同股票，启动时第一批请求和滚动行情、网格模式的批量刷新
+        不必逐只排队等待。减少时放入结束标记，工作线程处理完手上的请求后退出。
+        
+        参数:
+            count: 工作线程数，至少为1
+        """
+        count = max(1, int(count))
+        while self._worker_count < count:
+            self.start_fetch_worker()
+        while self._worker_count > count:
+            self.fetch_queue.put((None, None, None))
+            self._worker_count -= 1
     
     def fetch_stock_data_async(self, stock, callback=None):
         """异步获取股票数据"""
-        # 将股票和回调函数放入队列
-        self.fetch_queue.put((stock, callback or self.update_callback))
+        # 同一股票的新请求取代尚未完成的旧请求
+        generation = self._generations.get(stock['symbol'], 0) + 1
+        self._generations[stock['symbol']] = generation
+        
+        # 记录请求时间，用于统计从请求到界面更新的延迟
+        stock['_requested_at'] = time.perf_counter()
+        
+        # 将股票、回调函数和请求序号放入队列
+        self.fetch_queue.put((stock, callback, generation))
+    
+    def fetch_all_stocks_async(self, callback=None):
+        """异步获取全部股票数据，已在队列中等待的股票不会重复加入"""
+        for stock in self.get_fetch_stocks():
+            if stock['symbol'] not in self.pending_symbols:
+                self.pending_symbols.add(stock['symbol'])
+                self.fetch_stock_data_async(stock, callback)
     
     def fetch_stock_data(self, stock):
         """保持向后兼容的同步方法"""
         self.fetch_stock_data_async(stock)
     
-    def fetch_stock_data_sync(self, stock):
-        """同步获取股票数据（在后台线程中运行）"""
+    def _get_response_text(self, url, headers, timeout, symbol=None, generation=None, deadline=None):
+        """流式获取响应文本，读取间隙检查请求是否被取代或超过截止时间
+        
+        参数:
+            url: 请求地址
+            headers: 请求头
+            timeout: (连接超时, 读取超时)元组
+            symbol: 可选，股票代码，与generation一起用于判断是否被取代
+            generation: 可选，请求序号
+            deadline: 可选，截止时间（time.monotonic）
+        
+        返回:
+            (HTTP状态码, 响应文本)
+        """
+        import requests
+        
+        # stream=True时requests.get在收到响应头后返回，这段时间包含DNS、连接和首字节等待
+        start = time.perf_counter()
+        response = requests.get(url, headers=headers, timeout=timeout, stream=True)
+        metrics.record('fetch.ttfb', time.perf_counter() - start)
+        start = time.perf_counter()
+        try:
+            chunks = []
+            for chunk in response.iter_content(RESPONSE_CHUNK_SIZE):
+                if self.is_superseded(symbol, generation):
+                    raise FetchCancelled("请求已被取代")
+                if deadline is not None and time.monotonic() > deadline:
+                    raise requests.exceptions.ReadTimeout("超过截止时间")
+                chunks.append(chunk)
+            metrics.record('fetch.body', time.perf_counter() - start)
+            return response.status_code, b''.join(chunks).decode(response.encoding or 'utf-8', errors='replace')
+        finally:
+            response.close()
+    
+    @profiler.profiled
+    def fetch_stock_data_sync(self, stock, generation=None):
+        """同步获取股票数据（在后台线程中运行）
+        
+        请求的截止时间由刷新间隔决定，连接和读取分别计时；
+        同一股票有更新的请求排队时，正在进行的请求会被取消。
+        
+        返回:
+            被取消时返回False，否则返回True
+        """
+        import requests
+        
+        timeout = self.get_request_timeout('quote')
+        deadline = time.monotonic() + sum(timeout)
+        start = time.perf_counter()
+        metrics.increment('fetch.requests')
         try:
             url = f"https://api.duishu.com/hangqing/stock/fenshi?time_type=F&code={stock['symbol']}&get_zhutu=1&get_pankou=1"
             
@@ -100,11 +472,10 @@ class StockDataManager:
                 'Connection': 'keep-alive'
             }
             
-            response = requests.get(url, headers=headers, timeout=10)
+            status_code, response_text = self._get_response_text(
+                url, headers, timeout, stock['symbol'], generation, deadline)
             
-            if response.status_code == 200:
-                response_text = response.text
-                
+            if status_code == 200:
                 if '\\u' in response_text:
                     try:
                         data = json.loads(response_text)
@@ -112,7 +483,7 @@ class StockDataManager:
                         decoded_text = response_text.encode().decode('unicode_escape')
                         data = json.loads(decoded_text)
                 else:
-                    data = response.json()
+                    data = json.loads(response_text)
                 
                 if data.get('code') == 10000 and 'data' in data:
                     stock_data = data['data']
@@ -125,9 +496,9 @@ class StockDataManager:
                     if not success:
                         self.parse_stock_data_fallback(stock, stock_data)
                     
-                    # 获取股票名称
+                    # 获取股票名称，只使用本次刷新剩余的时间
                     if not stock.get('name') or stock['name'].startswith('股票'):
-                        self.fetch_stock_name(stock)
+                        self.fetch_stock_name(stock, deadline)
                 else:
                     error_msg = data.get('msg', '未知错误')
                     logger.error(f"股票 {stock['symbol']} API返回错误: {error_msg}")
@@ -135,17 +506,32 @@ class StockDataManager:
                     if 'code' in error_msg.lower() or '不存在' in error_msg:
                         self.try_fix_stock_code(stock)
             else:
-                logger.error(f"股票 {stock['symbol']} HTTP请求失败: {response.status_code}")
-                
+                metrics.increment('fetch.http_errors')
+                logger.error(f"股票 {stock['symbol']} HTTP请求失败: {status_code}")
+        
+        except FetchCancelled as e:
+            metrics.increment('fetch.cancelled')
+            logger.debug(f"股票 {stock['symbol']} 请求已取消: {e}")
+            return False
         except requests.exceptions.Timeout:
+            metrics.increment('fetch.timeouts')
             logger.error(f"股票 {stock['symbol']} 请求超时")
         except requests.exceptions.RequestException as e:
+            metrics.increment('fetch.network_errors')
             logger.error(f"股票 {stock['symbol']} 网络请求失败: {e}")
         except json.JSONDecodeError as e:
+            metrics.increment('fetch.parse_errors')
             logger.error(f"股票 {stock['symbol']} 数据解析失败: {e}")
         except Exception as e:
+            metrics.increment('fetch.errors')
             logger.error(f"股票 {stock['symbol']} 获取数据失败: {e}")
+        finally:
+            # 包括超时和失败的请求，反映每次刷新实际等待的时间
+            metrics.record('fetch.total', time.perf_counter() - start)
+        return True
     
+    @metrics.timed('parse.stock_data')
+    @profiler.profiled
     def parse_stock_data(self, stock, stock_data):
         """解析股票数据"""
         try:
@@ -304,6 +690,8 @@ class StockDataManager:
         logger.warning(f"股票 {stock['symbol']} 无法解析价格数据")
         return False
     
+    @metrics.timed('parse.chart_data')
+    @profiler.profiled
     def extract_chart_data(self, stock, stock_data):
         """提取分时数据"""
         try:
@@ -320,24 +708,68 @@ class StockDataManager:
                             price_series = line['data']
                             break
                 
+                volume_series = self.find_volume_series(stock_data)
+                
                 if price_series and timestamps:
                     min_len = min(len(price_series), len(timestamps))
                     for i in range(min_len):
                         if price_series[i] and timestamps[i]:
                             chart_data.append({
                                 'time': timestamps[i],
-                                'price': price_series[i]
+                                'price': price_series[i],
+                                'slot': get_minute_slot(timestamps[i])  # 固定分钟槽位，用于x坐标
                             })
+                            if volume_series is not None and i < len(volume_series):
+                                chart_data[-1]['volume'] = volume_series[i]
             
-            stock['chart_data'] = chart_data
+            self._set_chart_data(stock, chart_data)
             
             if chart_data:
                 logger.info(f"股票 {stock['symbol']} 提取到 {len(chart_data)} 个分时数据点")
-            
+        
         except Exception as e:
             logger.error(f"提取分时数据失败: {e}")
             stock['chart_data'] = []
     
+    def find_volume_series(self, stock_data):
+        """查找分时接口数据中的每分钟成交量序列
+        
+        依次查找zhutu中各个序列列表（left_line_list之外的列表也会查找）里名称为成交量的序列，
+        以及与时间戳t对齐的v或volume数组。缺失的分钟按0处理。
+        
+        返回:
+            与时间戳对齐的成交量列表，没有成交量数据时返回None
+        """
+        zhutu = stock_data.get('zhutu')
+        if isinstance(zhutu, dict):
+            for value in zhutu.values():
+                if not isinstance(value, list):
+                    continue
+                for line in value:
+                    if (isinstance(line, dict) and line.get('data')
+                            and str(line.get('name', '')).strip().lower() in VOLUME_SERIES_NAMES):
+                        return [volume if isinstance(volume, (int, float)) and volume > 0 else 0
+                                for volume in line['data']]
+        
+        for key in ('v', 'volume'):
+            series = stock_data.get(key)
+            if isinstance(series, list) and series:
+                return [volume if isinstance(volume, (int, float)) and volume > 0 else 0 for volume in series]
+        return None
+    
+    def _set_chart_data(self, stock, chart_data):
+        """保存分时数据并更新紧凑价格序列和成交量序列"""
+        stock['chart_data'] = chart_data
+        stock['volume_series'] = build_volume_series(chart_data)
+        
+        # 紧凑价格序列，供迷你分时网格使用；序列变化时递增版本号，用于判断是否需要重绘
+        series = build_price_series(chart_data)
+        old_series = stock.get('series')
+        if old_series is None or old_series.tobytes() != series.tobytes():
+            stock['series'] = series
+            stock['series_version'] = stock.get('series_version', 0) + 1
+    
+    @profiler.profiled
     def parse_stock_data_fallback(self, stock, stock_data):
         """备用解析方法"""
         try:
@@ -358,18 +790,29 @@ class StockDataManager:
                                             logger.info(f"股票 {stock['symbol']} 使用备用方法获取价格: {value:.2f}")
                                             return True
             return False
-            
+        
         except Exception as e:
             logger.error(f"备用解析方法失败: {e}")
             return False
     
-    def fetch_stock_name(self, stock):
-        """获取股票名称"""
+    def fetch_stock_name(self, stock, deadline=None):
+        """获取股票名称
+        
+        参数:
+            stock: 股票对象
+            deadline: 可选，截止时间（time.monotonic），剩余时间不足时留到下次刷新再获取
+        """
+        import requests
+        
         try:
             # 检查是否已经尝试获取过股票名称，避免重复调用
             if stock.get('_name_fetched', False):
                 return False
             
+            timeout = self.get_request_timeout('background', deadline)
+            if timeout is None:
+                return False
+            
             symbol = stock['symbol']
             
             if symbol.isdigit() and len(symbol) == 6:
@@ -390,7 +833,7 @@ class StockDataManager:
                 'Connection': 'keep-alive'
             }
             
-            response = requests.get(url, headers=headers, timeout=5)
+            response = requests.get(url, headers=headers, timeout=timeout)
             
             if response.status_code == 200:
                 content = response.text
@@ -410,19 +853,25 @@ class StockDataManager:
                                 return True
             
             # 东方财富API
-            result = self.fetch_stock_name_eastmoney(stock)
+            result = self.fetch_stock_name_eastmoney(stock, deadline)
             if result:
                 stock['_name_fetched'] = True  # 标记为已获取
             return result
-            
+        
         except Exception as e:
             logger.error(f"获取股票名称失败: {e}")
             stock['_name_fetched'] = True  # 即使失败也标记为已尝试
             return False
     
-    def fetch_stock_name_eastmoney(self, stock):
+    def fetch_stock_name_eastmoney(self, stock, deadline=None):
         """从东方财富获取股票名称"""
+        import requests
+        
         try:
+            timeout = self.get_request_timeout('background', deadline)
+            if timeout is None:
+                return False
+            
             symbol = stock['symbol']
             
             if symbol.startswith('6'):
@@ -441,7 +890,7 @@ class StockDataManager:
                 'Connection': 'keep-alive'
             }
             
-            response = requests.get(url, headers=headers, timeout=5)
+            response = requests.get(url, headers=headers, timeout=timeout)
             
             if response.status_code == 200:
                 data = response.json()
@@ -453,13 +902,15 @@ class StockDataManager:
                         return True
             
             return False
-            
+        
         except Exception as e:
             logger.error(f"从东方财富获取股票名称失败: {e}")
             return False
     
     def search_stock_by_name(self, stock_name):
         """根据股票名称搜索股票代码"""
+        import requests
+        
         try:
             if not stock_name or not isinstance(stock_name, str):
                 return None
@@ -472,7 +923,7 @@ class StockDataManager:
                 'Connection': 'keep-alive'
             }
             
-            response = requests.get(url, headers=headers, timeout=5)
+            response = requests.get(url, headers=headers, timeout=self.get_request_timeout('interactive'))
             
             if response.status_code == 200:
                 content = response.text
@@ -513,6 +964,8 @@ class StockDataManager:
     
     def search_stock_by_name_eastmoney(self, stock_name):
         """从东方财富搜索股票代码"""
+        import requests
+        
         try:
             if not stock_name:
                 return None
@@ -525,7 +978,7 @@ class StockDataManager:
                 'Connection': 'keep-alive'
             }
             
-            response = requests.get(url, headers=headers, timeout=5)
+            response = requests.get(url, headers=headers, timeout=self.get_request_timeout('interactive'))
             
             if response.status_code == 200:
                 data = response.json()
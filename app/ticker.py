@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+滚动行情视图模块
+"""
+
+import tkinter as tk
+import tkinter.font
+from .utils import get_change_color
+from .profiler import profiler
+
+
+class TickerView:
+    """滚动行情视图
+    
+    在单个Canvas上横向滚动显示整个自选股列表。画布上只保留刚好覆盖可见宽度的
+    若干个单元格，单元格滚出左侧后移到最右侧并换成下一只股票，因此图元数量
+    只与窗口宽度有关，与自选股数量无关。滚动由一个after循环驱动，
+    每帧只需一次move调用。
+    """
+    
+    def __init__(self, parent, stock_manager, bg_color, text_color,
+                 font_size=12, speed=1, frame_interval=33):
+        """初始化滚动行情视图
+        
+        参数:
+            parent: 父组件
+            stock_manager: 股票数据管理器，提供自选股列表
+            bg_color: 背景颜色
+            text_color: 名称和价格的文字颜色
+            font_size: 字体大小
+            speed: 每帧滚动的像素数
+            frame_interval: 帧间隔（毫秒）
+        """
+        self.stock_manager = stock_manager
+        self.text_color = text_color
+        self.speed = speed
+        self.frame_interval = frame_interval
+        
+        self.canvas = tk.Canvas(parent, bg=bg_color, highlightthickness=0, relief=tk.FLAT)
+        self.canvas.pack(fill=tk.BOTH, expand=True)
+        self.font = tk.font.Font(family="Microsoft YaHei", size=font_size, weight="bold")
+        
+        self._measure_cells()
+        
+        self.cells = []  # 按x坐标从左到右排列的单元格
+        self.next_index = 0  # 下一个进入画面的股票序号
+        self._y = 0
+        self._job = None
+        
+        self.canvas.bind('<Configure>', self._on_resize)
+    
+    def _measure_cells(self):
+        """按模板文字计算单元格宽度，只在字体变化时计算，避免每帧测量文字"""
+        self.name_width = self.font.measure("宁德时代 0000.00") + 6
+        self.cell_width = self.name_width + self.font.measure("+00.00%") + 20
+    
+    def set_colors(self, bg_color, text_color):
+        """就地修改背景色和名称文字颜色"""
+        self.text_color = text_color
+        self.canvas.configure(bg=bg_color)
+        for cell in self.cells:
+            self.canvas.itemconfigure(cell['name_item'], fill=text_color)
+    
+    def set_font_size(self, font_size):
+        """就地修改字体大小，单元格宽度随之变化，需要重新排列"""
+        if self.font.cget('size') == font_size:
+            return
+        self.font.configure(size=font_size)
+        self._measure_cells()
+        self._layout(self.canvas.winfo_width(), self.canvas.winfo_height())
+    
+    def start(self):
+        """开始滚动"""
+        if self._job is None:
+            self._job = self.canvas.after(self.frame_interval, self._tick)
+    
+    def stop(self):
+        """停止滚动"""
+        if self._job is not None:
+            try:
+                self.canvas.after_cancel(self._job)
+            except tk.TclError:
+                pass
+            self._job = None
+    
+    def _on_resize(self, event):
+        """画布尺寸变化时重建单元格"""
+        self._layout(event.width, event.height)
+    
+    def _layout(self, width, height):
+        """创建覆盖可见宽度所需的单元格"""
+        # 从当前最左侧的股票开始重新排列，尺寸变化时画面内容保持连续
+        if self.cells:
+            self.next_index = self.cells[0]['index']
+        self.canvas.delete('ticker')
+        self.cells = []
+        
+        count = width // self.cell_width + 2
+        y = height // 2
+        self._y = y
+        for i in range(count):
+            x = i * self.cell_width
+            cell = {
+                'x': x,
+                'index': self._take_next_index(),
+                'texts': (None, None, None),
+                'name_item': self.canvas.create_text(
+                    x, y, text="", fill=self.text_color, font=self.font,
+                    anchor='w', tags='ticker'),
+                'change_item': self.canvas.create_text(
+                    x + self.name_width, y, text="", fill=self.text_color, font=self.font,
+                    anchor='w', tags='ticker'),
+            }
+            self._render_cell(cell)
+            self.cells.append(cell)
+    
+    def _take_next_index(self):
+        """取出下一个进入画面的股票序号"""
+        index = self.next_index
+        count = len(self.stock_manager.stocks)
+        self.next_index = (index + 1) % count if count else 0
+        return index
+    
+    @profiler.profiled
+    def _tick(self):
+        """滚动一帧"""
+        self._job = self.canvas.after(self.frame_interval, self._tick)
+        if not self.cells:
+            return
+        
+        self.canvas.move('ticker', -self.speed, 0)
+        for cell in self.cells:
+            cell['x'] -= self.speed
+        
+        # 滚出左侧的单元格移到最右侧，换成下一只股票
+        first = self.cells[0]
+        if first['x'] + self.cell_width <= 0:
+            self.cells.pop(0)
+            x = self.cells[-1]['x'] + self.cell_width if self.cells else 0
+            first['x'] = x
+            first['index'] = self._take_next_index()
+            self.canvas.coords(first['name_item'], x, self._y)
+            self.canvas.coords(first['change_item'], x + self.name_width, self._y)
+            self._render_cell(first)
+            self.cells.append(first)
+    
+    def _render_cell(self, cell):
+        """按单元格对应的股票更新文字，只修改变化的部分"""
+        stocks = self.stock_manager.stocks
+        if stocks:
+            stock = stocks[cell['index'] % len(stocks)]
+            name_text = f"{stock.get('name', '')} {stock.get('price', '--')}"
+            change_text = stock.get('change', '--')
+            change_color = get_change_color(change_text)
+        else:
+            name_text, change_text, change_color = "", "", self.text_color
+        
+        old_name, old_change, old_color = cell['texts']
+        if name_text != old_name:
+            self.canvas.itemconfigure(cell['name_item'], text=name_text)
+        if change_text != old_change or change_color != old_color:
+            self.canvas.itemconfigure(cell['change_item'], text=change_text, fill=change_color)
+        cell['texts'] = (name_text, change_text, change_color)
+    
+    def update_stock(self, stock):
+        """股票数据更新后刷新画面上显示该股票的单元格"""
+        stocks = self.stock_manager.stocks
+        if not stocks:
+            return
+        for cell in self.cells:
+            if stocks[cell['index'] % len(stocks)] is stock:
+                self._render_cell(cell)
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+提醒弹窗模块
+"""
+
+import tkinter as tk
+from collections import deque
+from .utils import get_contrast_color
+
+
+class ToastNotifier:
+    """非阻塞的提醒弹窗
+    
+    在主窗口下方（下方空间不足时在上方）显示最近的几条提醒，不抢占焦点，
+    一段时间没有新提醒后自动隐藏，点击弹窗立即隐藏。弹窗只创建一次，
+    之后只更新文字和位置。
+    """
+    
+    def __init__(self, root, duration=6000, max_messages=5):
+        """初始化提醒弹窗
+        
+        参数:
+            root: 主窗口
+            duration: 最后一条提醒显示的时长（毫秒）
+            max_messages: 同时显示的最多提醒条数，超出时丢弃最旧的
+        """
+        self.root = root
+        self.duration = duration
+        self.messages = deque(maxlen=max_messages)
+        self.window = None
+        self.label = None
+        self._bg_color = None
+        self._hide_job = None
+    
+    def _create_window(self):
+        """创建弹窗"""
+        self.window = tk.Toplevel(self.root)
+        self.window.overrideredirect(True)
+        self.window.resizable(False, False)
+        self.window.attributes('-topmost', True)
+        self.window.withdraw()
+        
+        self.label = tk.Label(self.window, font=("Microsoft YaHei", 9), justify=tk.LEFT,
+                              anchor='w', padx=8, pady=4, borderwidth=0, highlightthickness=0)
+        self.label.pack(fill=tk.BOTH, expand=True)
+        self.label.bind('<Button-1>', lambda event: self.hide())
+    
+    def show(self, messages, bg_color='#1e1e1e'):
+        """显示提醒，与尚未隐藏的提醒合并显示
+        
+        参数:
+            messages: 提醒文字列表
+            bg_color: 背景颜色
+        """
+        if not messages:
+            return
+        try:
+            if self.window is None or not self.window.winfo_exists():
+                self._create_window()
+            if bg_color != self._bg_color:
+                self._bg_color = bg_color
+                self.window.configure(bg=bg_color)
+                self.label.configure(bg=bg_color, fg=get_contrast_color(bg_color))
+            
+            self.messages.extend(messages)
+            self.label.configure(text="\n".join(self.messages))
+            self._place()
+            self.window.deiconify()
+            self.window.lift()
+            
+            if self._hide_job:
+                self.root.after_cancel(self._hide_job)
+            self._hide_job = self.root.after(self.duration, self.hide)
+        except Exception as e:
+            print(f"显示提醒失败: {e}")
+    
+    def _place(self):
+        """把弹窗放在主窗口下方并右对齐，超出屏幕时放在上方"""
+        self.window.update_idletasks()
+        width = self.window.winfo_reqwidth()
+        height = self.window.winfo_reqheight()
+        x = self.root.winfo_rootx() + self.root.winfo_width() - width
+        y = self.root.winfo_rooty() + self.root.winfo_height() + 2
+        if y + height > self.root.winfo_screenheight():
+            y = self.root.winfo_rooty() - height - 2
+        x = max(0, min(x, self.root.winfo_screenwidth() - width))
+        self.window.geometry(f"+{x}+{max(0, y)}")
+    
+    def hide(self):
+        """隐藏弹窗并清空提醒"""
+        if self._hide_job:
+            self.root.after_cancel(self._hide_job)
+            self._hide_job = None
+        self.messages.clear()
+        if self.window is not None:
+            try:
+                self.window.withdraw()
+            except tk.TclError:
+                self.window = None
@@ -5,14 +5,48 @@
 UI界面模块
 """
 
+import time
 import tkinter as tk
 from tkinter import Menu, messagebox
 import tkinter.font
-from .settings import SettingsWindow
-from .utils import calculate_luminance, get_contrast_color, update_text_label
+from .utils import calculate_luminance, get_contrast_color, get_change_color, update_text_label
+from .chart import TRADING_SLOTS, OverlayTracker, decimate_points, get_slot_x_table, parse_overlays
+from .scheduler import RedrawScheduler
+from .chart_layer import StaticLayerRenderer
+from .ticker import TickerView
+from .grid import SparklineGridView
+from .toast import ToastNotifier
+from .metrics import metrics
+from .profiler import profiler
 from .config import ConfigManager
 from .stock import StockDataManager
 
+
+# 股票信息标签：(属性名, 字体配置键, 字重)，按显示顺序排列
+STOCK_LABELS = (
+    ('stock_name_label', 'name', 'bold'),
+    ('stock_price_label', 'price', 'bold'),
+    ('stock_change_label', 'change', 'normal'),
+)
+
+# 改变界面结构的配置，变化时需要重新创建UI；其余外观配置就地应用
+UI_STRUCTURE_KEYS = ('show_chart', 'display_mode', 'label_renderer')
+UI_APPEARANCE_KEYS = ('bg_color', 'font_size_name', 'font_size_price', 'font_size_change',
+                      'chart_info_ratio', 'show_price')
+
+# 分时图叠加指标线的颜色，按配置顺序循环使用
+OVERLAY_COLORS = ('#f0c040', '#4fa3ff', '#c678dd', '#56b6c2')
+
+# 成交量副图占分时图绘图区域的比例、与价格区域的间距，以及纵轴上限相对最大成交量的余量
+VOLUME_PANE_RATIO = 0.25
+VOLUME_PANE_GAP = 2
+VOLUME_HEADROOM = 1.25
+
+# 成交量柱颜色：价格较上一分钟上涨或持平为红色，下跌为绿色
+VOLUME_UP_COLOR = '#ff6b6b'
+VOLUME_DOWN_COLOR = '#00ff00'
+
+
 class StockBarUI:
     """股票工具栏UI界面"""
     
@@ -27,9 +61,22 @@ class StockBarUI:
         self.stock_change_label = None
         self.stock_label = None
         self.chart_canvas = None
+        self.ticker_view = None
+        self.grid_view = None
         self.current_stock = None
         self.pankou_window = None
+        self._label_states = {}  # 标签 -> 当前显示的(文字, 颜色)
+        self._label_fonts = {}  # 标签属性名 -> 字体对象，修改字号时就地配置
+        self._applied_ui_config = {}  # 当前界面已应用的外观配置
+        self._pankou_visible = False  # 盘口窗口是否正在显示
+        self._pankou_stock = None  # 盘口窗口显示的股票
         self.settings_window = None  # 添加设置窗口实例跟踪
+        self.update_scheduler = None  # 定时刷新调度器，由主控制器设置
+        self._paint_requested_at = None  # 等待绘制的分时图对应的请求时间
+        self.first_data_callback = None  # 第一次显示获取到的行情时调用一次，由主控制器设置
+        self.static_layer_renderer = StaticLayerRenderer()  # 静态层离屏渲染器（可选）
+        self.toast = ToastNotifier(self.root, self.config_manager.get_config('alert_toast_duration', 6000))
+        self._reset_chart_items()
         
         # 窗口配置
         self.window_width = self.config_manager.get_config('window_width', 350)
@@ -43,6 +90,15 @@ class StockBarUI:
         self.chart_height = self.config_manager.get_config('chart_height', 120)
         self.info_height = 40
         
+        # 重绘调度器：合并同一帧内的重绘请求，配置写入防抖
+        self.redraw_scheduler = RedrawScheduler(self.root)
+        self.redraw_scheduler.register('recreate', self.recreate_ui, delay=100)
+        self.redraw_scheduler.register('save_window', self.save_window_config, delay=500)
+        self.redraw_scheduler.register('reconfigure', self.reconfigure_ui)
+        self.redraw_scheduler.register('layout', self._apply_window_layout)
+        self.redraw_scheduler.register('chart', self._redraw_chart)
+        self.redraw_scheduler.register('grid', self._redraw_grid)
+        
         # 创建UI组件
         self.create_ui_components()
         
@@ -55,6 +111,7 @@ class StockBarUI:
         
         # 设置股票数据更新回调
         self.stock_manager.set_update_callback(self.on_stock_data_updated)
+        self.stock_manager.set_alert_callback(self.on_alerts_triggered)
         
         # 添加鼠标悬停事件
         self.root.bind('<Enter>', self.on_mouse_enter)
@@ -99,15 +156,184 @@ class StockBarUI:
                 self.window_width = new_width
                 self.window_height = new_height
                 
-                # 实时更新字体大小
-                self.update_font_sizes()
-                
-                # 如果显示分时图，重新计算布局
-                if self.show_chart and hasattr(self, 'update_layout'):
-                    self.update_layout()
-                
-                # 保存窗口尺寸到配置
-                self.save_window_config()
+                # 拖拽调整大小时事件很密集，布局合并到下一帧，保存配置等停止调整后再写
+                self.redraw_scheduler.invalidate('layout')
+                self.redraw_scheduler.invalidate('save_window')
+    
+    def _apply_window_layout(self):
+        """按当前窗口尺寸更新字体和布局"""
+        # 实时更新字体大小
+        self.update_font_sizes()
+        
+        # 如果显示分时图，重新计算布局
+        if self.show_chart and hasattr(self, 'update_layout'):
+            self.update_layout()
+    
+    def request_chart_redraw(self):
+        """请求在下一帧重绘分时图"""
+        self.redraw_scheduler.invalidate('chart')
+    
+    def request_recreate_ui(self):
+        """请求重新创建UI界面，短时间内的多次请求只执行一次"""
+        self.redraw_scheduler.invalidate('recreate')
+    
+    def request_reconfigure_ui(self):
+        """请求在下一帧将外观配置就地应用到现有界面"""
+        self.redraw_scheduler.invalidate('reconfigure')
+    
+    def _get_ui_config(self):
+        """获取影响界面的配置项"""
+        config = self.config_manager.config
+        return {key: config.get(key) for key in UI_STRUCTURE_KEYS + UI_APPEARANCE_KEYS}
+    
+    def reconfigure_ui(self):
+        """将外观配置就地应用到现有界面，只修改变化的部分
+        
+        颜色、字体大小、分时图比例和是否显示现价直接修改现有组件；
+        分时图开关、显示模式等改变界面结构的配置仍然重新创建UI。
+        """
+        if not getattr(self, 'main_frame', None):
+            return
+        
+        config = self._get_ui_config()
+        changed = {key for key, value in config.items() if self._applied_ui_config.get(key) != value}
+        if not changed:
+            return
+        
+        if changed.intersection(UI_STRUCTURE_KEYS):
+            # 与设置窗口发出的重建请求合并，只重建一次
+            self.request_recreate_ui()
+            return
+        
+        try:
+            if 'bg_color' in changed:
+                self._apply_colors(config['bg_color'])
+            if changed.intersection(('font_size_name', 'font_size_price', 'font_size_change')):
+                self._apply_font_sizes()
+            if 'show_price' in changed:
+                self._apply_show_price(config['show_price'])
+            if 'chart_info_ratio' in changed:
+                self.update_layout_ratio()
+            self._applied_ui_config = config
+        except Exception as e:
+            print(f"就地更新界面失败: {e}")
+            self.recreate_ui()
+    
+    def apply_config_changes(self, keys):
+        """将外部修改的配置应用到界面，只处理发生变化的配置项
+        
+        参数:
+            keys: 发生变化的配置项列表
+        """
+        keys = set(keys)
+        config = self.config_manager.config
+        
+        if keys.intersection(('window_width', 'window_height', 'window_x', 'window_y')):
+            self.window_width = config.get('window_width', self.window_width)
+            self.window_height = config.get('window_height', self.window_height)
+            x = config.get('window_x')
+            y = config.get('window_y')
+            if x is None or y is None:
+                x, y = self.root.winfo_x(), self.root.winfo_y()
+            self.window_x, self.window_y = x, y
+            self.root.geometry(f"{self.window_width}x{self.window_height}+{x}+{y}")
+        
+        if 'bg_opacity' in keys:
+            self.bg_opacity = config['bg_opacity']
+            self.root.attributes('-alpha', self.bg_opacity)
+        if 'always_on_top' in keys:
+            self.always_on_top = config['always_on_top']
+            self.root.attributes('-topmost', self.always_on_top)
+        
+        # 外观和界面结构配置走就地更新路径，结构变化时由其决定是否重建
+        if keys.intersection(UI_STRUCTURE_KEYS + UI_APPEARANCE_KEYS):
+            self.request_reconfigure_ui()
+        if keys.intersection(('chart_fixed_percentage', 'chart_smooth', 'chart_static_image', 'chart_overlays',
+                               'chart_volume')):
+            self.request_chart_redraw()
+        if 'alert_toast_duration' in keys:
+            self.toast.duration = config['alert_toast_duration']
+        
+        if 'ticker_speed' in keys and self.ticker_view:
+            self.ticker_view.speed = config['ticker_speed']
+        if 'stocks' in keys and self.grid_view:
+            self.grid_view.layout()
+    
+    def _apply_colors(self, bg_color):
+        """就地修改背景色和文字颜色"""
+        self.text_color = get_contrast_color(bg_color)
+        self.root.configure(bg=bg_color)
+        self.main_frame.configure(bg=bg_color, highlightbackground=bg_color)
+        for frame in (getattr(self, 'chart_frame', None), getattr(self, 'info_frame', None)):
+            if frame:
+                frame.configure(bg=bg_color)
+        
+        for label_attr, _, _ in STOCK_LABELS:
+            label = getattr(self, label_attr)
+            if not label:
+                continue
+            if label_attr == 'stock_change_label':
+                # 涨跌幅颜色由行情决定，只修改背景
+                label.configure(bg=bg_color)
+            else:
+                label.configure(bg=bg_color, fg=self.text_color)
+                text = self._label_states.get(label, (None, None))[0]
+                self._label_states[label] = (text, self.text_color)
+        
+        if self.chart_canvas:
+            self.chart_canvas.configure(bg=bg_color)
+            # 分时图图元和静态层使用主题颜色，重建后重绘
+            self._clear_chart()
+            self.request_chart_redraw()
+        if self.ticker_view:
+            self.ticker_view.set_colors(bg_color, self.text_color)
+        if self.grid_view:
+            self.grid_view.set_colors(bg_color, self.text_color)
+    
+    def _apply_font_sizes(self):
+        """就地修改字体大小，使用该字体的组件会自动重新布局"""
+        font_sizes = self.calculate_font_sizes()
+        for label_attr, font_key, _ in STOCK_LABELS:
+            font = self._label_fonts.get(label_attr)
+            if font and font.cget('size') != font_sizes[font_key]:
+                font.configure(size=font_sizes[font_key])
+        
+        if self.ticker_view:
+            self.ticker_view.set_font_size(font_sizes['price'])
+        if self.grid_view:
+            self.grid_view.set_font_size(max(6, font_sizes['change'] - 4))
+    
+    def _apply_show_price(self, show_price):
+        """就地创建或移除现价标签"""
+        if not self.stock_name_label or not self.stock_change_label:
+            # 滚动行情和网格模式没有股票信息标签
+            return
+        
+        if show_price and not self.stock_price_label:
+            price = self.current_stock['price'] if self.current_stock else "0.00"
+            self._create_stock_label(
+                self.stock_name_label.master, 'stock_price_label', price,
+                self.calculate_font_sizes()['price'], 'bold', self.text_color,
+                self.stock_name_label.cget('bg'), before=self.stock_change_label
+            )
+        elif not show_price and self.stock_price_label:
+            self._label_states.pop(self.stock_price_label, None)
+            self._label_fonts.pop('stock_price_label', None)
+            self.stock_price_label.destroy()
+            self.stock_price_label = None
+    
+    def _redraw_grid(self):
+        """重绘迷你分时网格中被标记的单元格"""
+        if self.grid_view:
+            self.grid_view.flush()
+    
+    def _redraw_chart(self):
+        """重绘当前股票的分时图"""
+        if self.current_stock and self.chart_canvas:
+            self.draw_chart(self.current_stock)
+            if self._paint_requested_at is not None:
+                metrics.record('latency.tick_to_paint', time.perf_counter() - self._paint_requested_at)
+                self._paint_requested_at = None
     
     def save_window_config(self):
         """保存窗口配置"""
@@ -130,7 +356,7 @@ class StockBarUI:
                 self.window_x = root.winfo_x()
                 self.window_y = root.winfo_y()
                 # 保存位置到配置
-                self.save_window_config()
+                self.redraw_scheduler.invalidate('save_window')
             
             self.x = None
             self.y = None
@@ -174,6 +400,7 @@ class StockBarUI:
         
         # 根据背景颜色智能选择字体颜色
         self.text_color = get_contrast_color(bg_color)
+        self._applied_ui_config = self._get_ui_config()
         
         # 创建主框架，设置固定宽度
         self.main_frame = tk.Frame(self.root, bg=bg_color, relief=tk.FLAT, bd=0, 
@@ -184,7 +411,14 @@ class StockBarUI:
         # 为所有可见组件添加鼠标悬停事件
         self.bind_mouse_events(self.main_frame)
         
-        if show_chart:
+        display_mode = self.config_manager.config.get('display_mode', 'single')
+        if display_mode == 'ticker':
+            # 滚动行情模式
+            self.create_ticker_mode(self.main_frame, bg_color)
+        elif display_mode == 'grid':
+            # 迷你分时网格模式
+            self.create_grid_mode(self.main_frame, bg_color)
+        elif show_chart:
             # 分时图模式
             self.create_chart_mode(self.main_frame, bg_color)
         else:
@@ -214,6 +448,7 @@ class StockBarUI:
             relief=tk.FLAT
         )
         self.chart_canvas.pack(fill=tk.BOTH, expand=True)
+        self._reset_chart_items()
         
         # 绑定Canvas大小变化事件
         self.chart_canvas.bind('<Configure>', self.on_chart_resize)
@@ -241,6 +476,28 @@ class StockBarUI:
         # 为新创建的组件绑定鼠标悬停事件
         self.bind_mouse_events(parent)
     
+    def create_ticker_mode(self, parent, bg_color):
+        """创建滚动行情模式界面，在一条画布上滚动显示全部自选股"""
+        self.ticker_view = TickerView(
+            parent,
+            self.stock_manager,
+            bg_color,
+            self.text_color,
+            font_size=self.config_manager.config.get('font_size_price', 12),
+            speed=self.config_manager.config.get('ticker_speed', 1)
+        )
+        self.ticker_view.start()
+    
+    def create_grid_mode(self, parent, bg_color):
+        """创建迷你分时网格模式界面，每只自选股一个带迷你分时线的单元格"""
+        self.grid_view = SparklineGridView(
+            parent,
+            self.stock_manager,
+            bg_color,
+            self.text_color,
+            font_size=max(6, self.config_manager.config.get('font_size_change', 12) - 4)
+        )
+    
     def _create_stock_labels(self, parent, bg_color):
         """创建股票信息标签的公共方法"""
         # 根据背景颜色智能选择字体颜色
@@ -249,37 +506,50 @@ class StockBarUI:
         # 根据show_price设置决定显示哪些标签
         show_price = self.config_manager.config.get('show_price', True)
         
-        # 定义要创建的标签信息
-        labels_info = [
-            ("stock_name_label", "正在加载...", "name", "bold", text_color),
-            ("stock_price_label", "0.00", "price", "bold", text_color),
-            ("stock_change_label", "+0.00%", "change", "normal", '#00ff00')
-        ]
-        
-        # 过滤要显示的标签
-        if show_price:
-            filtered_labels_info = labels_info  # 显示所有3个标签
-        else:
-            # 不显示现价，只显示名称和涨跌幅
-            filtered_labels_info = [
-                ("stock_name_label", "正在加载...", "name", "bold", text_color),
-                ("stock_change_label", "+0.00%", "change", "normal", '#00ff00')
-            ]
-        
-        # 使用配置的字体大小
-        font_sizes = {
-            'name': self.config_manager.config.get('font_size_name', 12),
-            'price': self.config_manager.config.get('font_size_price', 12),
-            'change': self.config_manager.config.get('font_size_change', 12)
+        # 定义要创建的标签初始文字和颜色
+        initial_values = {
+            'stock_name_label': ("正在加载...", text_color),
+            'stock_price_label': ("0.00", text_color),
+            'stock_change_label': ("+0.00%", '#00ff00')
         }
         
-        # 创建Text控件用于显示股票信息
-        for label_attr, text, font_key, font_weight, fg_color in filtered_labels_info:
-            # 创建字体对象
-            font = tk.font.Font(family="Microsoft YaHei", size=font_sizes[font_key], weight=font_weight)
-            
-            text_widget = tk.Text(
+        # 使用配置的字体大小
+        font_sizes = self.calculate_font_sizes()
+        
+        self._label_states = {}
+        self._label_fonts = {}
+        
+        for label_attr, font_key, font_weight in STOCK_LABELS:
+            # 不显示现价时只创建名称和涨跌幅
+            if label_attr == 'stock_price_label' and not show_price:
+                continue
+            text, fg_color = initial_values[label_attr]
+            self._create_stock_label(parent, label_attr, text, font_sizes[font_key],
+                                     font_weight, fg_color, bg_color)
+    
+    def _create_stock_label(self, parent, label_attr, text, font_size, font_weight,
+                            fg_color, bg_color, **pack_options):
+        """创建单个股票信息标签
+        
+        参数:
+            parent: 父组件
+            label_attr: 保存标签的属性名
+            text: 初始文字
+            font_size: 字体大小
+            font_weight: 字重
+            fg_color: 文字颜色
+            bg_color: 背景颜色
+            pack_options: 额外的pack参数，如before
+        """
+        # 创建字体对象，保留引用以便就地修改字号
+        font = tk.font.Font(family="Microsoft YaHei", size=font_size, weight=font_weight)
+        self._label_fonts[label_attr] = font
+        
+        # 默认使用轻量的Label显示股票信息，label_renderer为text时使用Text控件
+        if self.config_manager.config.get('label_renderer', 'label') != 'text':
+            label = tk.Label(
                 parent,
+                text=text,
                 font=font,
                 bg=bg_color,
                 fg=fg_color,
@@ -287,15 +557,32 @@ class StockBarUI:
                 bd=0,
                 padx=0,
                 pady=0,
-                height=1,
-                wrap=tk.WORD
+                anchor='center'
             )
-            text_widget.pack(fill=tk.BOTH, expand=True, pady=0)
-            text_widget.insert('1.0', text)
-            text_widget.tag_configure("center", justify="center")
-            text_widget.tag_add("center", "1.0", "end")
-            text_widget.config(state=tk.DISABLED)
-            setattr(self, label_attr, text_widget)
+            label.pack(fill=tk.BOTH, expand=True, pady=0, **pack_options)
+            self._label_states[label] = (text, fg_color)
+            setattr(self, label_attr, label)
+            return label
+        
+        text_widget = tk.Text(
+            parent,
+            font=font,
+            bg=bg_color,
+            fg=fg_color,
+            relief=tk.FLAT,
+            bd=0,
+            padx=0,
+            pady=0,
+            height=1,
+            wrap=tk.WORD
+        )
+        text_widget.pack(fill=tk.BOTH, expand=True, pady=0, **pack_options)
+        text_widget.insert('1.0', text)
+        text_widget.tag_configure("center", justify="center")
+        text_widget.tag_add("center", "1.0", "end")
+        text_widget.config(state=tk.DISABLED)
+        setattr(self, label_attr, text_widget)
+        return text_widget
     
     def create_context_menu(self):
         """创建右键菜单"""
@@ -305,11 +592,57 @@ class StockBarUI:
                                 borderwidth=1, relief=tk.RAISED)
         
         self.context_menu.add_command(label="⚙️ 设置", command=self.show_settings)
+        self.paused_var = tk.BooleanVar(
+            master=self.root, value=bool(self.update_scheduler and self.update_scheduler.paused))
+        self.context_menu.add_checkbutton(label="⏸️ 暂停刷新", variable=self.paused_var,
+                                          command=self.toggle_update_paused)
         self.context_menu.add_separator()
         self.context_menu.add_command(label="❌ 关闭", command=self.close_app)
         
+        # 隐藏的性能分析菜单，按住Ctrl右键时显示
+        self.profile_menu = Menu(self.root, tearoff=0, bg='white', fg='black',
+                                 activebackground='#0078d4', activeforeground='white',
+                                 borderwidth=1, relief=tk.RAISED)
+        self.profile_menu.add_command(label="性能分析 30秒", command=lambda: self.start_profiling(30))
+        self.profile_menu.add_command(label="性能分析 120秒", command=lambda: self.start_profiling(120))
+        self.profile_menu.add_command(label="立即结束性能分析", command=profiler.stop)
+        
         # 绑定右键事件
         self.root.bind('<Button-3>', self.show_context_menu)
+        self.root.bind('<Control-Button-3>', self.show_profile_menu)
+    
+    def show_profile_menu(self, event):
+        """显示隐藏的性能分析菜单"""
+        try:
+            self.profile_menu.tk_popup(event.x_root, event.y_root)
+        finally:
+            self.profile_menu.grab_release()
+        return "break"
+    
+    def start_profiling(self, duration):
+        """开始性能分析，结束后报告写入输出目录"""
+        if not profiler.start(duration):
+            messagebox.showinfo("性能分析", "性能分析正在进行中")
+    
+    def toggle_update_paused(self):
+        """暂停或恢复定时刷新"""
+        if not self.update_scheduler:
+            return
+        if self.paused_var.get():
+            self.update_scheduler.pause()
+        else:
+            self.update_scheduler.resume()
+    
+    def set_update_interval(self, interval):
+        """修改刷新间隔，立即按新间隔安排下一次刷新
+        
+        参数:
+            interval: 刷新间隔（秒）
+        """
+        if self.update_scheduler:
+            self.update_scheduler.set_interval(interval)
+        # 请求超时预算随刷新间隔变化
+        self.stock_manager.set_refresh_interval(interval)
     
     def show_context_menu(self, event):
         """显示右键菜单"""
@@ -318,12 +651,18 @@ class StockBarUI:
         finally:
             self.context_menu.grab_release()
     
+    @profiler.profiled
     def update_stock_display(self):
         """更新股票显示"""
         try:
             if not self.stock_manager.stocks:
                 return
             
+            # 滚动行情和网格模式需要全部股票的数据，向其他实例分发行情时也获取全部股票
+            if self.ticker_view or self.grid_view or self.stock_manager.fanout_server:
+                self.stock_manager.fetch_all_stocks_async()
+                return
+            
             # 获取当前股票
             stock = self.stock_manager.get_current_stock()
             if not stock:
@@ -345,19 +684,58 @@ class StockBarUI:
         except Exception as e:
             print(f"股票数据更新回调失败: {e}")
     
-    def _update_ui_with_stock_data(self, stock):
-        """在主线程中更新UI"""
+    def on_alerts_triggered(self, alerts):
+        """价格提醒回调（在数据获取线程中执行）"""
         try:
+            self.root.after(0, self.show_alerts, alerts)
+        except Exception as e:
+            print(f"价格提醒回调失败: {e}")
+    
+    def show_alerts(self, alerts):
+        """在提醒弹窗中显示触发的提醒（在主线程中执行）"""
+        bg_color = self.config_manager.get_appearance_settings()['bg_color']
+        self.toast.show([alert['message'] for alert in alerts], bg_color)
+    
+    def show_cached_stocks(self, stocks):
+        """启动时显示股票列表中已有的行情（上次退出时缓存的行情），不等待第一次请求返回
+        
+        参数:
+            stocks: 需要显示的股票，没有缓存行情的股票保持“正在加载”
+        """
+        for stock in stocks:
+            if stock.get('price', '0.00') != '0.00':
+                self._update_ui_with_stock_data(stock, cached=True)
+    
+    @metrics.timed('render.update_ui')
+    @profiler.profiled
+    def _update_ui_with_stock_data(self, stock, cached=False):
+        """在主线程中更新UI
+        
+        参数:
+            stock: 股票对象
+            cached: 是否为启动时显示的缓存行情，缓存行情不计入请求延迟
+        """
+        try:
+            if self.first_data_callback and not cached:
+                callback, self.first_data_callback = self.first_data_callback, None
+                callback()
+            
             # 保存当前股票引用用于绘制分时图
             self.current_stock = stock
             
             # 根据涨跌设置颜色（中国股市习惯：上涨和0为红色，下跌为绿色）
-            if stock['change'].startswith('+') or stock['change'] == '0.00%':
-                color = '#ff6b6b'  # 红色（涨或平）
-            elif stock['change'].startswith('-'):
-                color = '#00ff00'  # 绿色（跌）
-            else:
-                color = '#ff6b6b'  # 默认红色
+            color = get_change_color(stock['change'])
+            
+            # 滚动行情模式只刷新显示该股票的单元格
+            if self.ticker_view:
+                self.ticker_view.update_stock(stock)
+                return
+            
+            # 网格模式标记该股票的单元格，同一帧内的多次更新合并重绘
+            if self.grid_view:
+                self.grid_view.mark_dirty(stock)
+                self.redraw_scheduler.invalidate('grid')
+                return
             
             # 更新显示
             appearance = self.config_manager.get_appearance_settings()
@@ -370,20 +748,31 @@ class StockBarUI:
             if self.stock_price_label:
                 if show_price:
                     self._update_text_label(self.stock_price_label, stock['price'])
-                    self.stock_price_label.pack(fill=tk.BOTH, expand=True, pady=0)
+                    # 已显示时不重复pack，避免每次刷新都触发重新布局
+                    if not self.stock_price_label.winfo_manager():
+                        self.stock_price_label.pack(fill=tk.BOTH, expand=True, pady=0)
                 else:
                     self.stock_price_label.pack_forget()
             
             # 更新涨跌幅
             self._update_text_label(self.stock_change_label, stock['change'], color)
             
+            # 统计从发起请求到界面更新的延迟
+            requested_at = None if cached else stock.get('_requested_at')
+            if requested_at is not None:
+                metrics.record('latency.tick_to_ui', time.perf_counter() - requested_at)
+            
             # 绘制分时图
             if appearance['show_chart'] and self.chart_canvas:
-                self.draw_chart(stock)
+                self._paint_requested_at = requested_at
+                self.request_chart_redraw()
+            
+            # 盘口窗口打开时随行情实时刷新
+            self.refresh_pankou_info(stock)
             
             # 将工具栏置于前台
             self.bring_to_front(self.root)
-            
+        
         except Exception as e:
             print(f"更新股票显示失败: {e}")
             self.show_error_message()
@@ -399,7 +788,9 @@ class StockBarUI:
         if self.stock_price_label:
             if show_price:
                 self._update_text_label(self.stock_price_label, "--")
-                self.stock_price_label.pack(fill=tk.BOTH, expand=True, pady=0)
+                # 已显示时不重复pack，避免每次刷新都触发重新布局
+                if not self.stock_price_label.winfo_manager():
+                    self.stock_price_label.pack(fill=tk.BOTH, expand=True, pady=0)
             else:
                 self.stock_price_label.pack_forget()
         
@@ -407,23 +798,66 @@ class StockBarUI:
         self._update_text_label(self.stock_change_label, "--")
     
     def _update_text_label(self, label, text, fg_color=None):
-        """更新Text标签的公共方法"""
+        """更新标签的公共方法，文字和颜色都没有变化时不产生Tk调用"""
+        if not label:
+            return
+        state = (text, fg_color or self._label_states.get(label, (None, None))[1])
+        if self._label_states.get(label) == state:
+            return
         update_text_label(label, text, fg_color)
+        self._label_states[label] = state
     
     def on_chart_resize(self, event):
         """处理Canvas大小变化"""
         if self.current_stock:
-            self.draw_chart(self.current_stock)
+            self.request_chart_redraw()
+    
+    def _reset_chart_items(self):
+        """重置分时图持久化图元缓存（画布重建时调用）"""
+        self._chart_items = {}
+        self._chart_texts = {}
+        self._chart_states = {}
+        self._chart_static_key = None
+        self._chart_points_cache = None
+        self._chart_overlays = ()
+        self._overlay_trackers = {}  # 股票代码 -> 叠加指标的增量计算状态
+        self._overlay_points_cache = {}
+        self._volume_bars = []  # 成交量柱图元，按分钟槽位排列
+        self._volume_bar_x = []  # 成交量柱的左右x坐标
+        self._volume_states = []  # 成交量柱当前的(顶部y, 颜色)
+        self._volume_ceiling = (None, 0)  # (股票代码, 纵轴上限)
+        # 静态层图片不在这里淘汰，由渲染器按键判断是否需要重新光栅化
+    
+    def _clear_chart(self):
+        """清空分时图画布并使图元缓存失效"""
+        if self._chart_static_key is not None:
+            self.chart_canvas.delete("all")
+            self._reset_chart_items()
+    
+    def _set_chart_text(self, name, text):
+        """仅在文本变化时更新画布文字图元"""
+        if self._chart_texts.get(name) != text:
+            self.chart_canvas.itemconfigure(self._chart_items[name], text=text)
+            self._chart_texts[name] = text
+    
+    def _set_chart_visible(self, name, visible):
+        """仅在可见性变化时切换画布图元状态"""
+        state = 'normal' if visible else 'hidden'
+        if self._chart_states.get(name) != state:
+            self.chart_canvas.itemconfigure(self._chart_items[name], state=state)
+            self._chart_states[name] = state
     
+    @metrics.timed('render.draw_chart')
     def draw_chart(self, stock):
-        """绘制分时图"""
+        """绘制分时图
+        
+        图元在首次绘制时创建并常驻画布，静态层（0轴、百分比标签位置、时间网格）
+        只在尺寸、主题或网格节点变化时重建，每次行情更新只调整价格线坐标和标签文字。
+        """
         if not hasattr(self, 'chart_canvas') or not self.chart_canvas:
             return
         
         try:
-            # 清空画布
-            self.chart_canvas.delete("all")
-            
             # 获取Canvas尺寸
             canvas_width = self.chart_canvas.winfo_width()
             canvas_height = self.chart_canvas.winfo_height()
@@ -437,17 +871,21 @@ class StockBarUI:
             chart_data = stock.get('chart_data', [])
             if not chart_data:
                 # 没有数据时显示提示
-                self.chart_canvas.create_text(
-                    canvas_width // 2, canvas_height // 2,
-                    text="暂无分时数据",
-                    fill='#888888',
-                    font=("Microsoft YaHei", 10)
-                )
+                static_key = ('empty', canvas_width, canvas_height)
+                if static_key != self._chart_static_key:
+                    self._clear_chart()
+                    self.chart_canvas.create_text(
+                        canvas_width // 2, canvas_height // 2,
+                        text="暂无分时数据",
+                        fill='#888888',
+                        font=("Microsoft YaHei", 10)
+                    )
+                    self._chart_static_key = static_key
                 return
             
             # 绘制简化的分时图
             self.draw_simple_chart(chart_data, canvas_width, canvas_height)
-            
+        
         except Exception as e:
             print(f"绘制分时图失败: {e}")
     
@@ -510,18 +948,32 @@ class StockBarUI:
         
         # 如果绘图区域太小，不绘制图表
         if chart_width < 20 or chart_height < 10:
+            self._clear_chart()
             return
         
         # 计算价格范围
         prices = [point['price'] for point in chart_data if point.get('price')]
         if not prices:
+            self._clear_chart()
             return
         
         # 获取昨日收盘价作为基准（0轴）
         current_stock = getattr(self, 'current_stock', None)
         if not current_stock:
+            self._clear_chart()
             return
-            
+        
+        # 成交量副图：有按分钟槽位排列的成交量时，从绘图区域底部划出一部分
+        volume_pane = None
+        if (self.config_manager.config.get('chart_volume', False)
+                and current_stock.get('volume_series') is not None
+                and chart_data[-1].get('slot') is not None):
+            volume_height = max(6, int(chart_height * VOLUME_PANE_RATIO))
+            if chart_height - volume_height - VOLUME_PANE_GAP >= 10:
+                volume_pane = (chart_bottom - volume_height, chart_bottom)
+                chart_bottom -= volume_height + VOLUME_PANE_GAP
+                chart_height = chart_bottom - chart_top
+        
         # 从股票数据中获取昨日收盘价
         base_price = self.get_yesterday_close_price(current_stock)
         if not base_price or base_price <= 0:
@@ -552,17 +1004,30 @@ class StockBarUI:
         # 计算0轴位置（基准价格）- 固定在中间位置
         zero_y = chart_top + chart_height // 2
         
-        # 绘制0轴（基准线）
-        self.chart_canvas.create_line(
-            chart_left, zero_y, chart_right, zero_y,
-            fill='#666666',
-            width=1,
-            dash=(2, 2),
-            tags="zero_axis"
-        )
+        # 分时线是否平滑（画质设置，平滑会让Tk对全部顶点做样条插值）
+        smooth = self.config_manager.config.get('chart_smooth', True)
         
-        # 绘制百分比标签
-        font_size = max(6, min(8, canvas_height // 15))
+        # 是否将0轴和时间网格光栅化为一张离屏图片
+        static_image = self.config_manager.config.get('chart_static_image', False)
+        
+        # 叠加指标（均价线、均线），未配置时不创建图元
+        overlays = parse_overlays(self.config_manager.config.get('chart_overlays', []))
+        
+        # 时间戳能映射到分钟槽位时按固定槽位定位x，否则退回按序号均分
+        slot_mode = chart_data[0].get('slot') is not None and chart_data[-1].get('slot') is not None
+        
+        # 静态层只依赖尺寸、主题、画质、叠加指标、成交量副图和时间网格，变化时才重建；
+        # 网格线的x按数据点数均分，有网格时点数变化（按序号均分时每分钟一次）也要重建
+        data_points = TRADING_SLOTS if slot_mode else len(chart_data)
+        grid_points = tuple(self.get_time_grid_points(data_points))
+        static_key = (canvas_width, canvas_height, self.text_color, smooth, static_image, overlays,
+                      volume_pane, grid_points, data_points if grid_points else None)
+        if static_key != self._chart_static_key:
+            self._clear_chart()
+            self._build_chart_static_layer(chart_left, chart_right, chart_top, chart_bottom,
+                                           zero_y, canvas_width, canvas_height, data_points,
+                                           smooth, static_image, overlays, volume_pane)
+            self._chart_static_key = static_key
         
         if fixed_percentage:
             # 固定百分比模式：确保正负值绝对值一致
@@ -577,10 +1042,222 @@ class StockBarUI:
             max_display_percentage = max_abs_change
             min_display_percentage = max_abs_change
         
+        # 更新百分比标签（文字不变时不产生Tk调用）
+        self._set_chart_text('max_label', f"+{max_display_percentage:.2f}%")
+        self._set_chart_text('min_label', f"-{min_display_percentage:.2f}%")
+        
+        # 计算价格线坐标
+        if slot_mode:
+            points = self._get_slot_points(chart_data, stock_symbol, chart_left, chart_width,
+                                           base_price, max_change, zero_y, chart_height // 2)
+        else:
+            points = self._get_index_points(chart_data, chart_left, chart_width,
+                                            base_price, max_change, zero_y, chart_height // 2)
+        
+        # 数据点多于像素列时按列抽稀，只保留每列的首尾和最高最低点
+        points = decimate_points(points)
+        
+        # 原地更新分时线和最后一个点
+        has_line = len(points) >= 4
+        if has_line:
+            last_x = points[-2]
+            last_y = points[-1]
+            self.chart_canvas.coords(self._chart_items['chart_line'], points)
+            self.chart_canvas.coords(self._chart_items['chart_point'],
+                                     last_x - 2, last_y - 2, last_x + 2, last_y + 2)
+        self._set_chart_visible('chart_line', has_line)
+        self._set_chart_visible('chart_point', has_line)
+        
+        if overlays:
+            self._draw_chart_overlays(chart_data, stock_symbol, slot_mode, chart_left, chart_width,
+                                      base_price, max_change, zero_y, chart_height // 2)
+        if volume_pane:
+            self._draw_volume_bars(current_stock, volume_pane, base_price)
+    
+    def _draw_volume_bars(self, stock, volume_pane, base_price):
+        """原地调整成交量柱
+        
+        每个分钟槽位的柱子在静态层中创建一次，之后只对高度或颜色变化的柱子调用coords
+        或itemconfigure；通常每次刷新只有最后一分钟的柱子变化。纵轴上限留有余量，
+        只有成交量超过上限（或远低于上限，如换股票）时才整体重新缩放。
+        """
+        volumes = stock['volume_series']
+        prices = stock.get('series')
+        if prices is None or len(prices) != TRADING_SLOTS:
+            prices = None
+        pane_top, pane_bottom = volume_pane
+        
+        peak = max(volumes) or 1.0
+        symbol, ceiling = self._volume_ceiling
+        if symbol != stock['symbol'] or peak > ceiling or peak * 4 < ceiling:
+            ceiling = peak * VOLUME_HEADROOM
+            self._volume_ceiling = (stock['symbol'], ceiling)
+        scale = (pane_bottom - pane_top) / ceiling
+        
+        canvas = self.chart_canvas
+        bars = self._volume_bars
+        bar_x = self._volume_bar_x
+        states = self._volume_states
+        previous = base_price
+        for slot in range(TRADING_SLOTS):
+            top = pane_bottom - int(volumes[slot] * scale + 0.5)
+            color = VOLUME_UP_COLOR
+            if prices is not None:
+                price = prices[slot]
+                if price == price:
+                    if price < previous:
+                        color = VOLUME_DOWN_COLOR
+                    previous = price
+            
+            state = states[slot]
+            if state is None or state[0] != top:
+                x0, x1 = bar_x[slot]
+                canvas.coords(bars[slot], x0, top, x1, pane_bottom)
+            if state is None or state[1] != color:
+                canvas.itemconfigure(bars[slot], fill=color)
+            states[slot] = (top, color)
+    
+    def _draw_chart_overlays(self, chart_data, symbol, slot_mode, chart_left, chart_width,
+                             base_price, max_change, zero_y, half_height):
+        """原地更新叠加指标线
+        
+        指标按分钟增量计算，已结束分钟的坐标按股票和纵轴比例缓存，
+        每次更新只换算新结束的分钟和仍在变化的最后一个点。
+        """
+        overlays = self._chart_overlays
+        tracker = self._overlay_trackers.get(symbol)
+        if tracker is None or tracker.names != overlays:
+            tracker = self._overlay_trackers[symbol] = OverlayTracker(overlays)
+        last_values = tracker.update(chart_data)
+        
+        slot_x = get_slot_x_table(chart_left, chart_width) if slot_mode else None
+        count = len(chart_data)
+        
+        def point_x(index):
+            if slot_x is None:
+                return chart_left + (index / count) * chart_width
+            slot = chart_data[index].get('slot')
+            return None if slot is None else slot_x[slot]
+        
+        # 按序号均分时x随点数变化，坐标只能在点数不变时复用
+        key = (symbol, tracker.origin, chart_left, chart_width, base_price, max_change, zero_y, half_height,
+               None if slot_mode else count)
+        cache = self._overlay_points_cache
+        if cache.get('key') != key or cache['count'] > tracker.committed:
+            cache = {'key': key, 'count': 0, 'points': {name: [] for name in overlays}}
+            self._overlay_points_cache = cache
+        
+        for index in range(cache['count'], tracker.committed):
+            x = point_x(index)
+            if x is None:
+                continue
+            for name in overlays:
+                value = tracker.values[name][index]
+                if value == value:
+                    cache['points'][name].extend((x, zero_y - ((value - base_price) / max_change) * half_height))
+        cache['count'] = tracker.committed
+        
+        last_x = point_x(count - 1)
+        for name in overlays:
+            points = cache['points'][name]
+            value = last_values.get(name)
+            if last_x is not None and value is not None and value == value:
+                points = points + [last_x, zero_y - ((value - base_price) / max_change) * half_height]
+            points = decimate_points(points)
+            visible = len(points) >= 4
+            if visible:
+                self.chart_canvas.coords(self._chart_items[f'overlay_{name}'], points)
+            self._set_chart_visible(f'overlay_{name}', visible)
+    
+    def _get_index_points(self, chart_data, chart_left, chart_width, base_price, max_change,
+                          zero_y, half_height):
+        """按数据点序号均分x坐标计算价格线坐标（时间戳无法识别时使用）"""
+        points = []
+        for i, point in enumerate(chart_data):
+            if point.get('price'):
+                x = chart_left + (i / len(chart_data)) * chart_width
+                # 根据相对于昨日收盘价的变化计算Y坐标
+                price_change = point['price'] - base_price
+                # 使用固定的最大变化值来计算Y坐标，确保比例正确
+                # 涨跌范围正好对应图表的上下一半区域
+                y = zero_y - (price_change / max_change) * half_height
+                points.extend([x, y])
+        return points
+    
+    def _get_slot_points(self, chart_data, symbol, chart_left, chart_width, base_price, max_change,
+                         zero_y, half_height):
+        """按固定分钟槽位计算价格线坐标
+        
+        已有分钟的x坐标不随数据增加而变化，坐标按股票缓存：同一股票在布局和
+        纵轴比例不变时只重算最后一个（可能仍在变化的）分钟和新追加的分钟。
+        """
+        slot_x = get_slot_x_table(chart_left, chart_width)
+        key = (symbol, chart_left, chart_width, base_price, max_change, zero_y, half_height)
+        
+        cache = self._chart_points_cache
+        if cache and cache['key'] == key and 0 < cache['count'] <= len(chart_data):
+            start = cache['count'] - 1
+            points = cache['points'][:cache['tail']]
+        else:
+            start = 0
+            points = []
+        
+        tail = len(points)
+        for point in chart_data[start:]:
+            tail = len(points)
+            slot = point.get('slot')
+            if point.get('price') and slot is not None:
+                points.append(slot_x[slot])
+                points.append(zero_y - ((point['price'] - base_price) / max_change) * half_height)
+        
+        self._chart_points_cache = {
+            'key': key,
+            'count': len(chart_data),
+            'tail': tail,
+            'points': points
+        }
+        return points
+    
+    def _build_chart_static_layer(self, chart_left, chart_right, chart_top, chart_bottom,
+                                  zero_y, canvas_width, canvas_height, data_points,
+                                  smooth=True, static_image=False, overlays=(), volume_pane=None):
+        """创建分时图的常驻图元
+        
+        0轴、时间网格和0%标签为纯静态内容；最大/最小百分比标签、叠加指标线、成交量柱、
+        分时线和最后一个点在这里只创建一次，之后由draw_simple_chart原地更新。
+        volume_pane为成交量副图的(顶部y, 底部y)，时间网格延伸到副图底部。
+        static_image为True时0轴和网格虚线合成为一张离屏图片。
+        """
+        if static_image:
+            # 0轴和网格虚线光栅化为一张图片，按(尺寸, 背景色, 虚线位置)缓存；
+            # 只改变叠加指标、成交量柱或平滑设置而虚线不变时重用同一张图片
+            grid_xs = self.get_time_grid_xs(chart_left, chart_right, data_points)
+            bg_color = self.chart_canvas.cget('bg')
+            hlines = ((chart_left, chart_right, zero_y),)
+            vlines = tuple((x, chart_top, chart_bottom) for x in grid_xs)
+            image = self.static_layer_renderer.get_image(
+                (canvas_width, canvas_height, bg_color, hlines, vlines),
+                self.chart_canvas, canvas_width, canvas_height, bg_color,
+                hlines=hlines, vlines=vlines
+            )
+            self.chart_canvas.create_image(0, 0, image=image, anchor='nw', tags="static_layer")
+        else:
+            # 绘制0轴（基准线）
+            self.chart_canvas.create_line(
+                chart_left, zero_y, chart_right, zero_y,
+                fill='#666666',
+                width=1,
+                dash=(2, 2),
+                tags="zero_axis"
+            )
+        
+        # 绘制百分比标签
+        font_size = max(6, min(8, canvas_height // 15))
+        
         # 显示最大涨幅百分比
-        self.chart_canvas.create_text(
+        self._chart_items['max_label'] = self.chart_canvas.create_text(
             chart_right + 2, chart_top + 5,
-            text=f"+{max_display_percentage:.2f}%",
+            text="",
             fill=self.text_color,
             font=("Arial", font_size),
             anchor='w',
@@ -598,91 +1275,129 @@ class StockBarUI:
         )
         
         # 显示最大跌幅百分比
-        self.chart_canvas.create_text(
+        self._chart_items['min_label'] = self.chart_canvas.create_text(
             chart_right + 2, chart_bottom - 5,
-            text=f"-{min_display_percentage:.2f}%",
+            text="",
             fill=self.text_color,
             font=("Arial", font_size),
             anchor='w',
             tags="min_label"
         )
+        self._chart_texts['max_label'] = ""
+        self._chart_texts['min_label'] = ""
         
-        # 绘制价格线
-        points = []
-        for i, point in enumerate(chart_data):
-            if point.get('price'):
-                x = chart_left + (i / len(chart_data)) * chart_width
-                # 根据相对于昨日收盘价的变化计算Y坐标
-                price_change = point['price'] - base_price
-                # 使用固定的最大变化值来计算Y坐标，确保比例正确
-                # 涨跌范围正好对应图表的上下一半区域
-                y = zero_y - (price_change / max_change) * (chart_height // 2)
-                points.extend([x, y])
-        
-        # 绘制时间节点竖向虚线
-        self.draw_time_grid(chart_left, chart_right, chart_top, chart_bottom, len(chart_data))
+        # 绘制时间节点竖向虚线（已光栅化时只绘制时间标签）
+        grid_bottom = volume_pane[1] if volume_pane else chart_bottom
+        self.draw_time_grid(chart_left, chart_right, chart_top, grid_bottom, data_points,
+                            draw_lines=not static_image)
         
-        # 绘制分时线
-        if len(points) >= 4:
+        # 成交量柱：每个分钟槽位一个矩形，以零高度创建，高度和颜色由每次更新设置
+        if volume_pane:
+            pane_top, pane_bottom = volume_pane
             self.chart_canvas.create_line(
-                points,
-                fill=self.text_color,
+                chart_left, pane_top - 1, chart_right, pane_top - 1,
+                fill='#444444',
                 width=1,
-                smooth=True,
-                tags="chart_line"
+                tags="volume_axis"
             )
-            
-            # 绘制最后一个点
-            if len(points) >= 2:
-                last_x = points[-2]
-                last_y = points[-1]
-                self.chart_canvas.create_oval(
-                    last_x - 2, last_y - 2, last_x + 2, last_y + 2,
-                    fill=self.text_color,
-                    outline=self.text_color,
-                    width=1,
-                    tags="chart_point"
-                )
-    
-    
-    def draw_time_grid(self, chart_left, chart_right, chart_top, chart_bottom, data_points):
-        """绘制时间节点竖向虚线"""
+            slot_x = get_slot_x_table(chart_left, chart_right - chart_left)
+            half_width = max(0.5, (chart_right - chart_left) / (TRADING_SLOTS - 1) * 0.35)
+            for x in slot_x:
+                x0, x1 = x - half_width, x + half_width
+                self._volume_bars.append(self.chart_canvas.create_rectangle(
+                    x0, pane_bottom, x1, pane_bottom,
+                    fill=VOLUME_UP_COLOR,
+                    outline='',
+                    tags="volume_bar"
+                ))
+                self._volume_bar_x.append((x0, x1))
+            self._volume_states = [None] * TRADING_SLOTS
+        
+        # 叠加指标线画在分时线下方，先以隐藏状态创建
+        self._chart_overlays = overlays
+        for i, name in enumerate(overlays):
+            self._chart_items[f'overlay_{name}'] = self.chart_canvas.create_line(
+                0, 0, 0, 0,
+                fill=OVERLAY_COLORS[i % len(OVERLAY_COLORS)],
+                width=1,
+                smooth=smooth,
+                state='hidden',
+                tags="chart_overlay"
+            )
+            self._chart_states[f'overlay_{name}'] = 'hidden'
+        
+        # 分时线和最后一个点，先以隐藏状态创建，坐标由每次更新设置
+        self._chart_items['chart_line'] = self.chart_canvas.create_line(
+            0, 0, 0, 0,
+            fill=self.text_color,
+            width=1,
+            smooth=smooth,
+            state='hidden',
+            tags="chart_line"
+        )
+        self._chart_items['chart_point'] = self.chart_canvas.create_oval(
+            0, 0, 0, 0,
+            fill=self.text_color,
+            outline=self.text_color,
+            width=1,
+            state='hidden',
+            tags="chart_point"
+        )
+        self._chart_states['chart_line'] = 'hidden'
+        self._chart_states['chart_point'] = 'hidden'
+    
+    def get_time_grid_points(self, data_points):
+        """计算时间网格节点，返回(数据点索引, 标签)列表"""
         # 定义半小时间隔的时间节点（基于A股交易时间）
         # 9:30-11:30 上午盘，13:00-15:00 下午盘
         # 假设数据点按时间均匀分布，共241个点（每分钟一个）
         
         if data_points < 60:  # 数据不足时不绘制时间线
-            return
-            
+            return []
+        
         # 计算半小时间隔的时间节点对应的数据点索引
         # 241个点对应4小时交易时间（240分钟）
         # 半小时 = 30分钟 = 30个数据点
         
         if data_points >= 241:
             # 完整交易日的半小时时间点
-            key_times = [
+            return [
                 (0, "09:30"),      # 开盘
                 (30, "10:00"),     # 10:00
                 (60, "10:30"),     # 10:30
                 (90, "11:00"),     # 11:00
-                (120, "11:30"),    # 上午收盘
-                (150, "13:00"),    # 下午开盘
-                (180, "13:30"),    # 13:30
-                (210, "14:00"),    # 14:00
-                (240, "14:30"),    # 14:30
+                (120, "11:30"),    # 上午收盘/下午开盘
+                (150, "13:30"),    # 13:30
+                (180, "14:00"),    # 14:00
+                (210, "14:30"),    # 14:30
                 (data_points - 1, "15:00")  # 收盘
             ]
-        else:
-            # 数据不足时按比例计算半小时间隔
-            interval = max(30, data_points // 8)  # 至少30个点间隔
-            key_times = []
-            for i in range(0, data_points, interval):
-                if i == 0:
-                    key_times.append((i, "开盘"))
-                elif i >= data_points - 1:
-                    key_times.append((data_points - 1, "收盘"))
-                else:
-                    key_times.append((i, ""))
+        
+        # 数据不足时按比例计算半小时间隔
+        interval = max(30, data_points // 8)  # 至少30个点间隔
+        key_times = []
+        for i in range(0, data_points, interval):
+            if i == 0:
+                key_times.append((i, "开盘"))
+            elif i >= data_points - 1:
+                key_times.append((data_points - 1, "收盘"))
+            else:
+                key_times.append((i, ""))
+        return key_times
+    
+    def get_time_grid_xs(self, chart_left, chart_right, data_points):
+        """计算时间网格竖线的x坐标"""
+        return [
+            chart_left + (point_index / (data_points - 1)) * (chart_right - chart_left)
+            for point_index, _ in self.get_time_grid_points(data_points)
+            if point_index < data_points
+        ]
+    
+    def draw_time_grid(self, chart_left, chart_right, chart_top, chart_bottom, data_points, draw_lines=True):
+        """绘制时间节点竖向虚线"""
+        key_times = self.get_time_grid_points(data_points)
+        if not key_times:
+            return
         
         # 绘制竖向虚线和时间标签
         font_size = max(6, min(8, (chart_bottom - chart_top) // 20))
@@ -696,13 +1411,14 @@ class StockBarUI:
                 is_morning_close = (point_index == 120 and data_points >= 241)
                 
                 # 绘制竖向虚线，使用与0轴横线相同的颜色
-                self.chart_canvas.create_line(
-                    x, chart_top, x, chart_bottom,
-                    fill='#666666',
-                    width=1,
-                    dash=(2, 2),
-                    tags="time_grid"
-                )
+                if draw_lines:
+                    self.chart_canvas.create_line(
+                        x, chart_top, x, chart_bottom,
+                        fill='#666666',
+                        width=1,
+                        dash=(2, 2),
+                        tags="time_grid"
+                    )
                 
                 # 只在有标签时绘制时间文字
                 if time_label:
@@ -754,44 +1470,11 @@ class StockBarUI:
             
             # 重新绘制分时图
             if hasattr(self, 'current_stock') and self.current_stock and hasattr(self, 'chart_canvas'):
-                self.draw_chart(self.current_stock)
+                self.request_chart_redraw()
     
     def update_label_layout(self):
-        """更新标签布局，根据实际标签数量平均分配高度"""
-        # 根据show_price设置决定哪些标签应该存在
-        show_price = self.config_manager.config.get('show_price', True)
-        
-        if show_price:
-            # 显示所有标签
-            label_attrs = ['stock_name_label', 'stock_price_label', 'stock_change_label']
-        else:
-            # 不显示现价标签
-            label_attrs = ['stock_name_label', 'stock_change_label']
-        
-        # 统计实际存在的标签数量
-        existing_labels = [(attr, getattr(self, attr)) for attr in label_attrs if hasattr(self, attr) and getattr(self, attr)]
-        
-        if not existing_labels:
-            return
-            
-        label_count = len(existing_labels)
-        
-        # 根据标签数量计算字体大小
-        font_sizes = self.calculate_font_sizes(label_count)
-        
-        # 定义每个标签的字体配置
-        font_configs = {
-            'stock_name_label': ('name', "normal"),
-            'stock_price_label': ('price', "normal"),
-            'stock_change_label': ('change', "normal")
-        }
-        
-        # 更新每个存在的标签
-        for label_attr, label in existing_labels:
-            font_key, font_weight = font_configs.get(label_attr, ('name', "normal"))
-            label.config(font=tk.font.Font(family="Microsoft YaHei", size=font_sizes[font_key], weight=font_weight))
-            label.pack_forget()
-            label.pack(fill=tk.BOTH, expand=True)
+        """更新标签字体，字号未变化时不做任何修改"""
+        self._apply_font_sizes()
     
     def update_layout_ratio(self):
         """根据配置的比例重新计算布局"""
@@ -816,8 +1499,8 @@ class StockBarUI:
             
             # 重新绘制分时图
             if hasattr(self, 'current_stock') and self.current_stock and hasattr(self, 'chart_canvas') and self.chart_canvas:
-                self.draw_chart(self.current_stock)
-                
+                self.request_chart_redraw()
+        
         except Exception as e:
             print(f"更新布局比例失败: {e}")
     
@@ -829,6 +1512,9 @@ class StockBarUI:
             self.settings_window.window.attributes('-topmost', True)
             self.settings_window.window.after(100, lambda: self.settings_window.window.attributes('-topmost', False))
         else:
+            # 设置模块只在第一次打开设置窗口时导入
+            from .settings import SettingsWindow
+            
             # 创建新的设置窗口
             self.settings_window = SettingsWindow(self.config_manager, self.stock_manager, self.root, self)
             # 绑定设置窗口关闭事件，清理引用
@@ -865,6 +1551,15 @@ class StockBarUI:
             self.chart_frame = None
             self.info_frame = None
             self.chart_canvas = None
+            self.stock_name_label = None
+            self.stock_price_label = None
+            self.stock_change_label = None
+            self._label_states = {}
+            self._label_fonts = {}
+            if self.ticker_view:
+                self.ticker_view.stop()
+                self.ticker_view = None
+            self.grid_view = None
             
             # 获取当前所有子组件，排除Toplevel窗口（如设置窗口）
             children_to_destroy = []
@@ -911,109 +1606,159 @@ class StockBarUI:
         if not self.current_stock:
             return
         
-        # 获取盘口透明度配置
-        appearance = self.config_manager.get_appearance_settings()
-        pankou_alpha = appearance.get('pankou_opacity', 0.95)  # 使用单独的盘口透明度设置
+        # 鼠标在子组件间移动会重复触发<Enter>，窗口已显示同一股票时无需处理
+        if self._pankou_visible and self._pankou_stock is self.current_stock:
+            return
+        
+        if not self.pankou_window:
+            self._create_pankou_window()
+        
+        self._pankou_stock = self.current_stock
+        self._update_pankou_window()
         
-        # 设置窗口样式
+        # 显示窗口
+        if not self._pankou_visible:
+            self.pankou_window.deiconify()
+            self._pankou_visible = True
+    
+    def refresh_pankou_info(self, stock):
+        """行情更新时刷新已打开的盘口窗口"""
+        if self._pankou_visible and stock is self.current_stock:
+            self._pankou_stock = stock
+            self._update_pankou_window()
+    
+    def _create_pankou_window(self):
+        """创建盘口信息窗口和标签"""
         bg_color = self.config_manager.get_appearance_settings()['bg_color']
         
-        if not self.pankou_window:
-            # 创建新的盘口信息窗口 - 无边框，根据数据弹性宽度
-            self.pankou_window = tk.Toplevel(self.root)
-            self.pankou_window.title(f"{self.current_stock['name']} 盘口")
-            
-            # 设置无边框样式
-            self.pankou_window.overrideredirect(True)
-            
-            # 设置窗口属性
-            self.pankou_window.resizable(False, False)
-            self.pankou_window.attributes('-topmost', True)
-            self.pankou_window.attributes('-alpha', pankou_alpha)
-            self.pankou_window.configure(bg=bg_color)
-            
-            # 创建盘口信息框架 - 减少内边距
-            self.pankou_frame = tk.Frame(self.pankou_window, bg=bg_color)
-            self.pankou_frame.pack(fill=tk.BOTH, expand=True, padx=3, pady=3)
+        # 创建新的盘口信息窗口 - 无边框，根据数据弹性宽度
+        self.pankou_window = tk.Toplevel(self.root)
+        
+        # 设置无边框样式
+        self.pankou_window.overrideredirect(True)
+        
+        # 设置窗口属性
+        self.pankou_window.resizable(False, False)
+        self.pankou_window.attributes('-topmost', True)
+        self.pankou_window.withdraw()
+        
+        # 创建盘口信息框架 - 减少内边距
+        self.pankou_frame = tk.Frame(self.pankou_window, bg=bg_color)
+        self.pankou_frame.pack(fill=tk.BOTH, expand=True, padx=3, pady=3)
+        
+        # 初始化标签字典
+        self.pankou_labels = {
+            'sell': [],
+            'buy': []
+        }
+        
+        # 创建卖盘标签
+        for i in range(5):
+            price_label = tk.Label(self.pankou_frame, bg=bg_color, fg="#00ff00", font=("Microsoft YaHei", 6),
+                                 borderwidth=0, highlightthickness=0, padx=0, pady=0, height=1)
+            price_label.grid(row=i, column=0, sticky=tk.E+tk.N+tk.S, padx=1, pady=0)
             
-            # 初始化标签字典
-            self.pankou_labels = {
-                'sell': [],
-                'buy': []
-            }
+            volume_label = tk.Label(self.pankou_frame, bg=bg_color, fg="#00ff00", font=("Microsoft YaHei", 6),
+                                 borderwidth=0, highlightthickness=0, padx=0, pady=0, height=1)
+            volume_label.grid(row=i, column=1, sticky=tk.W+tk.N+tk.S, padx=3, pady=0)
             
-            # 创建卖盘标签
-            for i in range(5):
-                price_label = tk.Label(self.pankou_frame, bg=bg_color, fg="#00ff00", font=("Microsoft YaHei", 6),
-                                     borderwidth=0, highlightthickness=0, padx=0, pady=0, height=1)
-                price_label.grid(row=i, column=0, sticky=tk.E+tk.N+tk.S, padx=1, pady=0)
-                
-                volume_label = tk.Label(self.pankou_frame, bg=bg_color, fg="#00ff00", font=("Microsoft YaHei", 6),
-                                     borderwidth=0, highlightthickness=0, padx=0, pady=0, height=1)
-                volume_label.grid(row=i, column=1, sticky=tk.W+tk.N+tk.S, padx=3, pady=0)
-                
-                self.pankou_labels['sell'].append((price_label, volume_label))
+            self.pankou_labels['sell'].append((price_label, volume_label))
+        
+        # 分隔线 - 更细的分隔线，更小的间距
+        tk.Frame(self.pankou_frame, height=1, bg="#cccccc", borderwidth=0, highlightthickness=0).grid(row=5, column=0, columnspan=2, pady=0, sticky=tk.EW)
+        
+        # 创建买盘标签
+        for i in range(5):
+            price_label = tk.Label(self.pankou_frame, bg=bg_color, fg="#ff6b6b", font=("Microsoft YaHei", 6),
+                                 borderwidth=0, highlightthickness=0, padx=0, pady=0, height=1)
+            price_label.grid(row=i+6, column=0, sticky=tk.E+tk.N+tk.S, padx=1, pady=0)
             
-            # 分隔线 - 更细的分隔线，更小的间距
-            tk.Frame(self.pankou_frame, height=1, bg="#cccccc", borderwidth=0, highlightthickness=0).grid(row=5, column=0, columnspan=2, pady=0, sticky=tk.EW)
+            volume_label = tk.Label(self.pankou_frame, bg=bg_color, fg="#ff6b6b", font=("Microsoft YaHei", 6),
+                                 borderwidth=0, highlightthickness=0, padx=0, pady=0, height=1)
+            volume_label.grid(row=i+6, column=1, sticky=tk.W+tk.N+tk.S, padx=3, pady=0)
             
-            # 创建买盘标签
-            for i in range(5):
-                price_label = tk.Label(self.pankou_frame, bg=bg_color, fg="#ff6b6b", font=("Microsoft YaHei", 6),
-                                     borderwidth=0, highlightthickness=0, padx=0, pady=0, height=1)
-                price_label.grid(row=i+6, column=0, sticky=tk.E+tk.N+tk.S, padx=1, pady=0)
-                
-                volume_label = tk.Label(self.pankou_frame, bg=bg_color, fg="#ff6b6b", font=("Microsoft YaHei", 6),
-                                     borderwidth=0, highlightthickness=0, padx=0, pady=0, height=1)
-                volume_label.grid(row=i+6, column=1, sticky=tk.W+tk.N+tk.S, padx=3, pady=0)
-                
-                self.pankou_labels['buy'].append((price_label, volume_label))
-        else:
-            # 更新窗口属性
-            self.pankou_window.title(f"{self.current_stock['name']} 盘口")
+            self.pankou_labels['buy'].append((price_label, volume_label))
+        
+        # 标签当前文字、窗口样式和测量尺寸的缓存
+        self._pankou_texts = {}
+        self._pankou_style = None
+        self._pankou_title = None
+        self._pankou_size_key = None
+        self._pankou_size = None
+        self._pankou_geometry = None
+    
+    def _format_pankou_level(self, level):
+        """格式化一档盘口的价格和成交量文字"""
+        if not isinstance(level, dict) or 'price' not in level or 'volume' not in level:
+            return None
+        price = f"{level['price']:.2f}" if level['price'] > 0 else '--'
+        volume = f"{level['volume']}" if level['volume'] > 0 else '--'
+        return price, volume
+    
+    def _update_pankou_window(self):
+        """按当前股票的盘口数据更新窗口，只修改变化的标签"""
+        stock = self._pankou_stock
+        
+        # 窗口样式只在透明度或背景色变化时更新
+        appearance = self.config_manager.get_appearance_settings()
+        pankou_alpha = appearance.get('pankou_opacity', 0.95)  # 使用单独的盘口透明度设置
+        bg_color = appearance['bg_color']
+        style = (pankou_alpha, bg_color)
+        if style != self._pankou_style:
             self.pankou_window.attributes('-alpha', pankou_alpha)
             self.pankou_window.configure(bg=bg_color)
             self.pankou_frame.configure(bg=bg_color)
+            for side in ('sell', 'buy'):
+                for price_label, volume_label in self.pankou_labels[side]:
+                    price_label.config(bg=bg_color)
+                    volume_label.config(bg=bg_color)
+            self._pankou_style = style
+        
+        title = f"{stock['name']} 盘口"
+        if title != self._pankou_title:
+            self.pankou_window.title(title)
+            self._pankou_title = title
+        
+        # 获取盘口数据，不足5档时补空数据（不修改股票对象本身）
+        pankou_data = stock.get('pankou', {})
+        empty_level = {'price': 0, 'volume': 0}
+        sell_levels = list(pankou_data.get('sell', [])) + [empty_level] * 5
+        buy_levels = list(pankou_data.get('buy', [])) + [empty_level] * 5
+        
+        # 卖盘从卖5到卖1显示，买盘从买1到买5显示
+        rows = [(labels, sell_levels[:5][-(i+1)]) for i, labels in enumerate(self.pankou_labels['sell'])]
+        rows += [(labels, buy_levels[i]) for i, labels in enumerate(self.pankou_labels['buy'])]
+        
+        max_price_len = 0
+        max_volume_len = 0
+        for (price_label, volume_label), level in rows:
+            texts = self._format_pankou_level(level)
+            if texts is None:
+                texts = (self._pankou_texts.get(price_label, ''), self._pankou_texts.get(volume_label, ''))
+            price_text, volume_text = texts
+            if self._pankou_texts.get(price_label) != price_text:
+                price_label.config(text=price_text)
+                self._pankou_texts[price_label] = price_text
+            if self._pankou_texts.get(volume_label) != volume_text:
+                volume_label.config(text=volume_text)
+                self._pankou_texts[volume_label] = volume_text
+            max_price_len = max(max_price_len, len(price_text))
+            max_volume_len = max(max_volume_len, len(volume_text))
+        
+        # 窗口尺寸只取决于最长的价格和成交量位数，位数不变时沿用上次测量结果
+        size_key = (max_price_len, max_volume_len)
+        if size_key != self._pankou_size_key:
+            self.pankou_window.update_idletasks()
+            self._pankou_size = (
+                self.pankou_frame.winfo_reqwidth() + 6,  # 加上左右边距
+                self.pankou_frame.winfo_reqheight() + 6  # 加上上下边距
+            )
+            self._pankou_size_key = size_key
         
-        # 获取盘口数据，如果没有则使用空数据
-        pankou_data = self.current_stock.get('pankou', {})
-        sell_levels = pankou_data.get('sell', [])
-        buy_levels = pankou_data.get('buy', [])
-        
-        # 确保有5个卖盘和买盘数据项
-        while len(sell_levels) < 5:
-            sell_levels.append({'price': 0, 'volume': 0})
-        while len(buy_levels) < 5:
-            buy_levels.append({'price': 0, 'volume': 0})
-        
-        # 更新卖盘标签
-        for i, (price_label, volume_label) in enumerate(self.pankou_labels['sell']):
-            if i < len(sell_levels):
-                sell = sell_levels[-(i+1)]  # 从卖5到卖1显示
-                if isinstance(sell, dict) and 'price' in sell and 'volume' in sell:
-                    price = sell['price'] if sell['price'] > 0 else '--'
-                    volume = sell['volume'] if sell['volume'] > 0 else '--'
-                    price_label.config(text=f"{price:.2f}" if isinstance(price, (int, float)) else price, bg=bg_color, fg="#00ff00")
-                    volume_label.config(text=f"{volume}", bg=bg_color, fg="#00ff00")
-        
-        # 更新买盘标签
-        for i, (price_label, volume_label) in enumerate(self.pankou_labels['buy']):
-            if i < len(buy_levels):
-                buy = buy_levels[i]  # 从买1到买5显示
-                if isinstance(buy, dict) and 'price' in buy and 'volume' in buy:
-                    price = buy['price'] if buy['price'] > 0 else '--'
-                    volume = buy['volume'] if buy['volume'] > 0 else '--'
-                    price_label.config(text=f"{price:.2f}" if isinstance(price, (int, float)) else price, bg=bg_color, fg="#ff6b6b")
-                    volume_label.config(text=f"{volume}", bg=bg_color, fg="#ff6b6b")
-        
-        # 自动调整窗口大小 - 让Tkinter自动计算所需宽度
-        # 更新所有组件的布局
-        self.pankou_window.update_idletasks()
-        
-        # 获取窗口所需的实际宽度和高度
-        window_width = self.pankou_frame.winfo_reqwidth() + 6  # 加上左右边距
-        window_height = self.pankou_frame.winfo_reqheight() + 6  # 加上上下边距
-        
+        self._position_pankou_window(*self._pankou_size)
+    
+    def _position_pankou_window(self, window_width, window_height):
+        """将盘口窗口放在主窗口旁边，确保不超出屏幕"""
         # 获取屏幕宽度和高度
         screen_width = self.root.winfo_screenwidth()
         screen_height = self.root.winfo_screenheight()
@@ -1039,21 +1784,25 @@ class StockBarUI:
         if y < 0:
             y = 0
         
-        # 设置最终窗口位置和大小
-        self.pankou_window.geometry(f"{window_width}x{window_height}+{x}+{y}")
-        
-        # 显示窗口
-        self.pankou_window.deiconify()
+        # 位置和大小没有变化时不重设geometry
+        geometry = f"{window_width}x{window_height}+{x}+{y}"
+        if geometry != self._pankou_geometry:
+            self.pankou_window.geometry(geometry)
+            self._pankou_geometry = geometry
     
     def hide_pankou_info(self):
         """隐藏盘口信息窗口"""
-        if self.pankou_window:
+        if self.pankou_window and self._pankou_visible:
             # 只隐藏窗口，不销毁，提高性能
             self.pankou_window.withdraw()
+            self._pankou_visible = False
     
     def close_app(self):
-        """关闭应用"""
+        """关闭应用，退出主循环后由Win11StockBar.shutdown停止服务并保存行情和配置"""
         self.hide_pankou_info()
+        self.toast.hide()
+        # 执行等待中的防抖任务，避免丢失最后一次窗口位置
+        self.redraw_scheduler.flush()
         self.root.quit()
     
     def on_settings_window_closed(self):
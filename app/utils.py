@@ -55,11 +55,17 @@ def update_text_label(label, text, fg_color=None):
     """更新Text标签的公共方法
     
     参数:
-        label: 要更新的Text标签
+        label: 要更新的标签，支持Text和Label
         text: 新的文本内容
         fg_color: 可选，新的字体颜色
     """
-    if label:
+    if label and not isinstance(label, tk.Text):
+        # Label只需一次配置调用
+        if fg_color:
+            label.config(text=text, fg=fg_color)
+        else:
+            label.config(text=text)
+    elif label:
         label.config(state=tk.NORMAL)
         label.delete('1.0', tk.END)
         label.insert('1.0', text)
@@ -67,3 +73,17 @@ def update_text_label(label, text, fg_color=None):
         if fg_color:
             label.config(fg=fg_color)
         label.config(state=tk.DISABLED)
+
+
+def get_change_color(change):
+    """根据涨跌幅文本返回显示颜色（中国股市习惯：上涨和0为红色，下跌为绿色）
+    
+    参数:
+        change: 涨跌幅文本，如 '+1.23%'、'-0.50%'
+    
+    返回:
+        颜色值，下跌为 '#00ff00'（绿色），其余为 '#ff6b6b'（红色）
+    """
+    if change.startswith('-'):
+        return '#00ff00'  # 绿色（跌）
+    return '#ff6b6b'  # 红色（涨或平）
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+配置文件变化监视模块
+"""
+
+import os
+
+
+class ConfigWatcher:
+    """配置文件变化监视器
+    
+    在Tk主线程上用after定时检查文件的修改时间和大小，每次检查只有一次stat调用。
+    签名变化时调用回调，回调返回False表示文件暂时无法读取（如正在被写入），
+    下次检查时会再次尝试。
+    """
+    
+    def __init__(self, root, path, on_change, interval=1000):
+        """初始化监视器
+        
+        参数:
+            root: Tk根窗口，用于after调度
+            path: 配置文件路径
+            on_change: 文件变化时的回调函数
+            interval: 检查间隔（毫秒）
+        """
+        self.root = root
+        self.path = path
+        self.on_change = on_change
+        self.interval = interval
+        self._signature = self._stat()
+        self._job = None
+    
+    def _stat(self):
+        """获取文件签名（修改时间, 大小），文件不存在时返回None"""
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+    
+    def start(self):
+        """开始监视"""
+        if self._job is None and self.interval > 0:
+            self._job = self.root.after(self.interval, self._poll)
+    
+    def stop(self):
+        """停止监视"""
+        if self._job is not None:
+            self.root.after_cancel(self._job)
+            self._job = None
+    
+    def _poll(self):
+        """检查一次文件是否变化"""
+        if self.interval <= 0:
+            # 检查间隔被改为0，停止监视
+            self._job = None
+            return
+        self._job = self.root.after(self.interval, self._poll)
+        
+        signature = self._stat()
+        if signature is None or signature == self._signature:
+            return
+        
+        self._signature = signature
+        try:
+            if self.on_change() is False:
+                # 读取失败，下次检查时重试
+                self._signature = None
+        except Exception as e:
+            print(f"处理配置文件变化失败: {e}")
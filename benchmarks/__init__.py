@@ -0,0 +1 @@
+"""股票工具栏性能基准测试"""
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+价格提醒检查基准测试
+
+模拟整个关注列表的批量刷新，比较AlertEngine按有序阈值二分查找与逐条检查全部规则
+每次刷新的耗时。规则由每只股票的价格规则和对全部股票生效的涨跌幅、涨跌停规则组成。
+
+使用方法：python -m benchmarks.bench_alerts --symbols 50 --rules 5000
+"""
+
+import argparse
+import random
+import time
+
+from app.alerts import ALERT_COOLDOWN, AlertEngine
+
+
+def make_rules(symbols, count):
+    """生成规则：少量通配规则，其余为分散在各股票上的价格规则"""
+    rules = [
+        {'symbol': '*', 'type': 'percent', 'value': 5},
+        {'symbol': '*', 'type': 'percent', 'value': -5},
+        {'symbol': '*', 'type': 'limit', 'value': 1},
+    ]
+    for _ in range(count - len(rules)):
+        rules.append({
+            'symbol': random.choice(symbols),
+            'type': 'price',
+            'value': round(random.uniform(80, 120), 2),
+        })
+    return rules
+
+
+def make_ticks(symbols, rounds):
+    """生成每轮刷新各股票的价格（昨日收盘价均为100）"""
+    prices = {symbol: 100.0 for symbol in symbols}
+    ticks = []
+    for _ in range(rounds):
+        for symbol in symbols:
+            prices[symbol] = round(min(110.0, max(90.0, prices[symbol] + random.gauss(0, 0.3))), 2)
+        ticks.append(dict(prices))
+    return ticks
+
+
+def scan_all(engine, stock, last_prices):
+    """逐条检查全部阈值，作为对照
+    
+    除了不用二分查找外与AlertEngine.evaluate做同样的工作：判断方向、
+    应用冷却时间并生成提醒，返回触发的提醒列表。
+    """
+    price = float(stock['price'])
+    symbol = stock['symbol']
+    last_price = last_prices.get(symbol)
+    last_prices[symbol] = price
+    if last_price is None or last_price == price:
+        return []
+    rules = engine._rules
+    _, _, _, levels, entries = engine._get_index(stock, rules)
+    moving = 'up' if price > last_price else 'down'
+    now = time.time()
+    alerts = []
+    for level, (direction, rule_id, up_text, down_text) in zip(levels, entries):
+        # 上穿：last_price < 阈值 <= price；下穿：price <= 阈值 < last_price
+        if moving == 'up':
+            crossed = last_price < level <= price
+        else:
+            crossed = price <= level < last_price
+        if not crossed or (direction != 'both' and direction != moving):
+            continue
+        key = (symbol, rule_id, moving)
+        if now - engine._last_fired.get(key, 0) < ALERT_COOLDOWN:
+            continue
+        engine._last_fired[key] = now
+        alerts.append(engine._make_alert(stock, rules[0][rule_id], level, price,
+                                         up_text if moving == 'up' else down_text, now))
+    return alerts
+
+
+def run_case(check, symbols, ticks):
+    """测量每轮批量刷新的平均耗时（毫秒）"""
+    stocks = {symbol: {'symbol': symbol, 'name': symbol, 'yesterday_close': 100.0, 'change': ''}
+              for symbol in symbols}
+    start = time.perf_counter()
+    for prices in ticks:
+        for symbol, price in prices.items():
+            stock = stocks[symbol]
+            stock['price'] = f"{price:.2f}"
+            check(stock)
+    return (time.perf_counter() - start) / len(ticks) * 1000
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="价格提醒检查基准测试")
+    parser.add_argument('--symbols', type=int, default=50, help="关注的股票数")
+    parser.add_argument('--rules', type=int, default=5000, help="规则总数")
+    parser.add_argument('--rounds', type=int, default=200, help="批量刷新轮数")
+    args = parser.parse_args()
+    
+    random.seed(0)
+    symbols = [f"{600000 + i}" for i in range(args.symbols)]
+    rules = make_rules(symbols, args.rules)
+    ticks = make_ticks(symbols, args.rounds)
+    
+    indexed = AlertEngine(rules)
+    indexed_cost = run_case(indexed.evaluate, symbols, ticks)
+    
+    scanned = AlertEngine(rules)
+    last_prices = {}
+    scan_cost = run_case(lambda stock: scan_all(scanned, stock, last_prices), symbols, ticks)
+    
+    print(f"{args.symbols} 只股票，{args.rules} 条规则，{args.rounds} 轮刷新")
+    print(f"{'实现':<12} {'耗时(ms/轮)':>12}")
+    print(f"{'逐条检查':<12} {scan_cost:>12.4f}")
+    print(f"{'二分查找':<12} {indexed_cost:>12.4f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+分时图绘制基准测试
+
+分别用241、1000、10000个数据点驱动StockBarUI.draw_simple_chart，
+比较未抽稀（原始路径）与按像素列抽稀在平滑开/关两种画质下的单次绘制耗时。
+需要可用的图形界面环境。
+
+使用方法：python -m benchmarks.bench_chart
+"""
+
+import argparse
+import random
+import time
+import tkinter as tk
+
+from app import ui as ui_module
+from app.chart_layer import StaticLayerRenderer
+from app.config import ConfigManager
+from app.ui import StockBarUI
+
+
+POINT_COUNTS = (241, 1000, 10000)
+
+
+def make_chart_data(count, base_price=10.0):
+    """生成随机游走的分时数据"""
+    price = base_price
+    chart_data = []
+    for i in range(count):
+        price = max(0.01, price + random.uniform(-0.02, 0.02))
+        chart_data.append({'time': i, 'price': round(price, 2)})
+    return chart_data
+
+
+def make_chart_ui(root, canvas, smooth):
+    """创建只包含分时图绘制所需属性的StockBarUI实例"""
+    config_manager = ConfigManager.__new__(ConfigManager)
+    config_manager.config_file = None
+    config_manager.config = config_manager.get_default_config()
+    config_manager.config['chart_smooth'] = smooth
+    
+    ui = StockBarUI.__new__(StockBarUI)
+    ui.root = root
+    ui.config_manager = config_manager
+    ui.text_color = '#ffffff'
+    ui.chart_canvas = canvas
+    ui.static_layer_renderer = StaticLayerRenderer()
+    ui._reset_chart_items()
+    return ui
+
+
+def run_case(root, canvas, count, smooth, decimate, ticks, width, height):
+    """测量一种组合的平均单次绘制耗时（毫秒）"""
+    chart_data = make_chart_data(count)
+    stock = {'symbol': '002624', 'yesterday_close': chart_data[0]['price'], 'chart_data': chart_data}
+    
+    canvas.delete("all")
+    ui = make_chart_ui(root, canvas, smooth)
+    ui.current_stock = stock
+    
+    original = ui_module.decimate_points
+    if not decimate:
+        ui_module.decimate_points = lambda points: points
+    try:
+        # 首次绘制包含静态层创建，不计入结果
+        ui.draw_simple_chart(chart_data, width, height)
+        root.update_idletasks()
+        
+        start = time.perf_counter()
+        for _ in range(ticks):
+            chart_data[-1]['price'] = round(chart_data[-1]['price'] + random.uniform(-0.01, 0.01), 2)
+            ui.draw_simple_chart(chart_data, width, height)
+            root.update_idletasks()
+        elapsed = time.perf_counter() - start
+    finally:
+        ui_module.decimate_points = original
+    
+    return elapsed / ticks * 1000
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="分时图绘制基准测试")
+    parser.add_argument('--ticks', type=int, default=50, help="每种组合的绘制次数")
+    parser.add_argument('--width', type=int, default=300, help="画布宽度")
+    parser.add_argument('--height', type=int, default=48, help="画布高度")
+    args = parser.parse_args()
+    
+    root = tk.Tk()
+    root.geometry(f"{args.width}x{args.height}")
+    canvas = tk.Canvas(root, width=args.width, height=args.height, bg='#1e1e1e', highlightthickness=0)
+    canvas.pack(fill=tk.BOTH, expand=True)
+    root.update()
+    
+    print(f"{'数据点':>8} {'平滑':>4} {'抽稀':>4} {'耗时(ms)':>10}")
+    try:
+        for count in POINT_COUNTS:
+            for smooth in (True, False):
+                for decimate in (False, True):
+                    cost = run_case(root, canvas, count, smooth, decimate,
+                                    args.ticks, args.width, args.height)
+                    print(f"{count:>8} {'是' if smooth else '否':>4} {'是' if decimate else '否':>4} {cost:>10.3f}")
+    finally:
+        root.destroy()
+
+
+if __name__ == "__main__":
+    main()
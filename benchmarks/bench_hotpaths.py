@@ -0,0 +1,346 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+解析与绘制热路径的离线基准测试
+
+用fixtures目录中的分时接口数据驱动StockDataManager的解析函数和
+StockBarUI.draw_simple_chart，画布使用RecordingCanvas替身，不需要网络和图形界面。
+每项报告每秒次数、单次耗时、单次内存峰值和画布调用次数，
+可保存为JSON基线并与之后的版本比较。
+
+使用方法：
+    python -m benchmarks.bench_hotpaths
+    python -m benchmarks.bench_hotpaths --save v1
+    python -m benchmarks.bench_hotpaths --compare v1
+"""
+
+import argparse
+import copy
+import gc
+import json
+import logging
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from queue import Queue
+
+from app.metrics import metrics
+from app.stock import StockDataManager
+from benchmarks.bench_chart import make_chart_ui
+from benchmarks.fixtures import load_fixture
+from benchmarks.recording_canvas import RecordingCanvas
+
+
+BASELINE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baselines')
+
+# tick_overlays项开启的叠加指标
+OVERLAYS = ('vwap', 'ma5', 'ema20')
+
+# 与基线比较时，单次耗时增加超过该比例视为性能退化（可用--threshold修改）
+REGRESSION_THRESHOLD = 0.10
+
+
+def make_stock_manager():
+    """创建不启动工作线程的StockDataManager实例"""
+    manager = StockDataManager.__new__(StockDataManager)
+    manager.stocks = []
+    manager.current_stock_index = 0
+    manager.is_fetching = False
+    manager.fetch_queue = Queue()
+    manager.pending_symbols = set()
+    manager.refresh_interval = 3
+    manager._generations = {}
+    manager.update_callback = None
+    return manager
+
+
+def make_stock():
+    """创建一只待解析的股票"""
+    return {'symbol': '600519', 'name': '', 'price': '0.00', 'change': '+0.00%'}
+
+
+def silence_logging():
+    """把日志输出重定向到空设备，日志格式化的开销仍计入结果"""
+    devnull = open(os.devnull, 'w')
+    for handler in logging.getLogger().handlers:
+        if isinstance(handler, logging.StreamHandler):
+            handler.setStream(devnull)
+    return devnull
+
+
+class HotPathCases:
+    """一组基于同一份数据的测试项
+    
+    每个测试项是一个无参数函数，执行一次对应的热路径。
+    行情刷新时最后一个价格会变化，所以tick项每次交替修改最新价格。
+    """
+    
+    def __init__(self, payload, width, height, smooth):
+        """初始化测试项
+        
+        参数:
+            payload: 分时接口data字段
+            width: 画布宽度
+            height: 画布高度
+            smooth: 是否平滑绘制
+        """
+        self.payload = payload
+        self.width = width
+        self.height = height
+        self.manager = make_stock_manager()
+        self.stock = make_stock()
+        self.manager.parse_stock_data(self.stock, payload)
+        
+        self.canvas = RecordingCanvas(width, height)
+        self.ui = self._make_ui(smooth)
+        # 开启均价线和均线叠加、成交量副图的界面，用于tick_overlays和tick_volume
+        self.overlay_ui = self._make_ui(smooth, chart_overlays=list(OVERLAYS))
+        self.volume_ui = self._make_ui(smooth, chart_volume=True)
+        
+        self._tick_payload = copy.deepcopy(payload)
+        self._tick_prices = self._tick_payload['zhutu']['left_line_list'][0]['data']
+        self._tick_last = self._tick_prices[-1]
+        bars = self._tick_payload['zhutu'].get('bar_list')
+        self._tick_volumes = bars[0]['data'] if bars else None
+        self._tick_count = 0
+    
+    def _make_ui(self, smooth, **config):
+        """创建绘制当前股票的界面，首次绘制包含静态层和图元的创建，不计入结果"""
+        ui = make_chart_ui(None, self.canvas, smooth)
+        ui.config_manager.config.update(config)
+        ui.current_stock = self.stock
+        ui.draw_simple_chart(self.stock['chart_data'], self.width, self.height)
+        return ui
+    
+    def cases(self):
+        """返回(名称, 函数)列表"""
+        return [
+            ('parse_stock_data', self.parse_stock_data),
+            ('extract_chart_data', self.extract_chart_data),
+            ('parse_pankou_data', self.parse_pankou_data),
+            ('parse_current_price', self.parse_current_price),
+            ('draw_simple_chart', self.draw_simple_chart),
+            ('tick', self.tick),
+            ('tick_overlays', self.tick_overlays),
+            ('tick_volume', self.tick_volume),
+        ]
+    
+    def parse_stock_data(self):
+        self.manager.parse_stock_data(self.stock, self.payload)
+    
+    def extract_chart_data(self):
+        self.manager.extract_chart_data(self.stock, self.payload)
+    
+    def parse_pankou_data(self):
+        self.manager.parse_pankou_data(self.stock, self.payload)
+    
+    def parse_current_price(self):
+        self.manager.parse_current_price(self.stock, self.payload)
+    
+    def draw_simple_chart(self):
+        self.ui.draw_simple_chart(self.stock['chart_data'], self.width, self.height)
+    
+    def tick(self):
+        """一次完整的刷新：最新价格变化后解析并重绘"""
+        self._redraw_after_tick(self.ui)
+    
+    def tick_overlays(self):
+        """同tick，分时图上另有均价线和均线叠加"""
+        self._redraw_after_tick(self.overlay_ui)
+    
+    def tick_volume(self):
+        """同tick，分时图下方另有成交量柱"""
+        self._redraw_after_tick(self.volume_ui)
+    
+    def _redraw_after_tick(self, ui):
+        """修改最新价格和成交量，解析后用指定界面重绘"""
+        self._tick_count += 1
+        self._tick_prices[-1] = round(self._tick_last + 0.01 * (self._tick_count % 2), 2)
+        if self._tick_volumes:
+            self._tick_volumes[-1] += 100
+        self.manager.parse_stock_data(self.stock, self._tick_payload)
+        ui.draw_simple_chart(self.stock['chart_data'], self.width, self.height)
+
+
+def measure(func, iterations, rounds, canvas):
+    """测量一个测试项
+    
+    先不开启tracemalloc测量耗时，再单独运行一轮用tracemalloc测量内存，
+    避免内存追踪的开销影响耗时结果。
+    """
+    for _ in range(min(iterations, 50)):
+        func()
+    
+    # 分多轮计时取最快的一轮，减少其他进程干扰带来的波动
+    canvas.reset_calls()
+    round_iterations = max(1, iterations // rounds)
+    elapsed = None
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for _ in range(round_iterations):
+            func()
+        round_elapsed = time.perf_counter() - start
+        if elapsed is None or round_elapsed < elapsed:
+            elapsed = round_elapsed
+    canvas_calls = {name: count / (round_iterations * rounds)
+                    for name, count in sorted(canvas.calls.items())}
+    
+    memory_iterations = max(1, iterations // 10)
+    tracemalloc.start()
+    try:
+        # 先在追踪下执行几次，使被替换的旧对象都换成可追踪的新对象
+        for _ in range(5):
+            func()
+        gc.collect()
+        base, _ = tracemalloc.get_traced_memory()
+        peak_total = 0
+        for _ in range(memory_iterations):
+            before, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            func()
+            _, peak = tracemalloc.get_traced_memory()
+            peak_total += peak - before
+        gc.collect()
+        current, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    
+    us_per_op = elapsed / round_iterations * 1000000
+    return {
+        'iterations': round_iterations * rounds,
+        'ops_per_sec': round_iterations / elapsed if elapsed > 0 else 0.0,
+        'us_per_op': us_per_op,
+        'peak_kib_per_op': peak_total / memory_iterations / 1024,
+        'retained_bytes': current - base,
+        'canvas_calls_per_op': canvas_calls,
+    }
+
+
+def run(fixture, iterations, rounds, width, height, smooth):
+    """运行全部测试项"""
+    payload = load_fixture(fixture)
+    cases = HotPathCases(payload, width, height, smooth)
+    results = {}
+    for name, func in cases.cases():
+        results[name] = measure(func, iterations, rounds, cases.canvas)
+    # 测试期间装饰器记录的指标不代表真实运行
+    metrics.reset()
+    return results
+
+
+def environment_info(args):
+    """记录基线的运行环境"""
+    return {
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'platform': platform.platform(),
+        'timestamp': time.strftime('%Y-%m-%d %H:%M:%S'),
+        'fixture': args.fixture,
+        'iterations': args.iterations,
+        'rounds': args.rounds,
+        'width': args.width,
+        'height': args.height,
+        'smooth': not args.no_smooth,
+    }
+
+
+def baseline_path(name):
+    """获取基线文件路径"""
+    return os.path.join(BASELINE_DIR, f'{name}.json')
+
+
+def save_baseline(name, environment, results):
+    """保存基线"""
+    os.makedirs(BASELINE_DIR, exist_ok=True)
+    with open(baseline_path(name), 'w', encoding='utf-8') as f:
+        json.dump({'environment': environment, 'results': results}, f, ensure_ascii=False, indent=2)
+
+
+def load_baseline(name):
+    """读取基线"""
+    with open(baseline_path(name), 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def format_calls(calls):
+    """格式化每次执行的画布调用次数"""
+    if not calls:
+        return '-'
+    return ' '.join(f"{name}={count:g}" for name, count in calls.items())
+
+
+def print_results(results, baseline=None, threshold=REGRESSION_THRESHOLD):
+    """打印结果，提供基线时显示单次耗时的变化"""
+    header = f"{'测试项':<20} {'次/秒':>10} {'耗时(µs)':>10} {'峰值(KiB)':>10} {'残留(B)':>8}"
+    if baseline is not None:
+        header += f" {'对比基线':>10}"
+    print(header + "  画布调用/次")
+    
+    regressions = []
+    for name, result in results.items():
+        line = (f"{name:<20} {result['ops_per_sec']:>10.0f} {result['us_per_op']:>10.2f} "
+                f"{result['peak_kib_per_op']:>10.2f} {result['retained_bytes']:>8}")
+        if baseline is not None:
+            previous = baseline.get(name)
+            if previous and previous['us_per_op'] > 0:
+                delta = result['us_per_op'] / previous['us_per_op'] - 1
+                mark = ' !' if delta > threshold else '  '
+                line += f" {delta:>+9.1%}{mark}"
+                if delta > threshold:
+                    regressions.append(name)
+            else:
+                line += f" {'新增':>10}  "
+        print(f"{line}  {format_calls(result['canvas_calls_per_op'])}")
+    return regressions
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="解析与绘制热路径的离线基准测试")
+    parser.add_argument('--fixture', default='fenshi_full_day', help="使用的数据名称")
+    parser.add_argument('--iterations', type=int, default=2000, help="每个测试项的执行次数")
+    parser.add_argument('--rounds', type=int, default=5, help="计时轮数，取最快一轮")
+    parser.add_argument('--width', type=int, default=300, help="画布宽度")
+    parser.add_argument('--height', type=int, default=48, help="画布高度")
+    parser.add_argument('--no-smooth', action='store_true', help="关闭平滑绘制")
+    parser.add_argument('--save', metavar='NAME', help="把结果保存为基线")
+    parser.add_argument('--compare', metavar='NAME', help="与已保存的基线比较")
+    parser.add_argument('--threshold', type=float, default=REGRESSION_THRESHOLD,
+                        help="视为退化的单次耗时增加比例")
+    args = parser.parse_args()
+    
+    baseline = None
+    if args.compare:
+        try:
+            saved = load_baseline(args.compare)
+        except (OSError, ValueError) as e:
+            print(f"读取基线失败: {e}")
+            return 2
+        baseline = saved['results']
+        environment = saved.get('environment', {})
+        print(f"基线 {args.compare}: Python {environment.get('python')}，"
+              f"数据 {environment.get('fixture')}，{environment.get('timestamp')}")
+    
+    devnull = silence_logging()
+    try:
+        results = run(args.fixture, args.iterations, args.rounds, args.width, args.height, not args.no_smooth)
+    finally:
+        devnull.close()
+    
+    regressions = print_results(results, baseline, args.threshold)
+    
+    if args.save:
+        save_baseline(args.save, environment_info(args), results)
+        print(f"基线已保存: {baseline_path(args.save)}")
+    
+    if regressions:
+        print(f"单次耗时增加超过{args.threshold:.0%}: {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+股票信息标签刷新基准测试
+
+模拟行情刷新，比较三种标签实现每次刷新在主线程上的耗时：
+原始的Text控件每次都重写内容、Text控件仅在变化时更新、Label控件仅在变化时更新。
+每次刷新后调用update_idletasks，使布局和重绘开销计入结果。
+需要可用的图形界面环境。
+
+使用方法：python -m benchmarks.bench_labels
+"""
+
+import argparse
+import random
+import time
+import tkinter as tk
+import tkinter.font
+
+from app.utils import update_text_label
+
+
+FIELDS = (
+    ('name', "宁德时代", 12),
+    ('price', "200.00", 12),
+    ('change', "+0.00%", 11),
+)
+
+
+def create_text_widget(parent, text, font):
+    """按ui.py中的方式创建Text控件"""
+    widget = tk.Text(parent, font=font, bg='#1e1e1e', fg='#ffffff', relief=tk.FLAT, bd=0,
+                     highlightthickness=0, wrap=tk.NONE, height=1,
+                     width=max(1, len(text) * 2 - 1), cursor="arrow", padx=0, pady=0)
+    widget.tag_configure("center", justify='center')
+    widget.insert(tk.END, text, "center")
+    widget.config(state=tk.DISABLED)
+    widget.pack(fill=tk.BOTH, expand=True, pady=0)
+    return widget
+
+
+def create_label_widget(parent, text, font):
+    """按ui.py中的方式创建Label控件"""
+    widget = tk.Label(parent, text=text, font=font, bg='#1e1e1e', fg='#ffffff',
+                      relief=tk.FLAT, bd=0, padx=0, pady=0, anchor='center')
+    widget.pack(fill=tk.BOTH, expand=True, pady=0)
+    return widget
+
+
+def make_ticks(count, change_ratio):
+    """生成行情序列，只有change_ratio比例的刷新带来价格变化"""
+    price = 200.0
+    ticks = []
+    for _ in range(count):
+        if random.random() < change_ratio:
+            price = round(price + random.uniform(-0.5, 0.5), 2)
+        change = (price - 200.0) / 200.0 * 100
+        ticks.append({
+            'name': "宁德时代",
+            'price': f"{price:.2f}",
+            'change': f"{change:+.2f}%",
+            'color': '#00ff00' if change < 0 else '#ff6b6b',
+        })
+    return ticks
+
+
+def run_case(root, factory, change_only, ticks):
+    """测量一种实现的平均单次刷新耗时（毫秒）"""
+    frame = tk.Frame(root, bg='#1e1e1e')
+    frame.pack(fill=tk.BOTH, expand=True)
+    widgets = {}
+    for key, text, size in FIELDS:
+        font = tk.font.Font(family="Microsoft YaHei", size=size, weight="bold")
+        widgets[key] = factory(frame, text, font)
+    root.update()
+    
+    states = {}
+    
+    def update(label, text, fg_color=None):
+        if change_only:
+            state = (text, fg_color)
+            if states.get(label) == state:
+                return
+            states[label] = state
+        update_text_label(label, text, fg_color)
+    
+    start = time.perf_counter()
+    for tick in ticks:
+        update(widgets['name'], tick['name'])
+        update(widgets['price'], tick['price'])
+        update(widgets['change'], tick['change'], tick['color'])
+        root.update_idletasks()
+    elapsed = time.perf_counter() - start
+    
+    frame.destroy()
+    return elapsed / len(ticks) * 1000
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="股票信息标签刷新基准测试")
+    parser.add_argument('--ticks', type=int, default=500, help="刷新次数")
+    parser.add_argument('--change-ratio', type=float, default=0.3, help="带来价格变化的刷新比例")
+    args = parser.parse_args()
+    
+    random.seed(0)
+    ticks = make_ticks(args.ticks, args.change_ratio)
+    
+    root = tk.Tk()
+    root.geometry("300x60")
+    cases = (
+        ("Text 每次重写", create_text_widget, False),
+        ("Text 变化时更新", create_text_widget, True),
+        ("Label 变化时更新", create_label_widget, True),
+    )
+    
+    print(f"{'实现':<16} {'耗时(ms/次)':>12}")
+    try:
+        for title, factory, change_only in cases:
+            cost = run_case(root, factory, change_only, ticks)
+            print(f"{title:<16} {cost:>12.4f}")
+    finally:
+        root.destroy()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+启动耗时基准测试
+
+每次测量都启动新的Python进程，避免模块缓存影响结果：
+    - 导入耗时：用 -X importtime 导入app.core，统计总耗时和耗时最多的模块，
+      并检查应当延迟导入的模块（requests、设置窗口、行情分发等）没有在启动时被导入
+    - 首次绘制：在临时目录中创建主窗口，统计各启动阶段（Win11StockBar.boot_times）
+      和从进程启动到窗口绘制完成的时间（需要图形界面，没有时跳过）
+各项取多次运行的中位数，可保存为JSON基线并与之后的版本比较。
+
+使用方法：
+    python -m benchmarks.bench_startup
+    python -m benchmarks.bench_startup --save v1
+    python -m benchmarks.bench_startup --compare v1
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from app.core import BOOT_PHASES
+
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baselines')
+
+# 启动时不应导入的模块，只在第一次使用对应功能时导入
+DEFERRED_MODULES = ('requests', 'app.settings', 'app.fanout', 'app.shm', 'cProfile', 'pstats', 'tracemalloc')
+
+# 与基线比较时，耗时增加超过该比例视为性能退化（可用--threshold修改）
+REGRESSION_THRESHOLD = 0.10
+
+# 首次绘制测量的子进程脚本，参数为父进程启动子进程时的时间戳；
+# create_ui在窗口绘制完成后才启动其余服务，各阶段时间取自Win11StockBar.boot_times
+FIRST_PAINT_SCRIPT = """
+import json, os, sys, time
+spawned = float(sys.argv[1])
+started = time.time()
+boot_started = time.perf_counter()
+from app.core import Win11StockBar
+imported = time.time()
+app = Win11StockBar(boot_started=boot_started)
+app.create_ui()
+painted = time.time()
+result = {
+    'interpreter_ms': (started - spawned) * 1000,
+    'import_ms': (imported - started) * 1000,
+    'first_paint_ms': (painted - spawned) * 1000,
+}
+result.update({f'boot_{phase}_ms': ms for phase, ms in app.boot_times.items()})
+print(json.dumps(result))
+sys.stdout.flush()
+# 不等待数据获取线程和配置写入，直接退出
+os._exit(0)
+"""
+
+
+def child_env():
+    """子进程环境：从仓库目录导入app，允许写入字节码缓存（与实际运行时一致）"""
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(filter(None, [REPO_DIR, env.get('PYTHONPATH')]))
+    env.pop('PYTHONDONTWRITEBYTECODE', None)
+    env.pop('STOCKBAR_PROFILE', None)
+    return env
+
+
+def parse_importtime(output):
+    """解析 -X importtime 的输出
+    
+    返回:
+        {模块名: (自身耗时ms, 累计耗时ms)}
+    """
+    modules = {}
+    for line in output.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        fields = line[len('import time:'):].split('|')
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue  # 表头
+        modules[fields[2].strip()] = (int(fields[0]) / 1000, int(fields[1]) / 1000)
+    return modules
+
+
+def measure_imports(module, runs):
+    """多次导入模块，返回累计耗时的中位数、各模块自身耗时的中位数和启动时导入的延迟模块"""
+    totals = []
+    self_times = {}
+    loaded = set()
+    # 第一次运行可能需要编译并缓存字节码，不计入结果
+    for index in range(runs + 1):
+        result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                                cwd=REPO_DIR, env=child_env(), capture_output=True, text=True)
+        if result.returncode != 0:
+            raise RuntimeError(f"导入{module}失败: {result.stderr.strip().splitlines()[-1:]}")
+        modules = parse_importtime(result.stderr)
+        if index == 0:
+            continue
+        totals.append(modules[module][1])
+        for name, (self_ms, _) in modules.items():
+            self_times.setdefault(name, []).append(self_ms)
+        loaded.update(name for name in DEFERRED_MODULES if name in modules)
+    
+    medians = {name: statistics.median(values + [0.0] * (runs - len(values)))
+               for name, values in self_times.items()}
+    return statistics.median(totals), medians, sorted(loaded)
+
+
+def measure_first_paint(runs):
+    """多次启动主窗口，返回各阶段耗时的中位数；没有图形界面时返回(None, 错误信息)"""
+    samples = []
+    with tempfile.TemporaryDirectory() as workdir:
+        # 在临时目录中运行，使用默认配置，不读写当前目录的配置文件
+        for index in range(runs + 1):
+            result = subprocess.run([sys.executable, '-c', FIRST_PAINT_SCRIPT, repr(time.time())],
+                                    cwd=workdir, env=child_env(), capture_output=True, text=True, timeout=60)
+            lines = result.stdout.strip().splitlines()
+            if result.returncode != 0 or not lines:
+                error = (result.stderr.strip().splitlines() or ['未知错误'])[-1]
+                return None, error
+            if index:
+                samples.append(json.loads(lines[-1]))
+    return {key: statistics.median(sample[key] for sample in samples) for key in samples[0]}, None
+
+
+def baseline_path(name):
+    """基线文件路径"""
+    return os.path.join(BASELINE_DIR, f'startup_{name}.json')
+
+
+def print_metric(label, value, previous, threshold, regressions):
+    """打印一项耗时，提供基线时显示变化"""
+    line = f"{label:<24} {value:>10.1f}"
+    if previous:
+        delta = value / previous - 1
+        line += f" {delta:>+9.1%}{' !' if delta > threshold else ''}"
+        if delta > threshold:
+            regressions.append(label)
+    print(line)
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="启动耗时基准测试")
+    parser.add_argument('--module', default='app.core', help="测量导入耗时的模块")
+    parser.add_argument('--runs', type=int, default=7, help="每项的运行次数，取中位数")
+    parser.add_argument('--top', type=int, default=10, help="列出自身耗时最多的模块数")
+    parser.add_argument('--save', metavar='NAME', help="把结果保存为基线")
+    parser.add_argument('--compare', metavar='NAME', help="与已保存的基线比较")
+    parser.add_argument('--threshold', type=float, default=REGRESSION_THRESHOLD,
+                        help="视为退化的耗时增加比例")
+    args = parser.parse_args()
+    
+    baseline = {}
+    if args.compare:
+        with open(baseline_path(args.compare), 'r', encoding='utf-8') as f:
+            baseline = json.load(f)['results']
+    
+    total, self_times, loaded = measure_imports(args.module, args.runs)
+    results = {'import_ms': total}
+    paint, error = measure_first_paint(args.runs)
+    if paint:
+        results.update(paint)
+    
+    print(f"Python {sys.version.split()[0]}，{args.runs} 次运行的中位数")
+    print(f"{'测试项':<24} {'耗时(ms)':>10}" + (f" {'对比基线':>10}" if baseline else ''))
+    regressions = []
+    print_metric(f"导入 {args.module}", total, baseline.get('import_ms'), args.threshold, regressions)
+    if paint:
+        print_metric('解释器启动', paint['interpreter_ms'], baseline.get('interpreter_ms'),
+                     args.threshold, regressions)
+        for phase, label in BOOT_PHASES.items():
+            key = f'boot_{phase}_ms'
+            if key in paint:
+                print_metric(f"启动阶段: {label}", paint[key], baseline.get(key), args.threshold, regressions)
+        print_metric('进程启动到首次绘制', paint['first_paint_ms'], baseline.get('first_paint_ms'),
+                     args.threshold, regressions)
+    else:
+        print(f"跳过首次绘制测量: {error}")
+    
+    print(f"\n自身导入耗时最多的{args.top}个模块:")
+    for name, value in sorted(self_times.items(), key=lambda item: item[1], reverse=True)[:args.top]:
+        print(f"  {value:>8.2f} ms  {name}")
+    
+    if args.save:
+        os.makedirs(BASELINE_DIR, exist_ok=True)
+        with open(baseline_path(args.save), 'w', encoding='utf-8') as f:
+            json.dump({'python': sys.version, 'results': results}, f, ensure_ascii=False, indent=2)
+        print(f"\n基线已保存: {baseline_path(args.save)}")
+    
+    if loaded:
+        print(f"\n启动时导入了应延迟导入的模块: {', '.join(loaded)}")
+    if regressions:
+        print(f"耗时增加超过{args.threshold:.0%}: {', '.join(regressions)}")
+    if loaded or regressions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
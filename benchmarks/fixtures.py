@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+基准测试用的分时接口数据
+
+fixtures目录下保存与duishu分时接口data字段结构相同的JSON数据。
+仓库中的数据由本模块按固定随机种子生成；也可以用--record从接口录制真实数据替换。
+
+使用方法：
+    python -m benchmarks.fixtures --generate
+    python -m benchmarks.fixtures --record 600519
+"""
+
+import argparse
+import datetime
+import json
+import os
+import random
+
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+# 生成的数据：名称 -> 数据点数量（全天241个，上午盘中90个）
+GENERATED_FIXTURES = {
+    'fenshi_full_day': 241,
+    'fenshi_morning': 90,
+}
+
+
+def trading_timestamps(count, day=datetime.date(2025, 11, 28)):
+    """生成A股交易分钟的Unix时间戳（北京时间09:30-11:30、13:01-15:00）"""
+    beijing = datetime.timezone(datetime.timedelta(hours=8))
+    morning = datetime.datetime.combine(day, datetime.time(9, 30), beijing)
+    afternoon = datetime.datetime.combine(day, datetime.time(13, 1), beijing)
+    timestamps = []
+    for i in range(min(count, 241)):
+        if i <= 120:
+            moment = morning + datetime.timedelta(minutes=i)
+        else:
+            moment = afternoon + datetime.timedelta(minutes=i - 121)
+        timestamps.append(int(moment.timestamp()))
+    return timestamps
+
+
+def synthesize_payload(count, seed=0, name="贵州茅台", pre_close=1500.0):
+    """按固定随机种子生成一份分时接口数据
+    
+    参数:
+        count: 数据点数量
+        seed: 随机种子
+        name: 股票名称
+        pre_close: 昨日收盘价
+    """
+    rng = random.Random(seed)
+    price = pre_close
+    prices = []
+    for _ in range(count):
+        price = max(0.01, price * (1 + rng.gauss(0, 0.0015)))
+        prices.append(round(price, 2))
+    
+    # 成交量用单独的随机数生成器，保持价格序列与之前生成的数据一致
+    volume_rng = random.Random(seed + 1)
+    volumes = [volume_rng.randint(1, 300) * 100 for _ in range(count)]
+    
+    pankou = {}
+    last = prices[-1] if prices else pre_close
+    for level in range(1, 6):
+        pankou[f'b{level}_p'] = round(last - 0.01 * level, 2)
+        pankou[f'b{level}_v'] = rng.randint(1, 500) * 100
+        pankou[f'a{level}_p'] = round(last + 0.01 * level, 2)
+        pankou[f'a{level}_v'] = rng.randint(1, 500) * 100
+    
+    return {
+        'name': name,
+        't': trading_timestamps(count),
+        'zhutu': {
+            'pre_close': pre_close,
+            'left_line_list': [{'name': '价格', 'data': prices}],
+            'bar_list': [{'name': '成交量', 'data': volumes}],
+        },
+        'pankou': pankou,
+    }
+
+
+def fixture_path(name):
+    """获取数据文件路径"""
+    return os.path.join(FIXTURE_DIR, f'{name}.json')
+
+
+def load_fixture(name):
+    """读取一份数据"""
+    with open(fixture_path(name), 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def list_fixtures():
+    """列出所有数据名称"""
+    if not os.path.isdir(FIXTURE_DIR):
+        return []
+    return sorted(os.path.splitext(file_name)[0] for file_name in os.listdir(FIXTURE_DIR)
+                  if file_name.endswith('.json'))
+
+
+def save_fixture(name, payload):
+    """保存一份数据"""
+    os.makedirs(FIXTURE_DIR, exist_ok=True)
+    with open(fixture_path(name), 'w', encoding='utf-8') as f:
+        json.dump(payload, f, ensure_ascii=False, indent=1)
+
+
+def record_fixture(symbol):
+    """从分时接口录制一份真实数据"""
+    import requests
+    
+    url = f"https://api.duishu.com/hangqing/stock/fenshi?time_type=F&code={symbol}&get_zhutu=1&get_pankou=1"
+    headers = {
+        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
+        'Referer': 'https://www.duishu.com/',
+    }
+    response = requests.get(url, headers=headers, timeout=10)
+    response.raise_for_status()
+    data = response.json()
+    if data.get('code') != 10000 or 'data' not in data:
+        raise RuntimeError(f"接口返回错误: {data.get('msg')}")
+    name = f'recorded_{symbol}'
+    save_fixture(name, data['data'])
+    return name
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="基准测试数据")
+    parser.add_argument('--generate', action='store_true', help="重新生成固定种子的数据")
+    parser.add_argument('--record', metavar='SYMBOL', help="从接口录制一只股票的真实数据")
+    args = parser.parse_args()
+    
+    if args.generate:
+        for name, count in GENERATED_FIXTURES.items():
+            save_fixture(name, synthesize_payload(count))
+            print(f"已生成 {fixture_path(name)}")
+    if args.record:
+        print(f"已录制 {fixture_path(record_fixture(args.record))}")
+    if not args.generate and not args.record:
+        print("\n".join(list_fixtures()))
+
+
+if __name__ == "__main__":
+    main()
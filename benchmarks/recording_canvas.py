@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+无界面的画布替身，记录绘制调用，用于离线基准测试
+"""
+
+
+class RecordingCanvas:
+    """记录调用的Canvas替身
+    
+    实现分时图绘制用到的Canvas方法，不依赖Tk和图形界面。
+    每类调用按名称计数，便于同时比较耗时和Tk调用次数。
+    """
+    
+    def __init__(self, width=300, height=48, bg='#1e1e1e'):
+        """初始化画布替身
+        
+        参数:
+            width: 画布宽度
+            height: 画布高度
+            bg: 背景颜色
+        """
+        self.width = width
+        self.height = height
+        self.options = {'bg': bg}
+        self.items = {}
+        self.calls = {}
+        self._next_id = 0
+    
+    def _count(self, name):
+        """记录一次调用"""
+        self.calls[name] = self.calls.get(name, 0) + 1
+    
+    def reset_calls(self):
+        """清空调用计数"""
+        self.calls = {}
+    
+    def winfo_width(self):
+        return self.width
+    
+    def winfo_height(self):
+        return self.height
+    
+    def cget(self, option):
+        return self.options.get(option)
+    
+    def configure(self, **options):
+        self._count('configure')
+        self.options.update(options)
+    
+    config = configure
+    
+    def bind(self, sequence, func):
+        pass
+    
+    def pack(self, **options):
+        pass
+    
+    def _create(self, kind, coords, options):
+        """创建图元并返回编号"""
+        self._count(f'create_{kind}')
+        self._next_id += 1
+        self.items[self._next_id] = [kind, list(coords), dict(options)]
+        return self._next_id
+    
+    def create_line(self, *coords, **options):
+        if len(coords) == 1:
+            coords = coords[0]
+        return self._create('line', coords, options)
+    
+    def create_text(self, *coords, **options):
+        return self._create('text', coords, options)
+    
+    def create_oval(self, *coords, **options):
+        return self._create('oval', coords, options)
+    
+    def create_rectangle(self, *coords, **options):
+        return self._create('rectangle', coords, options)
+    
+    def create_image(self, *coords, **options):
+        return self._create('image', coords, options)
+    
+    def coords(self, item, *coords):
+        self._count('coords')
+        if len(coords) == 1:
+            coords = coords[0]
+        if item in self.items and coords:
+            self.items[item][1] = list(coords)
+    
+    def itemconfigure(self, item, **options):
+        self._count('itemconfigure')
+        if item in self.items:
+            self.items[item][2].update(options)
+    
+    itemconfig = itemconfigure
+    
+    def move(self, tag, dx, dy):
+        self._count('move')
+    
+    def delete(self, *items):
+        self._count('delete')
+        if 'all' in items:
+            self.items.clear()
+            return
+        for item in items:
+            self.items.pop(item, None)
@@ -5,10 +5,11 @@
  股票信息工具栏 - 主程序入口
 """
 
+import argparse
 import os
 import sys
 import tempfile
-from app import Win11StockBar
+import time
 
 
 class SingleInstance:
@@ -120,8 +121,42 @@ class SingleInstance:
                 pass
 
 
+def parse_args():
+    """解析命令行参数"""
+    parser = argparse.ArgumentParser(description="股票信息工具栏")
+    parser.add_argument('--profile', type=float, metavar='SECONDS',
+                        help="启动后进行指定秒数的性能分析（cProfile和tracemalloc）")
+    parser.add_argument('--profile-dir', metavar='DIR',
+                        help="性能分析报告的输出目录，默认为profiles")
+    parser.add_argument('--headless', action='store_true',
+                        help="无界面模式：不创建窗口，以JSON Lines输出行情快照")
+    parser.add_argument('--output', metavar='FILE',
+                        help="无界面模式的输出文件（追加写入），默认为标准输出")
+    parser.add_argument('--once', action='store_true',
+                        help="无界面模式下只获取一轮行情后退出")
+    parser.add_argument('--series', action='store_true',
+                        help="无界面模式的快照中包含分时价格序列")
+    return parser.parse_args()
+
+
+def run_headless(args):
+    """无界面模式，不导入tkinter"""
+    from app.headless import HeadlessStockFeed
+    
+    feed = HeadlessStockFeed(output=args.output, once=args.once, include_series=args.series)
+    feed.run()
+
+
 def main():
     """主函数"""
+    started = time.perf_counter()
+    args = parse_args()
+    
+    # 无界面模式不占用单实例锁，可以与界面同时运行
+    if args.headless:
+        run_headless(args)
+        return
+    
     # 检查是否已有实例运行
     with SingleInstance() as single:
         if not single:
@@ -154,8 +189,10 @@ def main():
             
             sys.exit(1)
     
+    from app import Win11StockBar
+    
     print("启动股票工具栏...")
-    app = Win11StockBar()
+    app = Win11StockBar(profile_seconds=args.profile, profile_dir=args.profile_dir, boot_started=started)
     app.run()
 
 